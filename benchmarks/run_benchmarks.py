@@ -0,0 +1,230 @@
+# run_benchmarks.py
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Project root so that "import crypto_warnsystem" works
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PROJECT_ROOT = os.path.join(REPO_ROOT, 'src')
+for path in (PROJECT_ROOT, os.path.dirname(os.path.abspath(__file__))):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import numpy as np
+import pandas as pd
+
+from synthetic import SCALES, synthetic_ohlcv
+from crypto_warnsystem.backtester.backtester import run_prediction_backtest
+from crypto_warnsystem.backtester.run_backtest import backtest_rsi_liquidity
+from crypto_warnsystem.models import prediction_model
+from crypto_warnsystem.models.prediction_model import predict_directions, predict_future_direction
+from crypto_warnsystem.utils.indicator_utils import calculate_indicators, calculate_liquidity_levels
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+MODEL_PATH = os.path.join(REPO_ROOT, "model", "trained_model.pkl")
+DEFAULT_SCALES = "1k,100k"
+
+
+class Dataset:
+    """Synthetische Kerzen einer Stufe; Indikatoren und Levels werden einmal berechnet und geteilt."""
+
+    def __init__(self, n: int, seed: int = 0):
+        self.n = n
+        self.seed = seed
+        self._ohlcv = None
+        self._indicators = None
+        self._levels = None
+
+    @property
+    def ohlcv(self) -> pd.DataFrame:
+        if self._ohlcv is None:
+            self._ohlcv = synthetic_ohlcv(self.n, self.seed)
+        return self._ohlcv
+
+    @property
+    def indicators(self) -> pd.DataFrame:
+        if self._indicators is None:
+            self._indicators = calculate_indicators(self.ohlcv.copy())
+        return self._indicators
+
+    @property
+    def levels(self) -> pd.Series:
+        if self._levels is None:
+            self._levels = calculate_liquidity_levels(self.indicators, window=20)
+        return self._levels
+
+
+# Name -> (setup(dataset) -> Argumente, Funktion). setup läuft außerhalb der Zeitmessung.
+BENCHMARKS = {
+    # calculate_indicators schreibt in den übergebenen Frame, daher je Runde eine Kopie
+    "calculate_indicators": (lambda d: (d.ohlcv.copy(),), calculate_indicators),
+    "calculate_liquidity_levels": (lambda d: (d.indicators, 20), calculate_liquidity_levels),
+    "predict_single": (lambda d: (d.indicators,), predict_future_direction),
+    "predict_batch": (lambda d: (d.indicators, None, None, True), predict_directions),
+    "backtest_rsi_liquidity": (lambda d: (d.indicators, d.levels, 30, 70, 'rsi', True), backtest_rsi_liquidity),
+    "prediction_backtest": (lambda d: (d.indicators,), run_prediction_backtest),
+}
+
+
+def use_model(model_path: str, runtime: str, workdir: str):
+    """
+    Richtet das Modell für die Prognose-Benchmarks ein: "artifact" exportiert
+    model_path in ein temporäres Artefakt (NumPy-Laufzeit), "sklearn" nutzt
+    das joblib-Modell direkt.
+    """
+    registry = prediction_model.model_registry
+    registry.path = model_path
+    registry.artifact_path = None
+    registry.flatten = False
+    if runtime == "artifact":
+        import joblib
+        from crypto_warnsystem.models.model_artifact import export_forest
+
+        artifact = os.path.join(workdir, "forest")
+        export_forest(joblib.load(model_path), artifact)
+        registry.artifact_path = artifact
+    if registry.get() is None:
+        raise FileNotFoundError(f"Kein Modell unter {model_path}")
+
+
+def measure(func, setup, dataset: Dataset, min_time: float, max_rounds: int) -> list:
+    """
+    Laufzeiten (Sekunden) einzelner Aufrufe. Der erste Aufruf wärmt Caches auf
+    und zählt nur mit, wenn er allein schon länger als eine Sekunde dauert.
+    """
+    args = setup(dataset)
+    t0 = time.perf_counter()
+    func(*args)
+    first = time.perf_counter() - t0
+    times = [first] if first >= 1.0 else []
+    while len(times) < max_rounds and (not times or sum(times) < min_time):
+        args = setup(dataset)
+        t0 = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    from crypto_warnsystem.backtester.engine import NUMBA_AVAILABLE
+
+    return {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "numba": NUMBA_AVAILABLE,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run_suite(names, scales, min_time: float = 1.0, max_rounds: int = 20, seed: int = 0,
+              verbose: bool = True) -> dict:
+    """Führt die Benchmarks aus; Ergebnis-Schlüssel sind "name[scale]"."""
+    results = {}
+    for scale in scales:
+        dataset = Dataset(SCALES[scale], seed)
+        for name in names:
+            setup, func = BENCHMARKS[name]
+            times = measure(func, setup, dataset, min_time, max_rounds)
+            key = f"{name}[{scale}]"
+            results[key] = {
+                "name": name,
+                "scale": scale,
+                "rows": dataset.n,
+                "rounds": len(times),
+                "min": min(times),
+                "median": statistics.median(times),
+                "mean": statistics.fmean(times),
+                "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+            }
+            if verbose:
+                r = results[key]
+                print(f"⏱️ {key:<40} median {r['median'] * 1000:10.2f} ms  "
+                      f"min {r['min'] * 1000:10.2f} ms  ({r['rounds']} Runden)")
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.2) -> list:
+    """
+    Vergleicht mit einer früheren Messung. Verglichen wird die schnellste Runde,
+    sie schwankt zwischen Läufen deutlich weniger als Median oder Mittelwert.
+
+    :return: Liste (Schlüssel, Basis, neu, Faktor) aller Benchmarks, die mehr als tolerance langsamer sind
+    """
+    regressions = []
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        ratio = result["min"] / max(old["min"], 1e-12)
+        print(f"{'⚠️' if ratio > 1 + tolerance else '✅'} {key:<40} x{ratio:.2f} "
+              f"({old['min'] * 1000:.2f} → {result['min'] * 1000:.2f} ms)")
+        if ratio > 1 + tolerance:
+            regressions.append((key, old["min"], result["min"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reproduzierbare Benchmarks auf synthetischen Kerzen (ohne Binance/Telegram)"
+    )
+    parser.add_argument('--scales', type=str, default=DEFAULT_SCALES,
+                        help=f'Kommagetrennt aus {", ".join(SCALES)} (10M braucht mehrere GB RAM und Minuten)')
+    parser.add_argument('--bench', type=str, default=None, help='Nur Benchmarks, deren Name diesen Text enthält')
+    parser.add_argument('--min-time', type=float, default=1.0, help='Mindestmesszeit je Benchmark (Sekunden)')
+    parser.add_argument('--max-rounds', type=int, default=20, help='Höchstens so viele Runden je Benchmark')
+    parser.add_argument('--seed', type=int, default=0, help='Seed der synthetischen Daten')
+    parser.add_argument('--model', type=str, default=MODEL_PATH, help='joblib-Modell für die Prognose-Benchmarks')
+    parser.add_argument('--runtime', choices=["artifact", "sklearn"], default="artifact",
+                        help='Inferenz über das NumPy-Artefakt oder direkt über scikit-learn')
+    parser.add_argument('--output', type=str, default=None,
+                        help='JSON-Datei (Standard: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', type=str, default=None, help='JSON einer früheren Messung zum Vergleich')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Erlaubte Verschlechterung (0.2 = +20 %%)')
+    args = parser.parse_args()
+
+    scales = [s for s in args.scales.split(",") if s]
+    unknown = set(scales) - set(SCALES)
+    if unknown:
+        parser.error(f"Unbekannte Stufen: {', '.join(sorted(unknown))}")
+    names = [n for n in BENCHMARKS if not args.bench or args.bench in n]
+
+    env = environment()
+    print(f"📊 Benchmarks {', '.join(names)} für {', '.join(scales)} Kerzen "
+          f"(Commit {env['commit']}, Laufzeit {args.runtime})")
+    with tempfile.TemporaryDirectory() as workdir:
+        use_model(args.model, args.runtime, workdir)
+        results = run_suite(names, scales, args.min_time, args.max_rounds, args.seed)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{env['commit'] or time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"environment": {**env, "runtime": args.runtime, "seed": args.seed}, "results": results},
+                  f, indent=2)
+    print(f"💾 Ergebnisse gespeichert unter: {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} Benchmarks langsamer als erlaubt")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# synthetic.py
+
+import numpy as np
+import pandas as pd
+
+# Größen der Benchmark-Stufen in Kerzen
+SCALES = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "10M": 10_000_000,
+}
+
+# Blockgröße beim Erzeugen: begrenzt die Zwischen-Arrays bei 10M Kerzen
+_CHUNK = 1_000_000
+
+
+def synthetic_ohlcv(n: int, seed: int = 0, freq: str = "1min", start: str = "2020-01-01") -> pd.DataFrame:
+    """
+    Reproduzierbare OHLCV-Kerzen (geometrischer Random Walk) im Format von get_klines.
+
+    Gleicher Seed und gleiches n ergeben bitgleiche Daten; die Kerzen werden
+    blockweise erzeugt, damit auch 10M Kerzen ohne große Zwischenkopien entstehen.
+    """
+    rng = np.random.default_rng(seed)
+    close = np.empty(n, dtype=np.float64)
+    spread = np.empty(n, dtype=np.float64)
+    volume = np.empty(n, dtype=np.float64)
+    level = np.log(30000.0)
+    for start_row in range(0, n, _CHUNK):
+        end_row = min(start_row + _CHUNK, n)
+        steps = rng.normal(0, 0.002, end_row - start_row)
+        steps[0] += level
+        log_close = np.cumsum(steps)
+        level = log_close[-1]
+        np.exp(log_close, out=close[start_row:end_row])
+        spread[start_row:end_row] = np.abs(rng.normal(0, 0.001, end_row - start_row))
+        volume[start_row:end_row] = rng.gamma(2.0, 50.0, end_row - start_row)
+
+    open_ = np.empty_like(close)
+    open_[0] = close[0]
+    open_[1:] = close[:-1]
+    spread *= close
+    index = pd.date_range(start, periods=n, freq=freq, name="time")
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": volume,
+    }, index=index)
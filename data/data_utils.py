@@ -1,9 +1,16 @@
 # src/crypto_warnsystem/utils/data_utils.py
 
 import os
+import sys
+
 import pandas as pd
 from binance.client import Client
 
+# Project root so that "import crypto_warnsystem" works
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
 # Lade API-Keys aus der Umgebung (falls gesetzt)
 API_KEY    = os.getenv("BINANCE_API_KEY", None)
 API_SECRET = os.getenv("BINANCE_API_SECRET", None)
@@ -14,10 +21,20 @@ class _DummyClient:
     def get_historical_klines(symbol, interval, lookback):
         return []
 
+_replay_client = None
+
 def _make_client():
     """
     Erstelle echten Binance-Client oder Dummy, falls kein Zugriff möglich.
+    Mit BINANCE_REPLAY wird der Offline-ReplayClient verwendet (einmal je Prozess,
+    damit die virtuelle Uhr weiterläuft).
     """
+    global _replay_client
+    if os.getenv("BINANCE_REPLAY"):
+        if _replay_client is None:
+            from crypto_warnsystem.utils.replay_client import ReplayClient
+            _replay_client = ReplayClient.from_env()
+        return _replay_client
     try:
         return Client(API_KEY, API_SECRET)
     except Exception:
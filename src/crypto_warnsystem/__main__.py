@@ -0,0 +1,5 @@
+# __main__.py – ermöglicht "python -m crypto_warnsystem <befehl>"
+
+from crypto_warnsystem.cli import main
+
+main()
@@ -1,53 +1,135 @@
 # backtester.py
 
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
 import pandas as pd
-from data_utils import get_klines
-from indicator_utils import calculate_indicators
-from prediction_model import predict_future_direction
 
-from datetime import timedelta
+# Project root so that "import crypto_warnsystem" works
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from crypto_warnsystem.models.feature_store import feature_store
+from crypto_warnsystem.models.prediction_model import predict_directions
+from crypto_warnsystem.utils.metrics import timed
+
+CONFIDENCE_BUCKETS = [0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+
+def label_directions(close: pd.Series, step_size: int = 4) -> pd.Series:
+    """
+    Wahre Richtung je Kerze: 1, wenn der Kurs in `step_size` Kerzen höher ist, sonst 0.
+    Die letzten `step_size` Kerzen haben kein Label (NaN).
+    """
+    values = close.to_numpy(dtype=float)
+    future = np.full(len(values), np.nan)
+    if step_size < len(values):
+        future[:len(values) - step_size] = values[step_size:]
+    labels = np.where(np.isnan(future), np.nan, (future > values).astype(float))
+    return pd.Series(labels, index=close.index)
+
+def calibration_table(results: pd.DataFrame, buckets=CONFIDENCE_BUCKETS) -> pd.DataFrame:
+    """
+    Trefferquote je Confidence-Bereich: Anzahl, mittlere Confidence und Trefferquote.
+    """
+    hits = (results["Wahr"] == results["Vorhersage"]).astype(float)
+    bucket = pd.cut(results["Confidence"], bins=buckets, include_lowest=True)
+    table = pd.DataFrame({"Confidence": results["Confidence"], "Treffer": hits, "Bereich": bucket})
+    table = table.groupby("Bereich", observed=False).agg(
+        Anzahl=("Treffer", "size"),
+        Confidence=("Confidence", "mean"),
+        Trefferquote=("Treffer", "mean"),
+    )
+    return table
+
+@timed()
+def run_prediction_backtest(df: pd.DataFrame, step_size: int = 4, window_size: int = 24) -> dict:
+    """
+    Walk-Forward-Auswertung des ML-Modells auf einem Indikator-DataFrame.
+
+    Für jede Kerze i ab `window_size` wird die Prognose aus den Features der
+    Kerze i mit der wahren Richtung close[i + step_size] > close[i] verglichen.
+    Alle Labels werden über verschobene Arrays, alle Prognosen in einem
+    einzigen Batch berechnet.
+
+    :return: Dict mit 'results' (DataFrame), 'hit_rate', 'hits', 'total',
+             'calibration' (DataFrame) und 'timings' (Sekunden je Schritt)
+    """
+    timings = {}
+
+    t0 = time.perf_counter()
+    labels = label_directions(df["close"], step_size)
+    timings["labels"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    end = max(len(df) - step_size, window_size)
+    predictions = predict_directions(df, start=window_size, end=end, dropna=True)
+    timings["predict"] = time.perf_counter() - t0
+
+    if predictions is None:
+        predictions = pd.DataFrame(columns=["direction", "confidence"], dtype=float)
 
-SYMBOL = "BTCUSDT"
-INTERVAL = "1h"
-BACKTEST_HOURS = 72  # letzte 72 Stunden
+    t0 = time.perf_counter()
+    results = pd.DataFrame({
+        "Zeitpunkt": predictions.index,
+        "Wahr": labels.reindex(predictions.index).to_numpy(dtype=int),
+        "Vorhersage": predictions["direction"].to_numpy(dtype=int),
+        "Confidence": predictions["confidence"].to_numpy(dtype=float),
+    })
+    hits = int((results["Wahr"] == results["Vorhersage"]).sum())
+    total = len(results)
+    calibration = calibration_table(results)
+    timings["evaluation"] = time.perf_counter() - t0
 
-print("🔁 Backtesting wird durchgeführt...\n")
+    return {
+        "results": results,
+        "hits": hits,
+        "total": total,
+        "hit_rate": hits / total if total else 0.0,
+        "calibration": calibration,
+        "timings": timings,
+        "model_version": predictions.attrs.get("model_version"),
+    }
 
-# Holt längere Historie
-df = get_klines(SYMBOL, interval=INTERVAL, lookback=BACKTEST_HOURS)
-df = calculate_indicators(df)
+def main():
+    parser = argparse.ArgumentParser(
+        description="Walk-Forward-Backtest der ML-Prognose"
+    )
+    parser.add_argument('--symbol', type=str, default='BTCUSDT', help='Trading symbol, e.g., BTCUSDT')
+    parser.add_argument('--interval', type=str, default='1h', help='Kline interval, e.g., 1h, 4h')
+    parser.add_argument('--lookback', type=str, default='90 day ago UTC', help='Lookback period, e.g., 90 day ago UTC')
+    parser.add_argument('--step-size', type=int, default=4, help='Prognosehorizont in Kerzen')
+    parser.add_argument('--window-size', type=int, default=24, help='Kerzen vor der ersten Prognose')
+    parser.add_argument('--output', type=str, default='backtest_results.csv', help='CSV-Datei für Einzelergebnisse')
+    args = parser.parse_args()
 
-results = []
-window_size = 24  # in Stunden
-step_size = 4     # wie oft Prognosen gemacht werden (alle 4h)
+    # Erst hier importieren, damit die Engine ohne Binance-Verbindung nutzbar ist
+    from crypto_warnsystem.utils.data_utils import get_klines
 
-for i in range(window_size, len(df) - step_size):
-    subset = df.iloc[i - window_size:i]  # Letzte X Stunden als Input
-    future = df.iloc[i + step_size]["close"]  # Kurs in +4h
-    current = df.iloc[i]["close"]
+    print("🔁 Backtesting wird durchgeführt...\n")
 
-    true_direction = 1 if future > current else 0
+    t0 = time.perf_counter()
+    df = get_klines(args.symbol, interval=args.interval, lookback=args.lookback)
+    load_time = time.perf_counter() - t0
 
-    prediction = predict_future_direction(subset)
-    if prediction:
-        pred_direction = prediction["direction"]
-        confidence = prediction["confidence"]
+    t0 = time.perf_counter()
+    df = feature_store.features(args.symbol, args.interval, df)
+    indicator_time = time.perf_counter() - t0
 
-        results.append({
-            "Zeitpunkt": df.index[i],
-            "Wahr": true_direction,
-            "Vorhersage": pred_direction,
-            "Confidence": confidence
-        })
+    report = run_prediction_backtest(df, step_size=args.step_size, window_size=args.window_size)
+    timings = {"load": load_time, "indicators": indicator_time, **report["timings"]}
 
-# Auswertung
-results_df = pd.DataFrame(results)
-treffer = (results_df["Wahr"] == results_df["Vorhersage"]).sum()
-gesamt = len(results_df)
-quote = (treffer / gesamt) * 100 if gesamt > 0 else 0
+    print(f"✅ Backtest abgeschlossen für {args.symbol} ({len(df)} Kerzen)")
+    print(f"➡️ Trefferquote: {report['hit_rate'] * 100:.2f}% ({report['hits']} von {report['total']})")
+    print("\n📊 Kalibrierung nach Confidence:")
+    print(report["calibration"].to_string())
+    print("\n⏱️ Laufzeiten: " + ", ".join(f"{k} {v:.3f}s" for k, v in timings.items()))
 
-print(f"✅ Backtest abgeschlossen für {SYMBOL}")
-print(f"➡️ Trefferquote: {quote:.2f}% ({treffer} von {gesamt})")
+    # Optional speichern
+    report["results"].to_csv(args.output, index=False)
 
-# Optional speichern
-results_df.to_csv("backtest_results.csv", index=False)
+if __name__ == "__main__":
+    main()
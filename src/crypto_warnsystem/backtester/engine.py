@@ -0,0 +1,145 @@
+# engine.py
+
+import numpy as np
+
+from crypto_warnsystem.utils.metrics import timed
+
+# Numba ist optional: ohne Numba wird die reine NumPy-Variante genutzt
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+def signal_masks(close: np.ndarray, rsi: np.ndarray, levels: np.ndarray,
+                 buy_threshold: float = 30, sell_threshold: float = 70):
+    """
+    Kauf- und Verkaufsbedingungen je Kerze als boolesche Arrays.
+    Kerze 0 wird (wie in der ursprünglichen Schleife) nie gehandelt.
+    """
+    valid = ~np.isnan(levels)
+    with np.errstate(invalid="ignore"):
+        buy = valid & (rsi < buy_threshold) & (close < levels)
+        sell = valid & (rsi > sell_threshold) & (close > levels)
+    if len(buy):
+        buy[0] = False
+        sell[0] = False
+    return buy, sell
+
+def _match_trades_numpy(buy: np.ndarray, sell: np.ndarray):
+    """
+    Ereignisgesteuert: springt per searchsorted von Signal zu Signal statt über
+    jede Kerze. Aufwand O(Trades · log n).
+    """
+    buys = np.flatnonzero(buy)
+    sells = np.flatnonzero(sell)
+    entries, exits = [], []
+    pos = 0
+    while True:
+        b = np.searchsorted(buys, pos, side="left")
+        if b == len(buys):
+            break
+        entry = buys[b]
+        entries.append(entry)
+        s = np.searchsorted(sells, entry, side="right")
+        if s == len(sells):
+            break
+        exits.append(sells[s])
+        pos = sells[s] + 1
+    return np.asarray(entries, dtype=np.int64), np.asarray(exits, dtype=np.int64)
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _match_trades_numba(buy, sell):
+        n = len(buy)
+        entries = np.empty(n, dtype=np.int64)
+        exits = np.empty(n, dtype=np.int64)
+        n_entries = 0
+        n_exits = 0
+        in_position = False
+        for i in range(n):
+            if not in_position:
+                if buy[i]:
+                    entries[n_entries] = i
+                    n_entries += 1
+                    in_position = True
+            elif sell[i]:
+                exits[n_exits] = i
+                n_exits += 1
+                in_position = False
+        return entries[:n_entries], exits[:n_exits]
+
+def _statistics(close: np.ndarray, entries: np.ndarray, exits: np.ndarray) -> dict:
+    """
+    PnL, Drawdown und Exposure einer Long-only-Strategie mit einer Einheit.
+    Eine offene Position wird zum letzten Kurs bewertet.
+    """
+    n = len(close)
+    closed = len(exits)
+    pnl = close[exits] - close[entries[:closed]]
+    returns = close[exits] / close[entries[:closed]] - 1
+
+    # Position wird von der Kerze nach dem Einstieg bis zur Ausstiegskerze gehalten
+    held = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(held, entries + 1, 1)
+    np.add.at(held, exits + 1, -1)
+    held = np.cumsum(held[:n]) > 0
+
+    bar_returns = np.zeros(n)
+    if n > 1:
+        bar_returns[1:] = close[1:] / close[:-1] - 1
+    equity = np.cumprod(1 + np.where(held, bar_returns, 0.0))
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if n else equity
+
+    return {
+        "n_trades": closed,
+        "pnl": pnl,
+        "returns": returns,
+        "total_pnl": float(pnl.sum()),
+        "total_return": float(equity[-1] - 1) if n else 0.0,
+        "win_rate": float((pnl > 0).mean()) if closed else 0.0,
+        "max_drawdown": float(drawdown.min()) if n else 0.0,
+        "exposure": float(held.mean()) if n else 0.0,
+        "equity": equity,
+    }
+
+@timed()
+def run_rsi_liquidity(close, rsi, levels, buy_threshold: float = 30, sell_threshold: float = 70,
+                      index=None, use_numba=None) -> dict:
+    """
+    RSI + Liquidity-Level-Backtest auf zusammenhängenden NumPy-Arrays.
+
+    Buy, wenn RSI < buy_threshold und Kurs < Liquidity-Level.
+    Sell, wenn RSI > sell_threshold und Kurs > Liquidity-Level.
+
+    :param close: Schlusskurse
+    :param rsi: RSI-Werte
+    :param levels: Liquidity-Levels (NaN = kein Level)
+    :param index: optionale Zeitstempel für die Trade-Liste (sonst Positionsindex)
+    :param use_numba: None = Numba nutzen, falls installiert
+    :return: Dict mit 'trades' [(Zeit, 'BUY'/'SELL', Preis), ...], 'entries', 'exits'
+             sowie PnL-, Drawdown- und Exposure-Statistiken
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    rsi = np.ascontiguousarray(rsi, dtype=np.float64)
+    levels = np.ascontiguousarray(levels, dtype=np.float64)
+
+    buy, sell = signal_masks(close, rsi, levels, buy_threshold, sell_threshold)
+    if use_numba is None:
+        use_numba = NUMBA_AVAILABLE
+    if use_numba and NUMBA_AVAILABLE:
+        entries, exits = _match_trades_numba(buy, sell)
+    else:
+        entries, exits = _match_trades_numpy(buy, sell)
+
+    if index is None:
+        index = np.arange(len(close))
+    trades = []
+    for k, entry in enumerate(entries):
+        trades.append((index[entry], 'BUY', close[entry]))
+        if k < len(exits):
+            trades.append((index[exits[k]], 'SELL', close[exits[k]]))
+
+    result = _statistics(close, entries, exits)
+    result.update({"trades": trades, "entries": entries, "exits": exits})
+    return result
@@ -2,7 +2,6 @@ import argparse
 import os
 import sys
 import pandas as pd
-import matplotlib.pyplot as plt
 
 # Project root so that "import crypto_warnsystem" works
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -10,44 +9,44 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 from crypto_warnsystem.utils.data_utils import get_klines
-from crypto_warnsystem.utils.indicator_utils import calculate_indicators, calculate_liquidity_levels
+from crypto_warnsystem.models.feature_store import feature_store
+from crypto_warnsystem.utils.indicator_utils import calculate_liquidity_levels
+from crypto_warnsystem.backtester.engine import run_rsi_liquidity
 
 def backtest_rsi_liquidity(
     df: pd.DataFrame,
     levels: pd.Series,
     buy_threshold: float = 30,
     sell_threshold: float = 70,
-    rsi_col: str = 'rsi'
-) -> list:
+    rsi_col: str = 'rsi',
+    stats: bool = False
+):
     """
     Backtest mit RSI-Signalen kombiniert mit Liquidity Levels.
     Buy, wenn RSI < buy_threshold und Kurs < Liquidity-Level.
     Sell, wenn RSI > sell_threshold und Kurs > Liquidity-Level.
-    """
-    position = None
-    trades = []
-
-    for i in range(1, len(df)):
-        price = df['close'].iloc[i]
-        rsi = df[rsi_col].iloc[i]
-        lvl = levels.iloc[i]
-        time = df.index[i]
-
-        if position is None:
-            if pd.notna(lvl) and rsi < buy_threshold and price < lvl:
-                position = 'long'
-                trades.append((time, 'BUY', price))
-        else:
-            if pd.notna(lvl) and rsi > sell_threshold and price > lvl:
-                trades.append((time, 'SELL', price))
-                position = None
 
-    return trades
+    Läuft auf NumPy-Arrays (siehe engine.run_rsi_liquidity).
+    Mit stats=True wird das komplette Ergebnis-Dict inkl. PnL,
+    Drawdown und Exposure zurückgegeben, sonst nur die Trade-Liste.
+    """
+    result = run_rsi_liquidity(
+        df['close'].to_numpy(),
+        df[rsi_col].to_numpy(),
+        levels.to_numpy(),
+        buy_threshold=buy_threshold,
+        sell_threshold=sell_threshold,
+        index=df.index,
+    )
+    return result if stats else result["trades"]
 
 def plot_trades(df: pd.DataFrame, trades: list):
     """
     Plotte die Backtest-Trades auf dem Kurschart.
     """
+    # matplotlib nur laden, wenn wirklich geplottet wird (headless-Läufe bleiben schnell)
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 6))
     plt.plot(df.index, df['close'], label='Close Price')
     for t in trades:
@@ -75,23 +74,27 @@ def main():
         '--lookback', type=str, default='60 day ago UTC',
         help='Lookback period, e.g., 60 day ago UTC'
     )
+    parser.add_argument(
+        '--no-plot', action='store_true',
+        help='Kein Chart anzeigen (z. B. auf Servern ohne Display)'
+    )
     args = parser.parse_args()
 
     df = get_klines(symbol=args.symbol, interval=args.interval, lookback=args.lookback)
-    df = calculate_indicators(df)
+    df = feature_store.features(args.symbol, args.interval, df)
 
     levels = calculate_liquidity_levels(df, window=20)
-    trades = backtest_rsi_liquidity(df, levels)
+    result = backtest_rsi_liquidity(df, levels, stats=True)
+    trades = result["trades"]
 
-    print(f"🔍 {len(trades)//2} abgeschlossene Trades gefunden.")
-    wins = sum(
-        1 for i in range(0, len(trades)-1, 2)
-        if trades[i+1][2] - trades[i][2] > 0
-    )
-    total = max(len(trades)//2, 1)
-    print(f"📈 Gewinnquote: {wins/total*100:.2f}%")
+    print(f"🔍 {result['n_trades']} abgeschlossene Trades gefunden.")
+    print(f"📈 Gewinnquote: {result['win_rate']*100:.2f}%")
+    print(f"💰 Gesamtrendite: {result['total_return']*100:.2f}%")
+    print(f"📉 Max. Drawdown: {result['max_drawdown']*100:.2f}%")
+    print(f"⏳ Exposure: {result['exposure']*100:.1f}% der Kerzen")
 
-    plot_trades(df, trades)
+    if not args.no_plot:
+        plot_trades(df, trades)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,181 @@
+# sweep.py
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Project root so that "import crypto_warnsystem" works
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from crypto_warnsystem.backtester.engine import run_rsi_liquidity
+from crypto_warnsystem.models.feature_store import feature_store
+from crypto_warnsystem.utils.indicator_utils import calculate_liquidity_levels
+from crypto_warnsystem.utils.metrics import timed
+
+RESULT_COLUMNS = [
+    "symbol", "interval", "buy_threshold", "sell_threshold", "window",
+    "n_trades", "win_rate", "total_return", "total_pnl", "max_drawdown", "exposure",
+]
+
+# Im Worker bereits geöffnete Shared-Memory-Blöcke (Name → (Handle, Array))
+_attached = {}
+
+def parse_range(spec: str) -> list:
+    """
+    Wertebereich aus der Kommandozeile: "20:40:5" (start:stop:step, stop inklusive)
+    oder eine Liste "20,25,30".
+    """
+    if ":" in spec:
+        start, stop, step = (float(v) for v in spec.split(":"))
+        values = np.arange(start, stop + step / 2, step)
+    else:
+        values = [float(v) for v in spec.split(",") if v]
+    return [int(v) if float(v).is_integer() else float(v) for v in values]
+
+def _attach(name: str, shape: tuple) -> np.ndarray:
+    if name not in _attached:
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            if multiprocessing.get_start_method() != "fork":
+                # Eigener Resource-Tracker (spawn): der Block gehört dem Hauptprozess
+                # und darf beim Beenden des Workers nicht aufgeräumt werden
+                resource_tracker.unregister(shm._name, "shared_memory")
+        _attached[name] = (shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf))
+    return _attached[name][1]
+
+def _run_chunk(task: dict) -> list:
+    """
+    Worker: rechnet einen Block Parameterkombinationen auf den geteilten Arrays.
+    Zeile 0 = close, Zeile 1 = RSI, ab Zeile 2 = Liquidity-Levels je Fenster.
+    """
+    data = _attach(task["shm_name"], task["shape"])
+    close, rsi = data[0], data[1]
+    rows = []
+    for buy, sell, window in task["params"]:
+        levels = data[2 + task["windows"].index(window)]
+        result = run_rsi_liquidity(close, rsi, levels, buy, sell)
+        rows.append({
+            "symbol": task["symbol"],
+            "interval": task["interval"],
+            "buy_threshold": buy,
+            "sell_threshold": sell,
+            "window": window,
+            **{k: result[k] for k in RESULT_COLUMNS[5:]},
+        })
+    return rows
+
+@timed()
+def run_sweep(datasets: dict, buy_values, sell_values, windows, max_workers=None,
+              chunk_size: int = 64, rank_by: str = "total_return") -> pd.DataFrame:
+    """
+    Parameter-Sweep der RSI + Liquidity-Strategie über einen Prozess-Pool.
+
+    :param datasets: {(symbol, interval): DataFrame mit 'close', 'rsi', 'volume'}
+    :param buy_values: Kandidaten für buy_threshold
+    :param sell_values: Kandidaten für sell_threshold
+    :param windows: Kandidaten für das Liquidity-Fenster
+    :param max_workers: Anzahl Prozesse (None = CPU-Anzahl)
+    :param chunk_size: Kombinationen je Worker-Aufgabe
+    :param rank_by: Spalte, nach der absteigend sortiert wird
+    :return: DataFrame mit einer Zeile je Kombination, sortiert nach rank_by
+    """
+    windows = [int(w) for w in windows]
+    grid = list(itertools.product(buy_values, sell_values, windows))
+    blocks = []
+    tasks = []
+
+    try:
+        for (symbol, interval), df in datasets.items():
+            # Kurse, RSI und alle Liquidity-Levels einmal berechnen und teilen
+            data = np.vstack([
+                df["close"].to_numpy(dtype=np.float64),
+                df["rsi"].to_numpy(dtype=np.float64),
+                *[calculate_liquidity_levels(df, window=w).to_numpy(dtype=np.float64) for w in windows],
+            ])
+            shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+            blocks.append(shm)
+            np.ndarray(data.shape, dtype=np.float64, buffer=shm.buf)[:] = data
+
+            for start in range(0, len(grid), chunk_size):
+                tasks.append({
+                    "shm_name": shm.name,
+                    "shape": data.shape,
+                    "symbol": symbol,
+                    "interval": interval,
+                    "windows": windows,
+                    "params": grid[start:start + chunk_size],
+                })
+
+        rows = []
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for chunk in pool.map(_run_chunk, tasks):
+                rows.extend(chunk)
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    results = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    return results.sort_values(rank_by, ascending=False, ignore_index=True)
+
+def save_results(results: pd.DataFrame, path: str):
+    """Speichert die Rangliste als CSV oder (bei Endung .parquet) als Parquet."""
+    if path.endswith(".parquet"):
+        results.to_parquet(path, index=False)
+    else:
+        results.to_csv(path, index=False)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Parameter-Sweep für die RSI + Liquidity Levels Strategie"
+    )
+    parser.add_argument('--symbols', type=str, default='BTCUSDT', help='Kommagetrennt, z. B. BTCUSDT,ETHUSDT')
+    parser.add_argument('--intervals', type=str, default='1h', help='Kommagetrennt, z. B. 1h,4h')
+    parser.add_argument('--lookback', type=str, default='60 day ago UTC', help='Lookback period, e.g., 60 day ago UTC')
+    parser.add_argument('--buy', type=str, default='20:40:5', help='buy_threshold, start:stop:step oder Liste')
+    parser.add_argument('--sell', type=str, default='60:80:5', help='sell_threshold, start:stop:step oder Liste')
+    parser.add_argument('--windows', type=str, default='10,20,50', help='Liquidity-Fenster, start:stop:step oder Liste')
+    parser.add_argument('--workers', type=int, default=None, help='Anzahl Prozesse (Standard: CPU-Anzahl)')
+    parser.add_argument('--rank-by', type=str, default='total_return', choices=RESULT_COLUMNS[5:])
+    parser.add_argument('--output', type=str, default='sweep_results.csv', help='CSV- oder .parquet-Datei')
+    args = parser.parse_args()
+
+    from crypto_warnsystem.utils.data_utils import get_klines
+
+    t0 = time.perf_counter()
+    datasets = {}
+    for symbol in args.symbols.split(","):
+        for interval in args.intervals.split(","):
+            df = get_klines(symbol=symbol, interval=interval, lookback=args.lookback)
+            datasets[(symbol, interval)] = feature_store.features(symbol, interval, df)
+    print(f"📊 {len(datasets)} Datensätze geladen ({time.perf_counter() - t0:.2f}s)")
+
+    t0 = time.perf_counter()
+    results = run_sweep(
+        datasets,
+        parse_range(args.buy),
+        parse_range(args.sell),
+        parse_range(args.windows),
+        max_workers=args.workers,
+        rank_by=args.rank_by,
+    )
+    print(f"✅ {len(results)} Kombinationen getestet ({time.perf_counter() - t0:.2f}s)")
+    print(results.head(10).to_string(index=False))
+
+    save_results(results, args.output)
+    print(f"💾 Ergebnisse gespeichert unter: {args.output}")
+
+if __name__ == "__main__":
+    main()
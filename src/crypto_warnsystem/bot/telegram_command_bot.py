@@ -3,76 +3,148 @@
 import sys
 import os
 
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# === Projektpfad einbinden ===
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-import time
+import re
 import logging
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from crypto_warnsystem.models.feature_store import feature_store
 from crypto_warnsystem.models.prediction_model import predict_future_direction
 from crypto_warnsystem.utils.data_utils import get_klines
 from crypto_warnsystem.utils.messaging_utils import send_message
-import telebot
-
-# === Projektpfad einbinden ===
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-if PROJECT_ROOT not in sys.path:
-    sys.path.insert(0, PROJECT_ROOT)
+from crypto_warnsystem.utils.metrics import metrics
+from crypto_warnsystem.utils.result_cache import ResultCache
 
 # === Umgebungsvariablen laden ===
 load_dotenv()
 
-# === Bot initialisieren ===
-bot = telebot.TeleBot(os.getenv("TELEGRAM_TOKEN"))
+DEFAULT_SYMBOL = os.getenv("BOT_DEFAULT_SYMBOL", "BTCUSDT")
+PROGNOSE_INTERVAL = "5m"
+# Gleichzeitig bearbeitete Befehle
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", 8))
+# Wie lange Antworten je Symbol wiederverwendet werden (Sekunden)
+BOT_CACHE_TTL = float(os.getenv("BOT_CACHE_TTL", 30))
+BOT_CACHE_STALE_TTL = float(os.getenv("BOT_CACHE_STALE_TTL", 300))
+
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9]{2,20}$")
+QUOTE_ASSETS = ("USDT", "BUSD", "USDC", "FDUSD", "BTC", "ETH", "BNB", "EUR", "TRY")
+
+# Ergebnisse aller Nutzer teilen sich einen Cache; Befehle laufen im Worker-Pool
+result_cache = ResultCache(ttl=BOT_CACHE_TTL, stale_ttl=BOT_CACHE_STALE_TTL)
+command_pool = ThreadPoolExecutor(max_workers=BOT_WORKERS, thread_name_prefix="bot-command")
+
+HELP_TEXT = ("📘 Befehle:\n"
+             f"/prognose [SYMBOL] – ML-Vorhersage (Standard: {DEFAULT_SYMBOL})\n"
+             "/verlauf [SYMBOL] – Kursveränderung 24h\n"
+             "/hilfe – Hilfe anzeigen")
+
+def parse_symbol(args) -> str:
+    """
+    Symbol aus den Befehlsargumenten, z. B. "eth" -> "ETHUSDT", "ethbtc" -> "ETHBTC".
+
+    :raises ValueError: bei ungültigem Symbol
+    """
+    if not args:
+        return DEFAULT_SYMBOL
+    symbol = args[0].upper()
+    if not SYMBOL_PATTERN.match(symbol):
+        raise ValueError(f"Ungültiges Symbol: {args[0]}")
+    if not symbol.endswith(QUOTE_ASSETS) or symbol in QUOTE_ASSETS:
+        symbol += "USDT"
+    return symbol
+
+def parse_command(text: str):
+    """Zerlegt "/prognose@MeinBot ETHUSDT" in ("/prognose", ["ETHUSDT"])."""
+    parts = text.strip().split()
+    if not parts:
+        return "", []
+    return parts[0].split("@", 1)[0].lower(), parts[1:]
+
+# === Berechnungen (Ergebnisse werden gecacht) ===
+def compute_prognose(symbol: str) -> str:
+    df = feature_store.features(symbol, PROGNOSE_INTERVAL, get_klines(symbol, interval=PROGNOSE_INTERVAL))
+    result = predict_future_direction(df)
+    if not result:
+        return f"⚠️ Keine Prognose für {symbol} verfügbar."
+    trend = "📈 Steigt" if result["direction"] == 1 else "📉 Fällt/Seitwärts"
+    conf = f"{result['confidence'] * 100:.1f}%"
+    return f"📊 Prognose {symbol} (4h): {trend}\nVertrauen: {conf}"
+
+def compute_verlauf(symbol: str) -> str:
+    df = get_klines(symbol, interval="1h", lookback="48 hours ago UTC")
+    now = df.iloc[-1]["close"]
+    past = df.iloc[-24]["close"]
+    change = ((now - past) / past) * 100
+    emoji = "📈" if change > 0 else "📉"
+    return f"{emoji} Kursveränderung {symbol} (24h): {change:.2f} %"
+
+CACHED_COMMANDS = {
+    "/prognose": compute_prognose,
+    "/verlauf": compute_verlauf,
+}
+
+def cached_reply(command: str, symbol: str) -> str:
+    compute = CACHED_COMMANDS[command]
+    return result_cache.get((command, symbol), lambda: compute(symbol))
 
 # === Befehle verarbeiten ===
-def handle_command(command, chat_id):
-    print(f"📨 Befehl empfangen: {command} von {chat_id}")
-    
+@metrics.timed()
+def handle_command(text, chat_id):
+    command, args = parse_command(text)
+    print(f"📨 Befehl empfangen: {command} {' '.join(args)} von {chat_id}")
+
     if command == "/start":
-        send_message(chat_id, "👋 Willkommen beim Crypto-Warn-Bot!\n\nVerfügbare Befehle:\n"
-                              "/prognose – Zeigt ML-Prognose für BTC\n"
-                              "/verlauf – Kursveränderung der letzten 24h\n"
-                              "/hilfe – Hilfe anzeigen")
-        
+        send_message(chat_id, "👋 Willkommen beim Crypto-Warn-Bot!\n\n" + HELP_TEXT)
+
     elif command == "/hilfe":
-        send_message(chat_id, "📘 Befehle:\n"
-                              "/prognose – ML-Vorhersage für BTCUSDT\n"
-                              "/verlauf – Kursveränderung 24h\n"
-                              "/hilfe – Hilfe anzeigen")
-        
-    elif command == "/prognose":
-        df = get_klines("BTCUSDT")
-        result = predict_future_direction(df)
-        if result:
-            trend = "📈 Steigt" if result["direction"] == 1 else "📉 Fällt/Seitwärts"
-            conf = f"{result['confidence'] * 100:.1f}%"
-            send_message(chat_id, f"📊 Prognose (4h): {trend}\nVertrauen: {conf}")
-        else:
-            send_message(chat_id, "⚠️ Keine Prognose verfügbar.")
-    
-    elif command == "/verlauf":
+        send_message(chat_id, HELP_TEXT)
+
+    elif command in CACHED_COMMANDS:
         try:
-            df = get_klines("BTCUSDT", interval="1h", lookback="48")
-            now = df.iloc[-1]["close"]
-            past = df.iloc[-24]["close"]
-            change = ((now - past) / past) * 100
-            emoji = "📈" if change > 0 else "📉"
-            send_message(chat_id, f"{emoji} Kursveränderung (24h): {change:.2f} %")
+            symbol = parse_symbol(args)
+            send_message(chat_id, cached_reply(command, symbol))
         except Exception as e:
+            logging.warning(f"{command} fehlgeschlagen: {e}")
             send_message(chat_id, f"❌ Fehler beim Abrufen der Daten: {e}")
-    
+
     else:
         send_message(chat_id, "❓ Unbekannter Befehl. Nutze /hilfe.")
 
-# === Telegram-Nachrichten weiterleiten ===
-@bot.message_handler(func=lambda message: True)
-def route_message(message):
-    print(f"📥 Nachricht empfangen: {message.text}")
-    handle_command(message.text.strip().lower(), message.chat.id)
+def dispatch(text, chat_id):
+    """Gibt den Befehl an den Worker-Pool ab, damit der Polling-Thread sofort frei ist."""
+    future = command_pool.submit(handle_command, text, chat_id)
+    future.add_done_callback(
+        lambda f: f.exception() and logging.error(f"Befehl '{text}' abgebrochen: {f.exception()}"))
+    return future
 
 # === Start ===
-print("🤖 Bot läuft und wartet auf Befehle...")
-bot.polling()
+def main():
+    import telebot
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    bot = telebot.TeleBot(os.getenv("TELEGRAM_TOKEN"))
+    metrics.serve_from_env()
+
+    # === Telegram-Nachrichten weiterleiten ===
+    @bot.message_handler(func=lambda message: True)
+    def route_message(message):
+        print(f"📥 Nachricht empfangen: {message.text}")
+        dispatch(message.text or "", message.chat.id)
+
+    # Standard-Symbol im Hintergrund frisch halten
+    for command, compute in CACHED_COMMANDS.items():
+        result_cache.keep_warm((command, DEFAULT_SYMBOL), lambda compute=compute: compute(DEFAULT_SYMBOL))
+
+    print(f"🤖 Bot läuft und wartet auf Befehle... ({BOT_WORKERS} Worker)")
+    try:
+        bot.polling()
+    finally:
+        result_cache.stop()
+        command_pool.shutdown(wait=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# cli.py
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+
+# Project root so that "import crypto_warnsystem" works
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+PROG = "crypto-warnsystem"
+
+# Befehl -> (Modul mit main(), feste Zusatzargumente, Hilfetext).
+# Die Module werden erst beim Aufruf des Befehls importiert.
+COMMANDS = {
+    "backtest": ("crypto_warnsystem.backtester.run_backtest", [], "RSI-/Liquidity-Backtest"),
+    "walkforward": ("crypto_warnsystem.backtester.backtester", [], "Walk-Forward-Backtest der ML-Prognose"),
+    "sweep": ("crypto_warnsystem.backtester.sweep", [], "Parameter-Sweep des Backtests"),
+    "train": ("crypto_warnsystem.models.training_pipeline", [], "Modell über viele Symbole trainieren"),
+    "cv": ("crypto_warnsystem.models.model_selection", [], "Modellkonfigurationen per Walk-Forward-CV vergleichen"),
+    "export": ("crypto_warnsystem.models.model_artifact", [], "joblib-Modell als Artefakt exportieren"),
+    "scan": ("crypto_warnsystem.utils.scheduler", ["--scan", "--once"], "Einmaliger Scan vieler Symbole"),
+    "schedule": ("crypto_warnsystem.utils.scheduler", [], "Automatische Prognosen im festen Intervall"),
+    "backfill": ("crypto_warnsystem.utils.backfill", [], "Lange Kerzenhistorien parallel nachladen"),
+    "stream": ("crypto_warnsystem.utils.kline_stream", [], "Kline-Streaming in den Kerzenspeicher"),
+    "bot": ("crypto_warnsystem.bot.telegram_command_bot", [], "Telegram-Bot starten"),
+}
+
+# Module, deren reine Importzeit importtime misst
+IMPORT_MODULES = [
+    "crypto_warnsystem.cli",
+    "crypto_warnsystem.utils.data_utils",
+    "crypto_warnsystem.models.prediction_model",
+    "crypto_warnsystem.bot.telegram_command_bot",
+    "crypto_warnsystem.utils.scheduler",
+    "crypto_warnsystem.backtester.run_backtest",
+]
+
+
+def run_command(command: str, argv: list):
+    """Importiert das Modul des Befehls und ruft dessen main() mit argv auf."""
+    module_name, fixed_args, _ = COMMANDS[command]
+    module = importlib.import_module(module_name)
+    saved = sys.argv
+    sys.argv = [f"{PROG} {command}", *fixed_args, *argv]
+    try:
+        return module.main()
+    finally:
+        sys.argv = saved
+
+
+def prognose(argv: list) -> str:
+    """Einmalige Prognose wie /prognose im Bot, ohne den Bot zu starten."""
+    parser = argparse.ArgumentParser(prog=f"{PROG} prognose", description="Einmalige ML-Prognose")
+    parser.add_argument('symbol', nargs='?', default=None, help='z. B. BTCUSDT oder eth')
+    args = parser.parse_args(argv)
+
+    from crypto_warnsystem.bot.telegram_command_bot import compute_prognose, parse_symbol
+
+    reply = compute_prognose(parse_symbol([args.symbol] if args.symbol else []))
+    print(reply)
+    return reply
+
+
+def measure_import(module: str, repeat: int = 3) -> float:
+    """Schnellste Importzeit (ms) von module in einem frischen Interpreter."""
+    code = (f"import sys, time; sys.path.insert(0, {PROJECT_ROOT!r}); t = time.perf_counter(); "
+            f"import {module}; print((time.perf_counter() - t) * 1000)")
+    import tempfile
+
+    best = float("inf")
+    # In einem leeren Verzeichnis: Module dürfen beim Import nichts ins Arbeitsverzeichnis schreiben
+    with tempfile.TemporaryDirectory() as cwd:
+        for _ in range(repeat):
+            out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=cwd)
+            best = min(best, float(out.stdout.strip().splitlines()[-1]))
+    return best
+
+
+def importtime(argv: list) -> dict:
+    """
+    Misst die Importzeit der Einstiegsmodule. Mit --baseline wird gegen eine
+    gespeicherte Messung verglichen; der Exit-Code ist 1, wenn ein Modul mehr
+    als --tolerance langsamer geworden ist.
+    """
+    parser = argparse.ArgumentParser(prog=f"{PROG} importtime", description="Importzeiten der Einstiegsmodule messen")
+    parser.add_argument('modules', nargs='*', default=IMPORT_MODULES, help='Module (Standard: alle Einstiegsmodule)')
+    parser.add_argument('--repeat', type=int, default=3, help='Messungen je Modul (die schnellste zählt)')
+    parser.add_argument('--output', type=str, default=None, help='Ergebnis als JSON speichern')
+    parser.add_argument('--baseline', type=str, default=None, help='JSON einer früheren Messung zum Vergleich')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Erlaubte Verschlechterung (0.25 = +25 %%)')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results, regressions = {}, []
+    for module in args.modules:
+        ms = results[module] = round(measure_import(module, args.repeat), 1)
+        line = f"⏱️ {module}: {ms:.1f} ms"
+        if module in baseline:
+            ratio = ms / max(baseline[module], 1e-9)
+            line += f" (Basis {baseline[module]:.1f} ms, x{ratio:.2f})"
+            if ratio > 1 + args.tolerance:
+                regressions.append(module)
+                line += " ⚠️"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        print(f"❌ Importzeit verschlechtert: {', '.join(regressions)}")
+        sys.exit(1)
+    return results
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=PROG, description="Crypto-Warnsystem: alle Werkzeuge über einen Befehl")
+    sub = parser.add_subparsers(dest="command", metavar="BEFEHL")
+    # Argumente reicht main() unverändert an den Befehl durch
+    for name, (_, _, text) in COMMANDS.items():
+        sub.add_parser(name, help=text, add_help=False)
+    sub.add_parser("prognose", help="Einmalige ML-Prognose für ein Symbol", add_help=False)
+    sub.add_parser("importtime", help="Importzeiten der Einstiegsmodule messen", add_help=False)
+    return parser
+
+
+def main(argv: list = None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv[:1])
+    if args.command is None:
+        parser.print_help()
+        return None
+    rest += argv[1:]
+
+    # .env einmal zentral laden, bevor Module ihre Einstellungen lesen
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    if os.getenv("BINANCE_REPLAY"):
+        # Speicher umleiten, bevor die Befehlsmodule ihre Standardpfade lesen
+        from crypto_warnsystem.utils.replay_client import isolate_stores
+        isolate_stores()
+
+    if args.command == "importtime":
+        return importtime(rest)
+
+    from crypto_warnsystem.utils.metrics import metrics, profiled
+
+    # METRICS_PORT startet /metrics, PROFILE=cprofile|pyinstrument schreibt ein Profil des Befehls
+    metrics.serve_from_env()
+    try:
+        with profiled(args.command):
+            if args.command == "prognose":
+                return prognose(rest)
+            return run_command(args.command, rest)
+    finally:
+        if metrics.enabled and metrics.snapshot():
+            print(metrics.summary())
+
+if __name__ == "__main__":
+    main()
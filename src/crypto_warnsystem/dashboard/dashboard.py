@@ -2,6 +2,7 @@
 import streamlit as st
 import logging
 import os
+import threading
 from datetime import datetime
 
 import sys
@@ -17,9 +18,11 @@ from dotenv import load_dotenv
 
 # Eigene Module
 from crypto_warnsystem.utils.data_utils import get_klines
-from crypto_warnsystem.utils.indicator_utils import calculate_indicators
-from crypto_warnsystem.models.prediction_model import predict_future_direction
+from crypto_warnsystem.models.feature_store import FEATURES, feature_store
+from crypto_warnsystem.models.prediction_model import model_registry, predict_future_direction
 from crypto_warnsystem.utils.messaging_utils import send_telegram
+from crypto_warnsystem.utils.prediction_history import PredictionHistory
+from crypto_warnsystem.utils.alert_engine import AlertEngine
 
 # === Logging konfigurieren ===
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -29,6 +32,51 @@ load_dotenv()
 DEFAULT_PRICE_DROP = int(os.getenv("PRICE_DROP_THRESHOLD", 3))
 DEFAULT_RSI_OVERBOUGHT = int(os.getenv("RSI_OVERBOUGHT", 70))
 DEFAULT_RSI_OVERSOLD = int(os.getenv("RSI_OVERSOLD", 30))
+KLINE_INTERVAL = os.getenv("DASHBOARD_INTERVAL", "5m")
+# Wie lange Kerzen/Indikatoren je Symbol zwischengespeichert werden (Sekunden)
+CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", 60))
+
+# === Caches (gelten für alle Sitzungen und Reruns) ===
+@st.cache_data(ttl=CACHE_TTL, show_spinner="Lade Kursdaten...")
+def load_market_data(symbol: str, interval: str) -> pd.DataFrame:
+    """Kerzen + Indikatoren je Symbol/Intervall; Indikatoren kommen aus dem Feature-Store."""
+    df = get_klines(symbol, interval=interval)
+    return feature_store.features(symbol, interval, df)
+
+@st.cache_resource
+def resident_model():
+    """Hält das Modell im Prozess; die Registry lädt nur bei geänderter Datei neu."""
+    model_registry.get()
+    return model_registry
+
+@st.cache_resource
+def prediction_history() -> PredictionHistory:
+    return PredictionHistory()
+
+@st.cache_resource
+def alert_engine() -> AlertEngine:
+    """Alarmregeln mit Cooldown/Hysterese; Zustand bleibt über Neustarts erhalten."""
+    return AlertEngine()
+
+@st.cache_resource
+def published_events():
+    """Bereits verarbeitete Ereignisse (Symbol, Kerze, Art) – verhindert Doppel-Meldungen bei Reruns."""
+    return set(), threading.Lock()
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_prediction(symbol: str, interval: str, candle_time):
+    """ML-Prognose für die letzte Kerze; wird pro Kerze nur einmal berechnet."""
+    resident_model()
+    return predict_future_direction(load_market_data(symbol, interval))
+
+def publish_once(key) -> bool:
+    """True genau beim ersten Aufruf mit diesem Schlüssel (prozessweit)."""
+    seen, lock = published_events()
+    with lock:
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
 
 # === GUI ===
 st.set_page_config(page_title="Crypto Warnsystem", layout="wide")
@@ -38,63 +86,72 @@ st.markdown("Live-Datenanalyse + Telegram-Alarmierung")
 # Coin-Auswahl
 symbol = st.selectbox("Wähle Coin-Paar:", ["BTCUSDT", "ETHUSDT", "SOLUSDT"])
 
-# Schwellenwerte einstellbar (laden aus .env als Defaultwerte)
-st.sidebar.header("🔧 Einstellungen")
-price_drop_threshold = st.sidebar.slider("🔻 Preis-Sturz-Schwelle (%)", 1, 20, DEFAULT_PRICE_DROP)
-rsi_overbought = st.sidebar.slider("📈 RSI überkauft ab", 60, 90, DEFAULT_RSI_OVERBOUGHT)
-rsi_oversold = st.sidebar.slider("📉 RSI überverkauft ab", 10, 50, DEFAULT_RSI_OVERSOLD)
-
-# Daten abrufen und Indikatoren berechnen
-df = get_klines(symbol)
-df = calculate_indicators(df)
+# Daten abrufen und Indikatoren berechnen (gecacht)
+df = load_market_data(symbol, KLINE_INTERVAL)
+candle_time = df.index[-1]
 
 # Aktuelle Werte
 last = df.iloc[-1]
 previous = df.iloc[-2]
 
-drop_pct = (previous['close'] - last['close']) / previous['close']
-
 st.metric("📊 Aktueller Preis", f"{last['close']:.2f} USD")
 st.metric("📉 RSI", f"{last['rsi']:.2f}")
 st.metric("📈 MACD", f"{last['macd']:.4f}")
 
-# Warnlogik
-alerts = []
-trade_signals = []
-signal_log = []
-
-# === Scoring-System ===
-score = 0
-if drop_pct >= price_drop_threshold / 100:
-    alerts.append(f"🚨 Preissturz: {symbol} fiel um {drop_pct*100:.2f}%")
-    score += 2
-if last['rsi'] >= rsi_overbought:
-    alerts.append(f"📈 RSI überkauft: {last['rsi']:.2f}")
-    signal_log.append((datetime.now(), symbol, "Verkauf", "RSI überkauft"))
-    trade_signals.append("💡 Mögliche Verkaufsgelegenheit (RSI überkauft)")
-    score -= 1
-elif last['rsi'] <= rsi_oversold:
-    alerts.append(f"📉 RSI überverkauft: {last['rsi']:.2f}")
-    signal_log.append((datetime.now(), symbol, "Kauf", "RSI überverkauft"))
-    trade_signals.append("💰 Mögliche Kaufgelegenheit (RSI überverkauft)")
-    score += 2
-if last['macd'] > 0 and previous['macd'] < 0:
-    alerts.append("🟢 MACD Crossover: Aufwärtstrend")
-    signal_log.append((datetime.now(), symbol, "Kauf", "MACD Crossover oben"))
-    trade_signals.append("💰 Mögliche Kaufgelegenheit (MACD Crossover nach oben)")
-    score += 2
-elif last['macd'] < 0 and previous['macd'] > 0:
-    alerts.append("🔴 MACD Crossover: Abwärtstrend")
-    signal_log.append((datetime.now(), symbol, "Verkauf", "MACD Crossover unten"))
-    trade_signals.append("⚠️ Mögliche Verkaufsgelegenheit (MACD Crossover nach unten)")
-    score -= 2
-
-st.subheader("📈 Gesamtscore")
-st.metric("Handelsscore", score)
+# === Scoring + Alarme: Schieberegler lösen nur diesen Teil neu aus ===
+@st.fragment
+def alerts_panel(symbol, last, previous):
+    # Schwellenwerte einstellbar (laden aus .env als Defaultwerte)
+    with st.expander("🔧 Einstellungen", expanded=False):
+        price_drop_threshold = st.slider("🔻 Preis-Sturz-Schwelle (%)", 1, 20, DEFAULT_PRICE_DROP)
+        rsi_overbought = st.slider("📈 RSI überkauft ab", 60, 90, DEFAULT_RSI_OVERBOUGHT)
+        rsi_oversold = st.slider("📉 RSI überverkauft ab", 10, 50, DEFAULT_RSI_OVERSOLD)
+
+    engine = alert_engine()
+    active, to_notify = engine.process(symbol, last, previous, {
+        "price_drop_threshold": price_drop_threshold,
+        "rsi_overbought": rsi_overbought,
+        "rsi_oversold": rsi_oversold,
+    })
+    alerts = [a["alert"] for a in active]
+    trade_signals = [a["signal"] for a in active if a["signal"]]
+    signal_log = engine.signal_log(symbol, active)
+    score = engine.score(active)
+
+    st.subheader("📈 Gesamtscore")
+    st.metric("Handelsscore", score)
+
+    # Alarme anzeigen
+    st.subheader("🚨 Aktive Alarme")
+    if alerts:
+        for alert in alerts:
+            st.error(alert)
+    else:
+        st.success("Keine aktiven Alarme")
+
+    # Handelsideen anzeigen (Telegram nur, wenn die Alarm-Engine die Meldung freigibt)
+    st.subheader("💡 Handelsideen")
+    if trade_signals:
+        for signal in trade_signals:
+            st.info(signal)
+        for alert in to_notify:
+            send_telegram(f"📈 {symbol} Signal: {alert['signal']}")
+    else:
+        st.text("Keine aktuellen Kauf-/Verkaufssignale")
+
+    # Signal-Historie anzeigen
+    st.subheader("📄 Signal-Historie (letzte Auswertung)")
+    if signal_log:
+        history_df = pd.DataFrame(signal_log, columns=["Zeit", "Symbol", "Aktion", "Begründung"])
+        st.dataframe(history_df)
+    else:
+        st.caption("Keine Signale im aktuellen Durchlauf erkannt.")
+
+alerts_panel(symbol, last, previous)
 
 # ML-Prognose (4h Vorhersage)
 st.subheader("🔮 4h Prognose basierend auf historischem ML-Modell")
-prediction_result = predict_future_direction(df)
+prediction_result = load_prediction(symbol, KLINE_INTERVAL, candle_time)
 
 if prediction_result:
     col1, col2 = st.columns(2)
@@ -112,40 +169,34 @@ if prediction_result:
     })
     st.bar_chart(chart_data.set_index('Prognose'))
 
-    # Prognoseverlauf speichern
-    history_path = "prognose_history.csv"
-    new_entry = {
-        "timestamp": datetime.now(),
-        "direction": prediction_result["direction"],
-        "confidence": prediction_result["confidence"]
-    }
-    history_df = pd.DataFrame([new_entry])
-    if os.path.exists(history_path):
-        old_df = pd.read_csv(history_path)
-        old_df = pd.concat([old_df, history_df], ignore_index=True)
+    if prediction_result['direction'] == 1:
+        st.success("📈 ML-Prognose: Markt könnte steigen")
     else:
-        old_df = history_df
-    old_df.to_csv(history_path, index=False)
-
-    # Telegram-Meldung senden
-    try:
-        if prediction_result['direction'] == 1:
-            st.success("📈 ML-Prognose: Markt könnte steigen")
-            send_telegram(f"📣 Prognose: {symbol} wird in den nächsten 4h wahrscheinlich steigen. Vertrauen: {prediction_result['confidence']*100:.1f}%")
-        else:
-            st.error("📉 ML-Prognose: Markt könnte fallen oder seitwärts laufen")
-            send_telegram(f"📣 Prognose: {symbol} wird in den nächsten 4h wahrscheinlich fallen/seitwärts. Vertrauen: {prediction_result['confidence']*100:.1f}%")
-    except Exception as e:
-        logging.warning(f"Telegram-Versand fehlgeschlagen: {e}")
+        st.error("📉 ML-Prognose: Markt könnte fallen oder seitwärts laufen")
+
+    # Verlauf speichern und Telegram-Meldung senden – einmal je neuer Kerze
+    if publish_once((symbol, candle_time, "prognose")):
+        prediction_history().append(
+            symbol,
+            prediction_result["direction"],
+            prediction_result["confidence"],
+            model_version=prediction_result.get("model_version"),
+            features=last[FEATURES].to_dict(),
+        )
+        try:
+            if prediction_result['direction'] == 1:
+                send_telegram(f"📣 Prognose: {symbol} wird in den nächsten 4h wahrscheinlich steigen. Vertrauen: {prediction_result['confidence']*100:.1f}%")
+            else:
+                send_telegram(f"📣 Prognose: {symbol} wird in den nächsten 4h wahrscheinlich fallen/seitwärts. Vertrauen: {prediction_result['confidence']*100:.1f}%")
+        except Exception as e:
+            logging.warning(f"Telegram-Versand fehlgeschlagen: {e}")
 else:
     st.warning("Keine Vorhersage verfügbar – möglicherweise unzureichende Daten.")
 
-# Trendverlauf
-if os.path.exists("prognose_history.csv"):
+# Trendverlauf (nur die Einträge der letzten 24h werden gelesen)
+df_hist = prediction_history().query(since=datetime.now() - pd.Timedelta(hours=24), symbol=symbol)
+if not df_hist.empty:
     st.subheader("📉 Prognose-Trendverlauf (letzte 24h)")
-    df_hist = pd.read_csv("prognose_history.csv")
-    df_hist["timestamp"] = pd.to_datetime(df_hist["timestamp"])
-    df_hist = df_hist[df_hist["timestamp"] >= datetime.now() - pd.Timedelta(hours=24)]
 
     fig2, ax2 = plt.subplots()
     ax2.plot(df_hist["timestamp"], df_hist["confidence"], label="Confidence", color="green")
@@ -165,31 +216,6 @@ ax.set_title(f"Preis + SMA + Bollinger ({symbol})")
 ax.legend()
 st.pyplot(fig)
 
-# Alarme anzeigen
-st.subheader("🚨 Aktive Alarme")
-if alerts:
-    for alert in alerts:
-        st.error(alert)
-else:
-    st.success("Keine aktiven Alarme")
-
-# Handelsideen anzeigen
-st.subheader("💡 Handelsideen")
-if trade_signals:
-    for signal in trade_signals:
-        st.info(signal)
-        send_telegram(f"📈 {symbol} Signal: {signal}")
-else:
-    st.text("Keine aktuellen Kauf-/Verkaufssignale")
-
-# Signal-Historie anzeigen
-st.subheader("📄 Signal-Historie (letzte Auswertung)")
-if signal_log:
-    history_df = pd.DataFrame(signal_log, columns=["Zeit", "Symbol", "Aktion", "Begründung"])
-    st.dataframe(history_df)
-else:
-    st.caption("Keine Signale im aktuellen Durchlauf erkannt.")
-
 # Telegram-Testknopf
 if st.button("📤 Telegram-Testnachricht senden"):
     send_telegram(f"📣 Test: Das Crypto-Dashboard ist verbunden! (Aktiv: {symbol})")
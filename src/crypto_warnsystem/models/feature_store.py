@@ -0,0 +1,306 @@
+# feature_store.py
+
+import json
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from crypto_warnsystem.utils.kline_store import now_ms as _now_ms
+from crypto_warnsystem.utils.metrics import timed
+from crypto_warnsystem.utils.streaming_indicators import INDICATOR_COLUMNS, IncrementalIndicators
+
+try:
+    import fcntl
+except ImportError:  # Windows: ohne Dateisperre
+    fcntl = None
+
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", os.path.join("data", "features"))
+
+# Features, wie im Training (Reihenfolge ist Teil des Modells)
+FEATURES = ["rsi", "macd", "bb_upper", "bb_lower", "sma50", "sma200", "close"]
+
+# Erhöhen, wenn sich Berechnung oder Format der Features ändern → Neuaufbau
+FEATURE_VERSION = 1
+
+FEATURE_DTYPE = np.dtype("<f4")
+TIME_DTYPE = np.dtype("<i8")
+
+
+def _time_ms(index: pd.Index) -> np.ndarray:
+    return np.asarray(pd.DatetimeIndex(index).as_unit("ms").asi8, dtype=np.int64)
+
+
+class FeatureMatrix:
+    """
+    Schreibgeschützte Sicht auf die gespeicherten Features eines Symbols/Intervalls.
+
+    time und columns[name] sind Memory-Maps der Spaltendateien, es wird nichts kopiert.
+    """
+
+    def __init__(self, time_ms: np.ndarray, columns: dict, version: str, state: dict = None):
+        self.time = time_ms
+        self.columns = columns
+        self.version = version
+        # Indikator-Zustand nach der letzten Zeile (nur bei vollständig geladenen Daten)
+        self.state = state
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        index = pd.to_datetime(np.asarray(self.time), unit="ms")
+        index.name = "time"
+        return index
+
+    def slice(self, start: int = None, stop: int = None) -> "FeatureMatrix":
+        """Zeilenbereich als neue Sicht (weiterhin ohne Kopie)."""
+        rows = slice(start, stop)
+        return FeatureMatrix(self.time[rows], {k: v[rows] for k, v in self.columns.items()}, self.version)
+
+    def matrix(self, features=FEATURES) -> np.ndarray:
+        """
+        Feature-Matrix (Zeilen x Features) in float32 für scikit-learn.
+
+        Die Spalten werden nur einmal nebeneinander gelegt (spaltenweise im Speicher,
+        wie sie auch gespeichert sind); eine Typumwandlung findet nicht mehr statt.
+        """
+        X = np.empty((len(self), len(features)), dtype=FEATURE_DTYPE, order="F")
+        for pos, name in enumerate(features):
+            X[:, pos] = self.columns[name]
+        return X
+
+    def frame(self, features=FEATURES) -> pd.DataFrame:
+        return pd.DataFrame({name: self.columns[name] for name in features}, index=self.index)
+
+
+class FeatureStore:
+    """
+    Versionierte, spaltenweise gespeicherte Feature-Matrizen je Symbol/Intervall.
+
+    Pro Symbol/Intervall gibt es ein Verzeichnis mit einer Datei je Spalte
+    (time als int64, alle Features als float32) und einem manifest.json mit
+    Version, Zeilenzahl und dem Zustand der inkrementellen Indikatoren. Neue
+    abgeschlossene Kerzen werden angehängt und nur einmal berechnet; Training,
+    Prognose und Backtests lesen dieselben Dateien per Memory-Map.
+    """
+
+    def __init__(self, root: str = None, features=FEATURES):
+        self.root = root or FEATURE_STORE_DIR
+        self.feature_names = list(features)
+
+    @property
+    def version(self) -> str:
+        return f"v{FEATURE_VERSION}"
+
+    def path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, f"{symbol.upper()}_{interval}")
+
+    def _column_path(self, symbol: str, interval: str, name: str, generation: int) -> str:
+        # Jeder Neuaufbau schreibt eine neue Generation, offene Memory-Maps bleiben gültig
+        suffix = "i8" if name == "time" else "f32"
+        return os.path.join(self.path(symbol, interval), f"{name}.{generation}.{suffix}")
+
+    def _manifest_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.path(symbol, interval), "manifest.json")
+
+    def _raw_manifest(self, symbol: str, interval: str) -> dict:
+        try:
+            with open(self._manifest_path(symbol, interval)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def manifest(self, symbol: str, interval: str) -> dict:
+        """Manifest des Datensatzes oder {} wenn keiner existiert bzw. die Version veraltet ist."""
+        manifest = self._raw_manifest(symbol, interval)
+        if manifest.get("version") != FEATURE_VERSION or manifest.get("features") != self.feature_names:
+            return {}
+        return manifest
+
+    def _write_manifest(self, symbol: str, interval: str, manifest: dict):
+        path = self._manifest_path(symbol, interval)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, path)
+
+    @contextmanager
+    def _locked(self, symbol: str, interval: str):
+        # Verhindert, dass zwei Prozesse gleichzeitig an dieselben Spalten anhängen
+        os.makedirs(self.path(symbol, interval), exist_ok=True)
+        with open(os.path.join(self.path(symbol, interval), ".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def load(self, symbol: str, interval: str) -> FeatureMatrix:
+        """
+        Liest die gespeicherten Features als Memory-Maps (leer, wenn nichts gespeichert ist).
+        Maßgeblich ist die Zeilenzahl im Manifest; halb geschriebene Anhänge werden ignoriert.
+        """
+        names = ["time"] + self.feature_names
+        for attempt in range(3):
+            manifest = self.manifest(symbol, interval)
+            rows = manifest.get("rows", 0)
+            if rows == 0:
+                arrays = {name: np.empty(0, dtype=TIME_DTYPE if name == "time" else FEATURE_DTYPE) for name in names}
+                break
+            try:
+                arrays = {
+                    name: np.memmap(self._column_path(symbol, interval, name, manifest["generation"]),
+                                    dtype=TIME_DTYPE if name == "time" else FEATURE_DTYPE,
+                                    mode="r", shape=(rows,))
+                    for name in names
+                }
+                break
+            except FileNotFoundError:
+                # Ein anderer Prozess hat gerade neu aufgebaut → Manifest neu lesen
+                if attempt == 2:
+                    raise
+        time_ms = arrays.pop("time")
+        return FeatureMatrix(time_ms, arrays, self.version, manifest.get("state"))
+
+    def _write_rows(self, symbol: str, interval: str, generation: int, time_ms: np.ndarray,
+                    values: pd.DataFrame, rows: int):
+        """Schreibt die Zeilen ab Position rows; Reste eines abgebrochenen Anhängens werden überschrieben."""
+        for name in ["time"] + self.feature_names:
+            path = self._column_path(symbol, interval, name, generation)
+            data = time_ms.astype(TIME_DTYPE) if name == "time" else values[name].to_numpy(dtype=FEATURE_DTYPE)
+            with open(path, "r+b" if rows else "wb") as f:
+                f.truncate(rows * data.itemsize)
+                f.seek(rows * data.itemsize)
+                f.write(np.ascontiguousarray(data).tobytes())
+
+    def _remove_generations(self, symbol: str, interval: str, keep: int):
+        directory = self.path(symbol, interval)
+        for filename in os.listdir(directory):
+            parts = filename.split(".")
+            if len(parts) == 3 and parts[1].isdigit() and int(parts[1]) != keep:
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except OSError:
+                    pass
+
+    def _compute(self, indicators: IncrementalIndicators, closes: pd.Series) -> pd.DataFrame:
+        values = indicators.update_many(closes)
+        values["close"] = closes.to_numpy(dtype=float)
+        return values
+
+    def update(self, symbol: str, interval: str, df: pd.DataFrame, now_ms: int = None) -> FeatureMatrix:
+        """
+        Übernimmt die abgeschlossenen Kerzen aus df (OHLCV-Frame wie von get_klines).
+
+        Beginnt df innerhalb des gespeicherten Zeitraums (oder direkt danach),
+        werden nur die Kerzen nach der zuletzt gespeicherten berechnet und
+        angehängt; ältere Kerzen von df sind schon gespeichert. Neu aufgebaut
+        wird nur, wenn df den Speicher vollständig abdeckt und weiter
+        zurückreicht oder wenn zwischen Speicher und df Kerzen fehlen. Reicht
+        df weiter zurück, endet aber vor der letzten gespeicherten Kerze, bleibt
+        der Speicher unverändert (features() berechnet die älteren Kerzen dann
+        direkt aus df).
+        """
+        from binance.helpers import interval_to_milliseconds
+
+        interval_ms = interval_to_milliseconds(interval)
+        now_ms = _now_ms() if now_ms is None else now_ms
+        times = _time_ms(df.index)
+        closed = times + interval_ms <= now_ms
+        times, closes = times[closed], df["close"][closed]
+        if len(times) == 0:
+            return self.load(symbol, interval)
+
+        with self._locked(symbol, interval):
+            manifest = self.manifest(symbol, interval)
+            rows = manifest.get("rows", 0)
+            new = times > manifest.get("last_time", -1)
+            if rows == 0:
+                contiguous = False
+            elif times[0] < manifest["first_time"]:
+                # Weiter zurück: neu aufbauen nur, wenn df den Speicher vollständig abdeckt
+                if times[-1] < manifest["last_time"]:
+                    return self.load(symbol, interval)
+                contiguous = False
+            else:
+                # Anhängen, wenn die erste neue Kerze direkt auf die gespeicherte folgt
+                contiguous = not new.any() or times[new][0] == manifest["last_time"] + interval_ms
+
+            if contiguous:
+                if new.any():
+                    indicators = IncrementalIndicators.from_state(manifest["state"])
+                    values = self._compute(indicators, closes[new])
+                    self._write_rows(symbol, interval, manifest["generation"], times[new], values, rows)
+                    manifest.update(rows=rows + int(new.sum()), last_time=int(times[-1]),
+                                    state=indicators.to_state())
+                    self._write_manifest(symbol, interval, manifest)
+            else:
+                generation = self._raw_manifest(symbol, interval).get("generation", 0) + 1
+                indicators = IncrementalIndicators()
+                values = self._compute(indicators, closes)
+                self._write_rows(symbol, interval, generation, times, values, 0)
+                self._write_manifest(symbol, interval, {
+                    "version": FEATURE_VERSION,
+                    "generation": generation,
+                    "features": self.feature_names,
+                    "interval": interval,
+                    "rows": len(times),
+                    "first_time": int(times[0]),
+                    "last_time": int(times[-1]),
+                    "state": indicators.to_state(),
+                })
+                self._remove_generations(symbol, interval, keep=generation)
+
+        return self.load(symbol, interval)
+
+    @timed("features")
+    def features(self, symbol: str, interval: str, df: pd.DataFrame, now_ms: int = None) -> pd.DataFrame:
+        """
+        Ersatz für calculate_indicators(df): df mit den Indikator-Spalten.
+
+        Abgeschlossene Kerzen kommen aus dem Speicher; die noch offene Kerze wird
+        auf einer Kopie des Indikator-Zustands berechnet und nicht gespeichert.
+        """
+        stored = self.update(symbol, interval, df, now_ms=now_ms)
+        result = df.copy()
+        for name in INDICATOR_COLUMNS:
+            result[name] = np.nan
+
+        times = _time_ms(df.index)
+        pos = np.searchsorted(stored.time, times)
+        found = np.zeros(len(times), dtype=bool)
+        if len(stored):
+            inside = pos < len(stored)
+            found[inside] = stored.time[pos[inside]] == times[inside]
+        for name in INDICATOR_COLUMNS:
+            result.loc[found, name] = stored[name][pos[found]]
+
+        pending = ~found & (times > (stored.time[-1] if len(stored) else -1))
+        if pending.any():
+            if stored.state is not None:
+                indicators = IncrementalIndicators.from_state(stored.state)
+            else:
+                indicators = IncrementalIndicators()
+            values = indicators.update_many(df["close"][pending])
+            for name in INDICATOR_COLUMNS:
+                result.loc[pending, name] = values[name].to_numpy()
+
+        # Kerzen vor dem gespeicherten Zeitraum (df reicht weiter zurück als der Speicher)
+        earlier = ~found & ~pending
+        if earlier.any():
+            stop = int(np.flatnonzero(earlier)[-1]) + 1
+            values = IncrementalIndicators().update_many(df["close"].iloc[:stop])
+            for name in INDICATOR_COLUMNS:
+                result.loc[earlier, name] = values[name].to_numpy()[earlier[:stop]]
+        return result
+
+
+feature_store = FeatureStore()
@@ -0,0 +1,164 @@
+# model_artifact.py
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+# Project root so that "import crypto_warnsystem" works
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from crypto_warnsystem.models.forest_runtime import ARRAY_DTYPES, FlatForest, flatten_forest
+from crypto_warnsystem.models.model_registry import file_sha256
+
+ARTIFACT_DIR = os.path.join("model", "forest")
+MANIFEST_NAME = "manifest.json"
+ARTIFACT_FORMAT = "forest-v1"
+
+# Optional, damit früher exportierte Artefakte ladbar bleiben (NaN läuft dann rechts)
+OPTIONAL_ARRAYS = {"missing_left"}
+
+
+class ArtifactError(ValueError):
+    """Artefakt fehlt, ist unvollständig oder passt nicht zum Manifest."""
+
+
+def _content_hash(files: dict) -> str:
+    h = hashlib.sha256()
+    for name in sorted(files):
+        h.update(f"{name}:{files[name]}\n".encode())
+    return h.hexdigest()
+
+
+def export_forest(model, path: str = ARTIFACT_DIR, features=None, training_window: dict = None,
+                  metrics: dict = None) -> dict:
+    """
+    Schreibt das Modell als Verzeichnis mit .npy-Arrays und einem manifest.json.
+
+    Das Verzeichnis wird vollständig neben dem Ziel aufgebaut und dann ersetzt,
+    Leser sehen also nie ein halb geschriebenes Artefakt.
+
+    :return: Manifest
+    """
+    features = list(features if features is not None else getattr(model, "feature_names_in_", []))
+    if len(features) != model.n_features_in_:
+        raise ArtifactError("Feature-Namen fehlen oder passen nicht zum Modell")
+
+    arrays = flatten_forest(model)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    files = {}
+    for name, array in arrays.items():
+        filename = f"{name}.npy"
+        np.save(os.path.join(tmp, filename), array, allow_pickle=False)
+        files[filename] = file_sha256(os.path.join(tmp, filename))
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "estimator": type(model).__name__,
+        "features": features,
+        "classes": [int(c) for c in model.classes_],
+        "n_trees": len(model.estimators_),
+        "n_nodes": int(arrays["tree_offsets"][-1]),
+        "max_depth": max(int(e.tree_.max_depth) for e in model.estimators_),
+        "params": {k: v for k, v in model.get_params().items() if isinstance(v, (int, float, str, bool, type(None)))},
+        "training_window": training_window or {},
+        "metrics": metrics or {},
+        "files": files,
+        "sha256": _content_hash(files),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    with open(os.path.join(tmp, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    old = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+def read_manifest(path: str = ARTIFACT_DIR) -> dict:
+    try:
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Kein gültiges Manifest in {path}: {e}")
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ArtifactError(f"Unbekanntes Artefakt-Format: {manifest.get('format')}")
+    return manifest
+
+
+class ForestArtifact(FlatForest):
+    """
+    Random Forest aus einem exportierten Artefakt, Arrays per Memory-Map.
+
+    Bietet die von prediction_model genutzte Schnittstelle (classes_,
+    predict_proba, predict) über FlatForest, ohne scikit-learn zu importieren
+    oder zu entpickeln.
+    """
+
+    def __init__(self, path: str, manifest: dict, arrays: dict):
+        super().__init__(arrays, manifest["features"], manifest["classes"])
+        self.path = path
+        self.manifest = manifest
+        self.version = manifest["sha256"]
+
+
+def load_forest(path: str = ARTIFACT_DIR, verify: bool = True) -> ForestArtifact:
+    """
+    Lädt ein Artefakt. Die Arrays werden nur gemappt, nicht gelesen; verify prüft
+    zusätzlich die SHA-256 jeder Datei gegen das Manifest.
+    """
+    manifest = read_manifest(path)
+    files = manifest["files"]
+    if _content_hash(files) != manifest["sha256"]:
+        raise ArtifactError("Manifest-Hash stimmt nicht")
+
+    arrays = {}
+    for name, dtype in ARRAY_DTYPES.items():
+        filename = f"{name}.npy"
+        if filename not in files:
+            if name in OPTIONAL_ARRAYS:
+                continue
+            raise ArtifactError(f"{filename} fehlt im Manifest")
+        file_path = os.path.join(path, filename)
+        if verify and file_sha256(file_path) != files[filename]:
+            raise ArtifactError(f"{filename} passt nicht zum Manifest-Hash")
+        arrays[name] = np.load(file_path, mmap_mode="r", allow_pickle=False)
+        if arrays[name].dtype != dtype:
+            raise ArtifactError(f"{filename}: falscher Datentyp {arrays[name].dtype}")
+    return ForestArtifact(path, manifest, arrays)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Exportiert ein joblib-Modell in das kompakte Artefakt-Format"
+    )
+    parser.add_argument('--model', type=str, default=os.path.join("model", "trained_model.pkl"),
+                        help='Pfad zum joblib-Modell')
+    parser.add_argument('--output', type=str, default=ARTIFACT_DIR, help='Zielverzeichnis des Artefakts')
+    args = parser.parse_args()
+
+    import joblib
+    from crypto_warnsystem.models.feature_store import FEATURES
+
+    model = joblib.load(args.model)
+    features = list(getattr(model, "feature_names_in_", FEATURES))
+    manifest = export_forest(model, args.output, features)
+    size = sum(os.path.getsize(os.path.join(args.output, f)) for f in os.listdir(args.output))
+    print(f"💾 Artefakt gespeichert unter: {args.output} ({size / 1e6:.2f} MB, "
+          f"{manifest['n_trees']} Bäume, {manifest['n_nodes']} Knoten, Version {manifest['sha256'][:12]})")
+
+if __name__ == "__main__":
+    main()
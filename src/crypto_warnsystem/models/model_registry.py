@@ -0,0 +1,147 @@
+# model_registry.py
+
+import hashlib
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(path: str) -> str:
+    """Berechnet den SHA-256-Hash einer Datei blockweise."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Hält das trainierte Modell im Prozess vor.
+
+    Das Modell wird nur einmal geladen. Bei jedem Zugriff wird lediglich
+    mtime/Größe der Datei geprüft; hat sich die Datei geändert, wird der
+    Inhalts-Hash verglichen und nur bei neuem Inhalt neu geladen.
+
+    Ist artifact_path gesetzt und dort ein exportiertes Artefakt vorhanden
+    (siehe model_artifact), wird dieses statt der joblib-Datei per Memory-Map
+    geladen; die Version ist dann der Inhalts-Hash aus dem Manifest.
+    Mit flatten=True und artifact_path wird ein per joblib geladener Random
+    Forest beim ersten Laden als Artefakt exportiert und das scikit-learn-Modell
+    verworfen; spätere Prozesse laden nur noch das Artefakt. Ohne Numba werden
+    große Batches weiter von scikit-learn gerechnet, das dann erst beim ersten
+    großen Batch geladen wird (HybridForest). Lässt sich kein Artefakt
+    schreiben, wird das Modell im Speicher umgewandelt (FlatForest/HybridForest).
+    """
+
+    def __init__(self, path: str, artifact_path: str = None, flatten: bool = False):
+        self.path = path
+        self.artifact_path = artifact_path
+        self.flatten = flatten
+        self._model = None
+        self._stat = None
+        self._hash = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        """Kurzform des Inhalts-Hashes des geladenen Modells (None, wenn keins geladen)."""
+        return self._hash[:12] if self._hash else None
+
+    def get(self):
+        """
+        Gibt das aktuelle Modell zurück oder None, falls keine Modelldatei existiert.
+        """
+        source = self._source()
+        if source is None:
+            return None
+
+        kind, path, st = source
+        stat_key = (kind, path, st.st_mtime_ns, st.st_size)
+        if self._model is not None and stat_key == self._stat:
+            return self._model
+
+        with self._lock:
+            if self._model is not None and stat_key == self._stat:
+                return self._model
+
+            if kind == "artifact":
+                from crypto_warnsystem.models.model_artifact import read_manifest
+                content_hash = read_manifest(self.artifact_path)["sha256"]
+                if self._model is None or content_hash != self._hash:
+                    self._model = self._load_artifact()
+            else:
+                import joblib
+                content_hash = file_sha256(self.path)
+                if self._model is None or content_hash != self._hash:
+                    model = joblib.load(self.path)
+                    if self._export(model):
+                        # Ab jetzt gilt das Artefakt; das scikit-learn-Modell nicht behalten
+                        del model
+                        from crypto_warnsystem.models.model_artifact import read_manifest
+                        kind, path, st = self._source()
+                        stat_key = (kind, path, st.st_mtime_ns, st.st_size)
+                        content_hash = read_manifest(self.artifact_path)["sha256"]
+                        self._model = self._load_artifact()
+                    else:
+                        self._model = self._flatten(model)
+            self._hash = content_hash
+            self._stat = stat_key
+            return self._model
+
+    def _export(self, model) -> bool:
+        """Schreibt einen Random Forest als Artefakt nach artifact_path (nur mit flatten=True)."""
+        if not (self.flatten and self.artifact_path) or type(model).__name__ != "RandomForestClassifier":
+            return False
+        from crypto_warnsystem.models.model_artifact import ArtifactError, export_forest
+        try:
+            export_forest(model, self.artifact_path)
+        except (OSError, ArtifactError) as e:
+            logger.warning(f"Modell-Artefakt konnte nicht geschrieben werden: {e}")
+            return False
+        return True
+
+    def _load_artifact(self):
+        from crypto_warnsystem.models.forest_runtime import NUMBA_AVAILABLE, HybridForest
+        from crypto_warnsystem.models.model_artifact import load_forest
+
+        forest = load_forest(self.artifact_path)
+        if self.flatten and not NUMBA_AVAILABLE and os.path.exists(self.path):
+            return HybridForest(flat=forest, loader=self._load_pickle)
+        return forest
+
+    def _load_pickle(self):
+        import joblib
+        return joblib.load(self.path)
+
+    def _flatten(self, model):
+        if self.flatten and type(model).__name__ == "RandomForestClassifier":
+            from crypto_warnsystem.models.forest_runtime import NUMBA_AVAILABLE, FlatForest, HybridForest
+            if NUMBA_AVAILABLE:
+                return FlatForest.from_sklearn(model)
+            # Ohne Numba: kleine Batches flach, große über scikit-learn
+            return HybridForest(model)
+        return model
+
+    def _source(self):
+        """(Art, Pfad, stat) der zu ladenden Datei: bevorzugt das Artefakt-Manifest."""
+        if self.artifact_path:
+            from crypto_warnsystem.models.model_artifact import MANIFEST_NAME
+            manifest = os.path.join(self.artifact_path, MANIFEST_NAME)
+            try:
+                return "artifact", manifest, os.stat(manifest)
+            except OSError:
+                pass
+        try:
+            return "pickle", self.path, os.stat(self.path)
+        except OSError:
+            return None
+
+    def clear(self):
+        """Verwirft das geladene Modell (z. B. für Tests)."""
+        with self._lock:
+            self._model = None
+            self._stat = None
+            self._hash = None
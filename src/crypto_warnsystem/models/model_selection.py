@@ -0,0 +1,248 @@
+# model_selection.py
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Project root so that "import crypto_warnsystem" works
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, balanced_accuracy_score, log_loss, precision_score, roc_auc_score
+
+from crypto_warnsystem.models.feature_store import FEATURE_STORE_DIR, FEATURES, FeatureStore
+from crypto_warnsystem.utils.kline_store import KLINE_STORE_DIR
+
+CV_CACHE_DIR = os.getenv("CV_CACHE_DIR", os.path.join("data", "cv_cache"))
+
+# Zu vergleichende Modell-Konfigurationen (Name → Parameter für RandomForestClassifier)
+DEFAULT_CONFIGS = {
+    "rf_150_d10": {"n_estimators": 150, "max_depth": 10},
+    "rf_300_d8": {"n_estimators": 300, "max_depth": 8},
+    "rf_150_d6_leaf50": {"n_estimators": 150, "max_depth": 6, "min_samples_leaf": 50},
+}
+
+METRICS = ["accuracy", "balanced_accuracy", "precision_rise", "roc_auc", "log_loss", "baseline"]
+
+
+def time_series_holdout(n: int, test_size: float = 0.2, embargo: int = 12):
+    """
+    Zeitlich geordneter Holdout für eine einzelne Zeitreihe: die letzten test_size
+    Zeilen zum Testen. Die `embargo` Zeilen davor fallen weg, weil ihr Ziel
+    (future_periods Kerzen voraus) bereits in den Testzeitraum reicht.
+
+    :return: (Trainings-Positionen, Test-Positionen)
+    """
+    cut = int(n * (1 - test_size))
+    return np.arange(max(cut - embargo, 0)), np.arange(cut, n)
+
+
+def purged_splits(times: np.ndarray, n_splits: int = 5, horizon_ms: int = 0, embargo_ms: int = None,
+                  scheme: str = "walk_forward", min_train_size: int = 1):
+    """
+    Zeitbasierte Folds ohne Datenlecks, auch für mehrere Symbole mit gleichen Zeitstempeln.
+
+    walk_forward: Test-Block k, trainiert wird nur auf allen früheren Blöcken (wachsendes Fenster).
+    purged_kfold: Test-Block k, trainiert wird auf allen anderen Blöcken.
+
+    In beiden Fällen werden Trainingszeilen entfernt, deren Ziel (t + horizon_ms) in
+    den Test-Block reicht (Purging). Nach dem Test-Block wird zusätzlich embargo_ms
+    übersprungen (Embargo, Standard = horizon_ms).
+
+    :param times: Zeitstempel (ms) je Zeile
+    :return: Liste von (Trainings-Indizes, Test-Indizes)
+    """
+    if scheme not in ("walk_forward", "purged_kfold"):
+        raise ValueError(f"Unbekanntes Schema: {scheme}")
+    embargo_ms = horizon_ms if embargo_ms is None else embargo_ms
+    unique = np.unique(times)
+    blocks = n_splits + 1 if scheme == "walk_forward" else n_splits
+    if len(unique) < blocks:
+        raise ValueError(f"Zu wenige Zeitpunkte ({len(unique)}) für {n_splits} Folds")
+    edges = [unique[i * len(unique) // blocks] for i in range(blocks)] + [unique[-1] + 1]
+
+    splits = []
+    for k in range(1 if scheme == "walk_forward" else 0, blocks):
+        test_start, test_end = edges[k], edges[k + 1]
+        test = np.flatnonzero((times >= test_start) & (times < test_end))
+        before = times + horizon_ms < test_start
+        if scheme == "walk_forward":
+            train_mask = before
+        else:
+            train_mask = before | (times >= test_end + embargo_ms)
+        train = np.flatnonzero(train_mask)
+        if len(train) >= min_train_size and len(test):
+            splits.append((train, test))
+    return splits
+
+
+def fold_metrics(y_true: np.ndarray, proba_rise: np.ndarray) -> dict:
+    """Kennzahlen eines Folds; baseline = Trefferquote, wenn immer die häufigere Klasse getippt wird."""
+    y_pred = (proba_rise > 0.5).astype(int)
+    both = len(np.unique(y_true)) == 2
+    return {
+        "accuracy": accuracy_score(y_true, y_pred),
+        "balanced_accuracy": balanced_accuracy_score(y_true, y_pred),
+        "precision_rise": precision_score(y_true, y_pred, zero_division=0),
+        "roc_auc": roc_auc_score(y_true, proba_rise) if both else np.nan,
+        "log_loss": log_loss(y_true, np.clip(proba_rise, 1e-6, 1 - 1e-6), labels=[0, 1]),
+        "baseline": max(y_true.mean(), 1 - y_true.mean()),
+    }
+
+
+def _evaluate_fold(task: dict) -> dict:
+    """Worker: trainiert eine Konfiguration auf einem Fold (Daten per Memory-Map aus dem Cache)."""
+    t0 = time.perf_counter()
+    X = np.load(os.path.join(task["cache"], "X.npy"), mmap_mode="r")
+    y = np.load(os.path.join(task["cache"], "y.npy"), mmap_mode="r")
+    with np.load(os.path.join(task["cache"], "folds.npz")) as folds:
+        train, test = folds[f"train_{task['fold']}"], folds[f"test_{task['fold']}"]
+
+    model = RandomForestClassifier(random_state=42, n_jobs=task.get("n_jobs", 1), **task["params"])
+    model.fit(pd.DataFrame(X[train], columns=FEATURES, copy=False), y[train])
+    proba = model.predict_proba(pd.DataFrame(X[test], columns=FEATURES, copy=False))
+    rise = proba[:, list(model.classes_).index(1)] if 1 in model.classes_ else np.zeros(len(test))
+
+    return {
+        "config": task["config"],
+        "fold": task["fold"],
+        "train_rows": len(train),
+        "test_rows": len(test),
+        **fold_metrics(np.asarray(y[test]), rise),
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+def dataset_key(symbols, interval: str, feature_root: str = FEATURE_STORE_DIR, **options) -> str:
+    """Schlüssel für den Fold-Cache: ändert sich mit den Daten im Feature-Store und den Optionen."""
+    store = FeatureStore(feature_root)
+    manifests = {}
+    for symbol in symbols:
+        manifest = store.manifest(symbol, interval)
+        manifests[symbol] = [manifest.get(k) for k in ("version", "generation", "first_time", "last_time")]
+    payload = json.dumps({"symbols": manifests, "interval": interval, "features": FEATURES, **options},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def prepare_folds(symbols, interval: str, feature_root: str = FEATURE_STORE_DIR, cache_dir: str = CV_CACHE_DIR,
+                  future_periods: int = 12, n_splits: int = 5, scheme: str = "walk_forward",
+                  start_ms: int = None, stride: int = 1, embargo: int = None,
+                  kline_root: str = KLINE_STORE_DIR) -> tuple:
+    """
+    Baut Datensatz und Folds einmal auf und legt sie als .npy/.npz im Cache ab.
+    Ein weiterer Lauf mit denselben Daten und Optionen liest nur den Cache.
+    Die Ziele stammen aus den Schlusskursen im KlineStore unter kline_root.
+
+    :return: (Cache-Verzeichnis, Anzahl Folds, aus dem Cache geladen?)
+    """
+    from binance.helpers import interval_to_milliseconds
+    from crypto_warnsystem.models.training_pipeline import assemble_dataset
+
+    embargo = future_periods if embargo is None else embargo
+    key = dataset_key(symbols, interval, feature_root, future_periods=future_periods, n_splits=n_splits,
+                      scheme=scheme, start_ms=start_ms, stride=stride, embargo=embargo, kline_root=kline_root)
+    path = os.path.join(cache_dir, key)
+    manifest_path = os.path.join(path, "folds.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return path, json.load(f)["n_folds"], True
+
+    X, y, _, times = assemble_dataset(symbols, interval, feature_root, future_periods, start_ms, stride,
+                                      kline_root=kline_root)
+    interval_ms = interval_to_milliseconds(interval)
+    splits = purged_splits(times, n_splits, horizon_ms=future_periods * interval_ms,
+                           embargo_ms=embargo * interval_ms, scheme=scheme)
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "X.npy"), X)
+    np.save(os.path.join(path, "y.npy"), y)
+    np.savez(os.path.join(path, "folds.npz"),
+             **{f"train_{k}": train for k, (train, _) in enumerate(splits)},
+             **{f"test_{k}": test for k, (_, test) in enumerate(splits)})
+    # Zuletzt schreiben: nur vollständige Caches werden wiederverwendet
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"n_folds": len(splits), "rows": len(y), "symbols": list(symbols), "interval": interval}, f)
+    os.replace(tmp, manifest_path)
+    return path, len(splits), False
+
+
+def evaluate_configs(cache: str, n_folds: int, configs: dict = None, max_workers: int = None) -> tuple:
+    """
+    Wertet alle Konfigurationen auf allen Folds parallel aus (ein Prozess je Konfiguration/Fold).
+
+    :return: (Ergebnisse je Fold, Zusammenfassung je Konfiguration sortiert nach balanced_accuracy)
+    """
+    configs = configs or DEFAULT_CONFIGS
+    tasks = [
+        {"cache": cache, "fold": fold, "config": name, "params": params}
+        for name, params in configs.items()
+        for fold in range(n_folds)
+    ]
+    if max_workers == 1 or len(tasks) <= 1:
+        rows = [_evaluate_fold(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            rows = list(pool.map(_evaluate_fold, tasks))
+
+    folds = pd.DataFrame(rows)
+    summary = folds.groupby("config")[METRICS].agg(["mean", "std"])
+    summary = summary.sort_values(("balanced_accuracy", "mean"), ascending=False)
+    return folds, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Walk-Forward-/Purged-K-Fold-Evaluierung mehrerer Modell-Konfigurationen"
+    )
+    parser.add_argument('--symbols', type=str, default='BTCUSDT', help='Kommagetrennt, z. B. BTCUSDT,ETHUSDT')
+    parser.add_argument('--interval', type=str, default='15m', help='Kline interval, e.g., 1m, 15m')
+    parser.add_argument('--scheme', type=str, default='walk_forward', choices=['walk_forward', 'purged_kfold'])
+    parser.add_argument('--splits', type=int, default=5, help='Anzahl Folds')
+    parser.add_argument('--future-periods', type=int, default=12, help='Prognosehorizont in Kerzen (= Embargo)')
+    parser.add_argument('--since', type=str, default=None, help='Nur Kerzen ab diesem Zeitpunkt, z. B. "1 year ago UTC"')
+    parser.add_argument('--stride', type=int, default=1, help='Nur jede n-te Kerze als Zeile')
+    parser.add_argument('--configs', type=str, default=','.join(DEFAULT_CONFIGS),
+                        help=f'Kommagetrennt aus: {", ".join(DEFAULT_CONFIGS)}')
+    parser.add_argument('--workers', type=int, default=None, help='Anzahl Prozesse (Standard: CPU-Anzahl)')
+    parser.add_argument('--output', type=str, default=None, help='CSV-Datei für die Ergebnisse je Fold')
+    args = parser.parse_args()
+
+    from crypto_warnsystem.models.training_pipeline import build_features
+
+    symbols = args.symbols.split(",")
+    start_ms = None
+    if args.since:
+        from binance.helpers import convert_ts_str
+        start_ms = convert_ts_str(args.since)
+    configs = {name: DEFAULT_CONFIGS[name] for name in args.configs.split(",")}
+
+    t0 = time.perf_counter()
+    build_features(symbols, args.interval, start_ms=start_ms, max_workers=args.workers)
+    cache, n_folds, cached = prepare_folds(symbols, args.interval, future_periods=args.future_periods,
+                                           n_splits=args.splits, scheme=args.scheme,
+                                           start_ms=start_ms, stride=args.stride)
+    prepare_time = time.perf_counter() - t0
+    print(f"📂 {n_folds} Folds {'aus dem Cache' if cached else 'neu erstellt'}: {cache} ({prepare_time:.2f}s)")
+
+    t0 = time.perf_counter()
+    folds, summary = evaluate_configs(cache, n_folds, configs, max_workers=args.workers)
+    print(f"✅ {len(folds)} Fold-Läufe ({time.perf_counter() - t0:.2f}s)\n")
+    print(summary.round(4).to_string())
+
+    if args.output:
+        folds.to_csv(args.output, index=False)
+        print(f"💾 Ergebnisse gespeichert unter: {args.output}")
+
+if __name__ == "__main__":
+    main()
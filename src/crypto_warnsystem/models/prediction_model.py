@@ -1,52 +1,94 @@
 # prediction_model.py
 
 import pandas as pd
-import joblib
 import os
 
-MODEL_PATH = "model/trained_model.pkl"
+from crypto_warnsystem.models.feature_store import FEATURES, FeatureMatrix
+from crypto_warnsystem.models.model_registry import ModelRegistry
+from crypto_warnsystem.utils.metrics import timed
 
-def predict_future_direction(df: pd.DataFrame):
-    """
-    Nutzt das trainierte Modell, um die Kursrichtung vorherzusagen.
-
-    Gibt ein Dict mit Richtung, Vertrauen und Wahrscheinlichkeiten zurück.
-    """
+MODEL_PATH = "model/trained_model.pkl"
+# Kompaktes Artefakt (siehe model_artifact); wird bevorzugt, falls vorhanden
+ARTIFACT_PATH = "model/forest"
 
-    if not os.path.exists(MODEL_PATH):
-        print("⚠️ Kein Modell gefunden.")
-        return None
+# Prozessweit geteiltes Modell, wird nur bei geänderter Datei neu geladen.
+# Einzelzeilen laufen über die flache Laufzeit (forest_runtime), große Batches
+# ohne Numba weiter über das vektorisierte predict_proba von scikit-learn.
+model_registry = ModelRegistry(MODEL_PATH, artifact_path=ARTIFACT_PATH, flatten=True)
 
+def _load_model():
     try:
-        model = joblib.load(MODEL_PATH)
+        model = model_registry.get()
     except Exception as e:
         print(f"Fehler beim Laden des Modells: {e}")
         return None
 
+    if model is None:
+        print("⚠️ Kein Modell gefunden.")
+    return model
+
+@timed()
+def predict_directions(df: pd.DataFrame, start=None, end=None, dropna: bool = False):
+    """
+    Bewertet alle Zeilen df.iloc[start:end] mit einem einzigen predict_proba-Aufruf.
+
+    :param df: DataFrame mit Indikatoren (siehe FEATURES) oder FeatureMatrix aus dem Feature-Store
+    :param start: erste zu bewertende Zeile (Positionsindex, optional)
+    :param end: Ende des Bereichs (exklusiv, optional)
+    :param dropna: Zeilen mit fehlenden Features überspringen
+    :return: DataFrame mit 'direction', 'confidence', 'proba_fall', 'proba_rise'
+             (gleicher Index wie df) oder None, wenn kein Modell verfügbar ist.
+             Die Modell-Version steht in result.attrs["model_version"].
+    """
+    model = _load_model()
+    if model is None:
+        return None
+
+    if isinstance(df, FeatureMatrix):
+        # Spalten des Feature-Stores direkt als float32-Matrix, ohne Umweg über pandas
+        rows = df.slice(start, end)
+        features = pd.DataFrame(rows.matrix(FEATURES), index=rows.index, columns=FEATURES, copy=False)
+    else:
+        features = df.iloc[start:end][FEATURES]
+    if dropna:
+        features = features.dropna()
+
+    result = pd.DataFrame(
+        index=features.index,
+        columns=["direction", "confidence", "proba_fall", "proba_rise"],
+        dtype=float,
+    )
+    if not features.empty:
+        proba = model.predict_proba(features)
+        best = proba.argmax(axis=1)
+        # Entspricht model.predict(), ohne den Wald ein zweites Mal auszuwerten
+        result["direction"] = model.classes_.take(best).astype(int)
+        result["confidence"] = proba.max(axis=1)
+        result["proba_fall"] = proba[:, 0]
+        result["proba_rise"] = proba[:, 1]
+    result["direction"] = result["direction"].astype(int)
+    result.attrs["model_version"] = model_registry.version
+    return result
+
+@timed()
+def predict_future_direction(df: pd.DataFrame):
+    """
+    Nutzt das trainierte Modell, um die Kursrichtung vorherzusagen.
+
+    Gibt ein Dict mit Richtung, Vertrauen und Wahrscheinlichkeiten zurück.
+    """
     # Letzte Zeile (aktuelle Werte)
-    last = df.iloc[-1]
-
-    # Features, wie im Training
-    features = pd.DataFrame([{
-        "rsi": last["rsi"],
-        "macd": last["macd"],
-        "bb_upper": last["bb_upper"],
-        "bb_lower": last["bb_lower"],
-        "sma50": last["sma50"],
-        "sma200": last["sma200"],
-        "close": last["close"]
-    }])
-
-    proba = model.predict_proba(features)[0]
-    predicted_direction = model.predict(features)[0]
-    confidence = max(proba)
+    result = predict_directions(df, start=-1)
+    if result is None or result.empty:
+        return None
 
+    last = result.iloc[-1]
     return {
-        "direction": int(predicted_direction),  # 1 = steigt, 0 = fällt/seitwärts
-        "confidence": confidence,
+        "direction": int(last["direction"]),  # 1 = steigt, 0 = fällt/seitwärts
+        "confidence": last["confidence"],
         "proba": {
-            "fall": proba[0],
-            "rise": proba[1]
+            "fall": last["proba_fall"],
+            "rise": last["proba_rise"]
         },
-        "model_version": "v1.0"
+        "model_version": result.attrs["model_version"]
     }
@@ -8,17 +8,20 @@ if PROJECT_ROOT not in sys.path:
 
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 import joblib
 import os
 from crypto_warnsystem.utils.data_utils import get_klines
-from crypto_warnsystem.utils.indicator_utils import calculate_indicators
+from crypto_warnsystem.models.feature_store import FEATURES, feature_store
+from crypto_warnsystem.models.model_artifact import ARTIFACT_DIR, export_forest
+from crypto_warnsystem.models.model_selection import time_series_holdout
 
 MODEL_DIR = "model"
 MODEL_PATH = os.path.join(MODEL_DIR, "trained_model.pkl")
+# Prognosehorizont in Kerzen (12 x 15m = 3h)
+FUTURE_PERIODS = 12
 
-def label_data(df: pd.DataFrame, future_periods=12):
+def label_data(df: pd.DataFrame, future_periods=FUTURE_PERIODS):
     """
     Erstellt Zielvariable (0 = fällt/seitwärts, 1 = steigt)
     """
@@ -29,16 +32,19 @@ def label_data(df: pd.DataFrame, future_periods=12):
 def train_model():
     print("📊 Lade historische Daten...")
     df = get_klines("BTCUSDT", interval="15m", lookback="15 day ago UTC")
-    df = calculate_indicators(df)
+    df = feature_store.features("BTCUSDT", "15m", df)
     df = label_data(df)
 
     df.dropna(inplace=True)
 
-    features = ["rsi", "macd", "bb_upper", "bb_lower", "sma50", "sma200", "close"]
-    X = df[features]
+    X = df[FEATURES]
     y = df["target"]
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # Zeitlich geordnet statt gemischt: keine zukünftigen Kerzen im Training,
+    # und Kerzen, deren Ziel in den Testzeitraum reicht, fallen weg
+    train, test = time_series_holdout(len(df), test_size=0.2, embargo=FUTURE_PERIODS)
+    X_train, X_test = X.iloc[train], X.iloc[test]
+    y_train, y_test = y.iloc[train], y.iloc[test]
 
     print("🧠 Trainiere Modell...")
     model = RandomForestClassifier(n_estimators=150, max_depth=10, random_state=42)
@@ -47,10 +53,21 @@ def train_model():
     print("✅ Training abgeschlossen. Evaluierung:")
     y_pred = model.predict(X_test)
     print(classification_report(y_test, y_pred))
+    report = classification_report(y_test, y_pred, output_dict=True, zero_division=0)
 
     os.makedirs(MODEL_DIR, exist_ok=True)
     joblib.dump(model, MODEL_PATH)
     print(f"💾 Modell gespeichert unter: {MODEL_PATH}")
 
+    # Kompaktes Artefakt für Bot, Dashboard und Scheduler (schneller Start, kein Pickle)
+    export_forest(model, ARTIFACT_DIR, FEATURES, training_window={
+        "symbols": ["BTCUSDT"],
+        "interval": "15m",
+        "start": str(X_train.index[0]),
+        "end": str(X_train.index[-1]),
+        "rows": len(X_train),
+    }, metrics={"accuracy": report["accuracy"], "report": report})
+    print(f"💾 Artefakt gespeichert unter: {ARTIFACT_DIR}")
+
 if __name__ == "__main__":
     train_model()
@@ -0,0 +1,279 @@
+# training_pipeline.py
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Project root so that "import crypto_warnsystem" works
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, classification_report
+
+from crypto_warnsystem.models.feature_store import FEATURE_STORE_DIR, FEATURES, FeatureStore
+from crypto_warnsystem.models.model_artifact import ARTIFACT_DIR, export_forest
+from crypto_warnsystem.models.model_selection import time_series_holdout
+from crypto_warnsystem.utils.kline_store import KLINE_STORE_DIR, KlineStore, records_to_frame
+
+MODEL_DIR = "model"
+MODEL_PATH = os.path.join(MODEL_DIR, "trained_model.pkl")
+
+# Kerzen je Block beim Einlesen (1m-Daten über Jahre passen so in den Speicher)
+CHUNK_ROWS = 250_000
+# Alle Kerzen im Speicher gelten als abgeschlossen
+_FAR_FUTURE_MS = 2 ** 62
+
+
+def _build_features(task: dict) -> dict:
+    """
+    Worker: liest die Kerzen eines Symbols blockweise per Memory-Map und schreibt
+    die Features in den Feature-Store. Bereits berechnete Kerzen werden übersprungen.
+    """
+    t0 = time.perf_counter()
+    klines = KlineStore(task["kline_root"]).load(task["symbol"], task["interval"], task.get("start_ms"))
+    store = FeatureStore(task["feature_root"])
+    chunk_rows = task.get("chunk_rows") or CHUNK_ROWS
+    for start in range(0, len(klines), chunk_rows):
+        # Eine Kerze Überlappung, damit der Store den Anschluss erkennt
+        chunk = records_to_frame(klines[max(start - 1, 0):start + chunk_rows])
+        store.update(task["symbol"], task["interval"], chunk, now_ms=_FAR_FUTURE_MS)
+    return {"symbol": task["symbol"], "candles": len(klines), "seconds": time.perf_counter() - t0}
+
+
+def build_features(symbols, interval: str, kline_root: str = KLINE_STORE_DIR,
+                   feature_root: str = FEATURE_STORE_DIR, start_ms: int = None,
+                   max_workers: int = None, chunk_rows: int = CHUNK_ROWS) -> list:
+    """Berechnet die Features aller Symbole parallel in Worker-Prozessen (ein Symbol je Task)."""
+    tasks = [
+        {"symbol": symbol, "interval": interval, "kline_root": kline_root, "feature_root": feature_root,
+         "start_ms": start_ms, "chunk_rows": chunk_rows}
+        for symbol in symbols
+    ]
+    if max_workers == 1 or len(tasks) <= 1:
+        return [_build_features(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_build_features, tasks))
+
+
+def label_targets(close: np.ndarray, future_periods: int = 12) -> np.ndarray:
+    """
+    Zielvariable wie train_model.label_data: 1, wenn der Schlusskurs in
+    future_periods Kerzen höher ist. Die letzten future_periods Kerzen und
+    Kerzen ohne Schlusskurs (NaN) haben kein Ziel (-1).
+
+    close sollte float64 sein (KlineStore): in float32 fallen kleine
+    Kursänderungen weg und würden als "nicht gestiegen" gezählt.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    target = np.full(len(close), -1, dtype=np.int8)
+    if len(close) > future_periods:
+        now, future = close[:-future_periods], close[future_periods:]
+        labeled = ~(np.isnan(now) | np.isnan(future))
+        target[:-future_periods][labeled] = future[labeled] > now[labeled]
+    return target
+
+
+def kline_close(store: KlineStore, symbol: str, interval: str, times: np.ndarray) -> np.ndarray:
+    """
+    Schlusskurse in float64 aus dem KlineStore zu den Zeitstempeln der
+    Feature-Zeilen (NaN, wo keine Kerze gespeichert ist).
+    """
+    close = np.full(len(times), np.nan)
+    if len(times) == 0:
+        return close
+    klines = store.load(symbol, interval, int(times[0]))
+    pos = np.minimum(np.searchsorted(klines["time"], times), max(len(klines) - 1, 0))
+    if len(klines):
+        found = klines["time"][pos] == times
+        close[found] = klines["close"][pos[found]]
+    return close
+
+
+def assemble_dataset(symbols, interval: str, feature_root: str = FEATURE_STORE_DIR,
+                     future_periods: int = 12, start_ms: int = None, stride: int = 1,
+                     kline_root: str = KLINE_STORE_DIR):
+    """
+    Baut die Trainingsmatrix aus den Feature-Dateien aller Symbole.
+
+    Die Matrix wird einmal in float32 vorbelegt und direkt aus den Memory-Maps
+    befüllt; es entstehen keine Zwischenkopien je Symbol. Die Ziele werden aus
+    den float64-Schlusskursen des KlineStore berechnet, nicht aus dem
+    float32-close der Feature-Dateien.
+
+    :return: (X float32, y int8, Gruppen-Array mit Symbolindex, Zeitstempel in ms)
+    """
+    store = FeatureStore(feature_root)
+    klines = KlineStore(kline_root)
+    selections = []
+    for group, symbol in enumerate(symbols):
+        matrix = store.load(symbol, interval)
+        if len(matrix) == 0:
+            continue
+        target = label_targets(kline_close(klines, symbol, interval, matrix.time), future_periods)
+        valid = target >= 0
+        for name in FEATURES:
+            valid &= ~np.isnan(matrix[name])
+        if start_ms is not None:
+            valid &= matrix.time >= start_ms
+        rows = np.flatnonzero(valid)[::stride]
+        selections.append((group, matrix, target, rows))
+
+    total = sum(len(rows) for *_, rows in selections)
+    X = np.empty((total, len(FEATURES)), dtype=np.float32)
+    y = np.empty(total, dtype=np.int8)
+    groups = np.empty(total, dtype=np.int32)
+    times = np.empty(total, dtype=np.int64)
+    pos = 0
+    for group, matrix, target, rows in selections:
+        end = pos + len(rows)
+        for col, name in enumerate(FEATURES):
+            X[pos:end, col] = matrix[name][rows]
+        y[pos:end] = target[rows]
+        groups[pos:end] = group
+        times[pos:end] = matrix.time[rows]
+        pos = end
+    return X, y, groups, times
+
+
+def holdout_split(groups: np.ndarray, test_size: float = 0.2, gap: int = 12):
+    """
+    Zeitlich geordneter Holdout je Symbol: die letzten test_size Kerzen jedes
+    Symbols zum Testen, davor `gap` Kerzen Abstand gegen überlappende Ziele.
+    """
+    train, test = [], []
+    for group in np.unique(groups):
+        rows = np.flatnonzero(groups == group)
+        train_pos, test_pos = time_series_holdout(len(rows), test_size, embargo=gap)
+        train.append(rows[train_pos])
+        test.append(rows[test_pos])
+    return np.concatenate(train), np.concatenate(test)
+
+
+def run_pipeline(symbols, interval: str = "15m", kline_root: str = KLINE_STORE_DIR,
+                 feature_root: str = FEATURE_STORE_DIR, start_ms: int = None, future_periods: int = 12,
+                 stride: int = 1, n_jobs: int = -1, max_workers: int = None, chunk_rows: int = CHUNK_ROWS,
+                 test_size: float = 0.2, model_path: str = MODEL_PATH, artifact_path: str = ARTIFACT_DIR,
+                 n_estimators: int = 150, max_depth: int = 10) -> dict:
+    """
+    Kompletter Trainingslauf über viele Symbole: Features, Datensatz, Training, Evaluierung, Speichern.
+
+    :return: Dict mit model, accuracy, report, Kerzen je Symbol, Zeilenzahlen und Laufzeiten je Stufe
+    """
+    timings = {}
+
+    t0 = time.perf_counter()
+    built = build_features(symbols, interval, kline_root, feature_root, start_ms=start_ms,
+                           max_workers=max_workers, chunk_rows=chunk_rows)
+    timings["features"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    X, y, groups, times = assemble_dataset(symbols, interval, feature_root, future_periods, start_ms, stride,
+                                           kline_root=kline_root)
+    train, test = holdout_split(groups, test_size, gap=future_periods)
+    timings["assemble"] = time.perf_counter() - t0
+    if len(train) == 0:
+        raise ValueError("Keine Trainingsdaten – sind Kerzen für die Symbole gespeichert?")
+
+    t0 = time.perf_counter()
+    model = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth,
+                                   random_state=42, n_jobs=n_jobs)
+    # Mit Spaltennamen trainieren, damit das Modell FEATURES kennt (wie bisher mit DataFrames)
+    model.fit(pd.DataFrame(X[train], columns=FEATURES, copy=False), y[train])
+    timings["fit"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    report, accuracy = None, None
+    if len(test):
+        y_pred = model.predict(pd.DataFrame(X[test], columns=FEATURES, copy=False))
+        accuracy = accuracy_score(y[test], y_pred)
+        report = classification_report(y[test], y_pred, zero_division=0)
+    timings["evaluate"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    if model_path:
+        os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+        joblib.dump(model, model_path)
+    if artifact_path:
+        export_forest(model, artifact_path, FEATURES, training_window={
+            "symbols": list(symbols),
+            "interval": interval,
+            "start": int(times[train].min()),
+            "end": int(times[train].max()),
+            "rows": len(train),
+        }, metrics={"accuracy": accuracy, "test_rows": len(test)})
+    timings["save"] = time.perf_counter() - t0
+
+    return {
+        "model": model,
+        "accuracy": accuracy,
+        "report": report,
+        "symbols": {b["symbol"]: b["candles"] for b in built},
+        "train_rows": len(train),
+        "test_rows": len(test),
+        "timings": timings,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Trainiert das Prognosemodell über viele Symbole aus dem lokalen Kerzenspeicher"
+    )
+    parser.add_argument('--symbols', type=str, default='BTCUSDT', help='Kommagetrennt, z. B. BTCUSDT,ETHUSDT')
+    parser.add_argument('--interval', type=str, default='15m', help='Kline interval, e.g., 1m, 15m')
+    parser.add_argument('--fetch', type=str, default=None,
+                        help='Vorher fehlende Kerzen von Binance nachladen, z. B. "2 year ago UTC"')
+    parser.add_argument('--since', type=str, default=None, help='Nur Kerzen ab diesem Zeitpunkt, z. B. "1 year ago UTC"')
+    parser.add_argument('--future-periods', type=int, default=12, help='Prognosehorizont in Kerzen')
+    parser.add_argument('--stride', type=int, default=1, help='Nur jede n-te Kerze als Trainingszeile')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Threads für das Training (-1 = alle Kerne)')
+    parser.add_argument('--workers', type=int, default=None, help='Prozesse für die Features (Standard: CPU-Anzahl)')
+    parser.add_argument('--output', type=str, default=MODEL_PATH, help='Pfad des gespeicherten Modells')
+    parser.add_argument('--artifact', type=str, default=ARTIFACT_DIR, help='Verzeichnis des kompakten Artefakts')
+    args = parser.parse_args()
+
+    symbols = args.symbols.split(",")
+    fetch_time = 0.0
+    if args.fetch:
+        from crypto_warnsystem.utils.scanner import fetch_klines_concurrently
+
+        t0 = time.perf_counter()
+        _, errors = fetch_klines_concurrently(symbols, args.interval, args.fetch)
+        fetch_time = time.perf_counter() - t0
+        if errors:
+            print(f"⚠️ {len(errors)} Symbole ohne Daten: {', '.join(sorted(errors)[:10])}")
+
+    start_ms = None
+    if args.since:
+        from binance.helpers import convert_ts_str
+        start_ms = convert_ts_str(args.since)
+
+    print(f"📊 Trainiere über {len(symbols)} Symbole ({args.interval})...")
+    result = run_pipeline(
+        symbols,
+        interval=args.interval,
+        start_ms=start_ms,
+        future_periods=args.future_periods,
+        stride=args.stride,
+        n_jobs=args.n_jobs,
+        max_workers=args.workers,
+        model_path=args.output,
+        artifact_path=args.artifact,
+    )
+
+    print(f"✅ Training abgeschlossen ({result['train_rows']} Trainings-, {result['test_rows']} Testzeilen)")
+    if result["report"]:
+        print(result["report"])
+    timings = {"fetch": fetch_time, **result["timings"]} if args.fetch else result["timings"]
+    print("⏱️ Laufzeiten: " + ", ".join(f"{k} {v:.2f}s" for k, v in timings.items()))
+    print(f"💾 Modell gespeichert unter: {args.output} (Artefakt: {args.artifact})")
+
+if __name__ == "__main__":
+    main()
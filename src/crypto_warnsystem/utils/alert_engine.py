@@ -0,0 +1,205 @@
+# alert_engine.py
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+ALERT_STATE_PATH = os.getenv("ALERT_STATE_PATH", "alert_state.json")
+
+DEFAULT_PARAMS = {
+    "price_drop_threshold": 3,   # Prozent
+    "rsi_overbought": 70,
+    "rsi_oversold": 30,
+    "rsi_hysteresis": 5,         # RSI-Punkte, die der Wert zurücklaufen muss
+}
+
+
+class AlertRule:
+    """
+    Deklarative Regel für einen Alarm.
+
+    :param name: eindeutiger Name (Teil des Zustandsschlüssels)
+    :param direction: "Kauf", "Verkauf" oder None (reine Warnung)
+    :param trigger: Funktion (last, previous, params) -> bool
+    :param alert: Anzeige-Text, Format-String mit {symbol}, {last}, {previous}, {drop_pct}
+    :param score: Beitrag zum Handelsscore, solange die Regel aktiv ist
+    :param signal: Text der Handelsidee; nur Regeln mit signal werden per Telegram gemeldet
+    :param reason: Begründung für die Signal-Historie
+    :param reset: Funktion (last, previous, params) -> bool; erst wenn sie zutrifft, darf
+                  die Regel erneut melden (Hysterese). None = nur Cooldown.
+    :param cooldown: Mindestabstand zwischen zwei Meldungen in Sekunden
+    """
+
+    def __init__(self, name, direction, trigger, alert, score=0, signal=None, reason=None,
+                 reset=None, cooldown=3600):
+        self.name = name
+        self.direction = direction
+        self.trigger = trigger
+        self.alert = alert
+        self.score = score
+        self.signal = signal
+        self.reason = reason
+        self.reset = reset
+        self.cooldown = cooldown
+
+    def format(self, symbol, last, previous) -> str:
+        drop_pct = (previous['close'] - last['close']) / previous['close'] * 100
+        return self.alert.format(symbol=symbol, last=last, previous=previous, drop_pct=drop_pct)
+
+
+def _drop(last, previous):
+    return (previous['close'] - last['close']) / previous['close']
+
+
+# Die bisher im Dashboard fest verdrahteten Regeln
+DEFAULT_RULES = [
+    AlertRule(
+        "price_drop", None,
+        trigger=lambda last, prev, p: _drop(last, prev) >= p["price_drop_threshold"] / 100,
+        alert="🚨 Preissturz: {symbol} fiel um {drop_pct:.2f}%",
+        score=2,
+        cooldown=1800,
+    ),
+    AlertRule(
+        "rsi_overbought", "Verkauf",
+        trigger=lambda last, prev, p: last['rsi'] >= p["rsi_overbought"],
+        reset=lambda last, prev, p: last['rsi'] < p["rsi_overbought"] - p["rsi_hysteresis"],
+        alert="📈 RSI überkauft: {last[rsi]:.2f}",
+        score=-1,
+        signal="💡 Mögliche Verkaufsgelegenheit (RSI überkauft)",
+        reason="RSI überkauft",
+    ),
+    AlertRule(
+        "rsi_oversold", "Kauf",
+        trigger=lambda last, prev, p: last['rsi'] <= p["rsi_oversold"] and last['rsi'] < p["rsi_overbought"],
+        reset=lambda last, prev, p: last['rsi'] > p["rsi_oversold"] + p["rsi_hysteresis"],
+        alert="📉 RSI überverkauft: {last[rsi]:.2f}",
+        score=2,
+        signal="💰 Mögliche Kaufgelegenheit (RSI überverkauft)",
+        reason="RSI überverkauft",
+    ),
+    AlertRule(
+        "macd_cross_up", "Kauf",
+        trigger=lambda last, prev, p: last['macd'] > 0 and prev['macd'] < 0,
+        alert="🟢 MACD Crossover: Aufwärtstrend",
+        score=2,
+        signal="💰 Mögliche Kaufgelegenheit (MACD Crossover nach oben)",
+        reason="MACD Crossover oben",
+    ),
+    AlertRule(
+        "macd_cross_down", "Verkauf",
+        trigger=lambda last, prev, p: last['macd'] < 0 and prev['macd'] > 0,
+        alert="🔴 MACD Crossover: Abwärtstrend",
+        score=-2,
+        signal="⚠️ Mögliche Verkaufsgelegenheit (MACD Crossover nach unten)",
+        reason="MACD Crossover unten",
+    ),
+]
+
+
+class AlertEngine:
+    """
+    Wertet Alarmregeln aus und entscheidet, welche Meldungen tatsächlich rausgehen.
+
+    Der Zustand je (Symbol, Regel, Richtung) – letzter Versand und ob die Regel
+    scharf ist – wird in einer JSON-Datei gespeichert und übersteht Neustarts.
+    Eine Regel meldet erst wieder, wenn ihr Cooldown abgelaufen ist und (bei
+    Regeln mit reset) der Wert die Hysterese-Schwelle wieder verlassen hat.
+    """
+
+    def __init__(self, rules=None, state_path: str = ALERT_STATE_PATH, cooldowns: dict = None):
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+        self.state_path = state_path
+        self.cooldowns = cooldowns or {}
+        self._lock = threading.Lock()
+        self.state = self._load()
+
+    def _load(self) -> dict:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        if not self.state_path:
+            return
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_path)
+
+    @staticmethod
+    def key(symbol, rule) -> str:
+        return f"{symbol}|{rule.name}|{rule.direction or '-'}"
+
+    def evaluate(self, symbol, last, previous, params: dict = None) -> list:
+        """
+        Alle aktuell zutreffenden Regeln (ohne Zustand, ohne Seiteneffekte).
+
+        :return: Liste von Dicts mit rule, alert, signal, direction, reason, score
+        """
+        params = {**DEFAULT_PARAMS, **(params or {})}
+        active = []
+        for rule in self.rules:
+            if rule.trigger(last, previous, params):
+                active.append({
+                    "rule": rule.name,
+                    "alert": rule.format(symbol, last, previous),
+                    "signal": rule.signal,
+                    "direction": rule.direction,
+                    "reason": rule.reason,
+                    "score": rule.score,
+                })
+        return active
+
+    def process(self, symbol, last, previous, params: dict = None, now: float = None):
+        """
+        Wertet die Regeln aus und aktualisiert den Zustand.
+
+        :return: (aktive Alarme, davon jetzt zu meldende Alarme)
+        """
+        params = {**DEFAULT_PARAMS, **(params or {})}
+        now = time.time() if now is None else now
+        active = self.evaluate(symbol, last, previous, params)
+        active_names = {a["rule"] for a in active}
+        notify = []
+        changed = False
+
+        with self._lock:
+            for rule in self.rules:
+                key = self.key(symbol, rule)
+                entry = self.state.get(key, {"armed": True, "last_sent": None})
+
+                # Hysterese: erst nach Verlassen der Zone wieder scharf schalten
+                if not entry["armed"] and rule.reset is not None and rule.reset(last, previous, params):
+                    entry = {**entry, "armed": True}
+                    changed = True
+
+                if rule.name in active_names and rule.signal:
+                    cooldown = self.cooldowns.get(rule.name, rule.cooldown)
+                    cooled = entry["last_sent"] is None or now - entry["last_sent"] >= cooldown
+                    if entry["armed"] and cooled:
+                        notify.append(next(a for a in active if a["rule"] == rule.name))
+                        entry = {"armed": rule.reset is None, "last_sent": now}
+                        changed = True
+
+                self.state[key] = entry
+            if changed:
+                self._save()
+
+        return active, notify
+
+    @staticmethod
+    def score(active) -> int:
+        return sum(a["score"] for a in active)
+
+    @staticmethod
+    def signal_log(symbol, active) -> list:
+        """Einträge (Zeit, Symbol, Aktion, Begründung) für die Signal-Historie."""
+        now = datetime.now()
+        return [(now, symbol, a["direction"], a["reason"]) for a in active if a["direction"]]
@@ -0,0 +1,375 @@
+# backfill.py
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import requests
+
+# Project root so that "import crypto_warnsystem" works
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from crypto_warnsystem.utils.kline_store import KLINE_DTYPE, KlineStore, klines_to_records, now_ms, resolve_time
+from crypto_warnsystem.utils.metrics import timed
+from crypto_warnsystem.utils.scanner import WeightLimiter
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_DIR = os.getenv("BACKFILL_DIR", os.path.join("data", "backfill"))
+
+# GET /api/v3/klines: höchstens 1000 Kerzen je Seite, Weight 2
+PAGE_LIMIT = 1000
+PAGE_WEIGHT = 2
+# Ein Chunk = 10 Seiten (bei 1m knapp eine Woche)
+DEFAULT_CHUNK_PAGES = 10
+DEFAULT_WORKERS = 4
+# Binance erlaubt 6000 Weight pro Minute; Reserve für Scanner und Bot im selben Netz
+DEFAULT_MAX_WEIGHT = 3000
+# Binance-Statuscodes, nach denen sich ein erneuter Versuch lohnt
+RETRY_STATUS = {418, 429, 500, 502, 503, 504}
+# Netzwerkfehler (Timeout, Verbindungsabbruch) werden ebenfalls wiederholt
+NETWORK_ERRORS = (requests.RequestException, OSError)
+
+
+def plan_chunks(start_ms: int, end_ms: int, chunk_ms: int) -> list:
+    """
+    Teilt [start_ms, end_ms) in Chunks auf, deren Grenzen auf Vielfachen von
+    chunk_ms liegen. So ergeben spätere Läufe mit anderem Zeitraum dieselben
+    Chunks und können die bereits geladenen wiederverwenden.
+
+    :return: Liste (chunk_start, chunk_end) mit auf den Zeitraum gekürzten Randchunks
+    """
+    chunks = []
+    grid = start_ms - start_ms % chunk_ms
+    while grid < end_ms:
+        chunks.append((max(grid, start_ms), min(grid + chunk_ms, end_ms)))
+        grid += chunk_ms
+    return chunks
+
+
+def find_gaps(times: np.ndarray, start_ms: int, end_ms: int, interval_ms: int) -> list:
+    """
+    Fehlende Kerzen in [start_ms, end_ms) als Liste [lücke_start, lücke_ende).
+
+    :param times: aufsteigende Öffnungszeiten der vorhandenen Kerzen
+    """
+    first = start_ms + (-start_ms) % interval_ms
+    bounds = np.concatenate([[first - interval_ms], np.asarray(times, dtype=np.int64), [end_ms]])
+    steps = np.diff(bounds)
+    missing = np.flatnonzero(steps > interval_ms)
+    return [[int(bounds[i] + interval_ms), int(bounds[i + 1])] for i in missing
+            if bounds[i] + interval_ms < end_ms]
+
+
+class Backfill:
+    """
+    Paralleler, wiederaufnehmbarer Download langer Kerzenhistorien.
+
+    Der Zeitraum wird in Chunks zerlegt, die ein Thread-Pool unter einem
+    gemeinsamen Weight-Limit seitenweise über client.get_klines lädt. Jeder
+    Chunk wird atomar als eigene Datei (KLINE_DTYPE) geschrieben und im
+    Manifest vermerkt; ein abgebrochener Lauf setzt beim nächsten Start mit
+    den fehlenden Chunks fort. Lücken innerhalb eines Chunks werden gezielt
+    nachgeladen; was danach noch fehlt (z. B. Wartungsfenster der Börse),
+    steht als bekannte Lücke im Manifest.
+
+    Dateien: <directory>/<SYMBOL>_<interval>/manifest.json und <chunk_start>.bin
+    """
+
+    def __init__(self, client, symbol: str, interval: str, start, end=None, directory: str = BACKFILL_DIR,
+                 chunk_pages: int = DEFAULT_CHUNK_PAGES, max_workers: int = DEFAULT_WORKERS,
+                 limiter: WeightLimiter = None, retries: int = 3, backoff: float = 1.0):
+        from binance.helpers import interval_to_milliseconds
+
+        self.client = client
+        self.symbol = symbol.upper()
+        self.interval = interval
+        self.interval_ms = interval_to_milliseconds(interval)
+        now = now_ms()
+        self.start_ms = resolve_time(start, now)
+        # Nur abgeschlossene Kerzen: Ende höchstens beim Beginn der offenen Kerze
+        end_ms = resolve_time(end, now) if end is not None else now
+        self.end_ms = min(end_ms, now - now % self.interval_ms)
+        self.chunk_ms = chunk_pages * PAGE_LIMIT * self.interval_ms
+        self.directory = os.path.join(directory, f"{self.symbol}_{interval}")
+        self.max_workers = max_workers
+        self.limiter = limiter or WeightLimiter(DEFAULT_MAX_WEIGHT)
+        self.retries = retries
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self.manifest = self._read_manifest()
+
+    # --- Manifest ---------------------------------------------------------
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, "manifest.json")
+
+    def chunk_path(self, chunk_start: int) -> str:
+        return os.path.join(self.directory, f"{chunk_start}.bin")
+
+    def _read_manifest(self) -> dict:
+        fresh = {"symbol": self.symbol, "interval": self.interval, "chunk_ms": self.chunk_ms, "chunks": {}}
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return fresh
+        # Anders geschnittene Chunks (geänderte chunk_pages) nicht wiederverwenden
+        if manifest.get("chunk_ms") != self.chunk_ms:
+            logger.warning(f"Backfill {self.symbol} {self.interval}: Chunkgröße geändert, Manifest wird neu angelegt")
+            return fresh
+        return manifest
+
+    def _write_manifest(self):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    def is_done(self, chunk_start: int, chunk_end: int) -> bool:
+        """Chunk ist vollständig geladen und deckt [chunk_start, chunk_end) ab."""
+        entry = self.manifest["chunks"].get(str(chunk_start - chunk_start % self.chunk_ms))
+        return (entry is not None and entry["start"] <= chunk_start and entry["end"] >= chunk_end
+                and os.path.exists(self.chunk_path(entry["start"])))
+
+    # --- Download ---------------------------------------------------------
+
+    def _call(self, **params) -> list:
+        """Eine Seite über client.get_klines; wiederholt bei Rate-Limit, Serverfehlern und Netzwerkfehlern."""
+        attempt = 0
+        while True:
+            self.limiter.acquire(PAGE_WEIGHT)
+            try:
+                return self.client.get_klines(symbol=self.symbol, interval=self.interval, limit=PAGE_LIMIT, **params)
+            except Exception as e:
+                # Alles andere (ungültige Parameter, Programmfehler) sofort weiterreichen
+                status = getattr(e, "status_code", None)
+                retryable = status in RETRY_STATUS if status is not None else isinstance(e, NETWORK_ERRORS)
+                if attempt >= self.retries or not retryable:
+                    raise
+                retry_after = getattr(e, "retry_after", None)
+                response = getattr(e, "response", None)
+                if retry_after is None and response is not None:
+                    retry_after = getattr(response, "headers", {}).get("Retry-After")
+                wait = float(retry_after) if retry_after is not None else self.backoff * 2 ** attempt
+                logger.warning(f"Backfill {self.symbol}: {e} – neuer Versuch in {wait:.1f}s")
+                time.sleep(wait)
+                attempt += 1
+
+    def fetch_range(self, start_ms: int, end_ms: int) -> np.ndarray:
+        """Alle Kerzen in [start_ms, end_ms), seitenweise ab start_ms."""
+        pages = []
+        cursor = start_ms
+        while cursor < end_ms:
+            klines = self._call(startTime=cursor, endTime=end_ms - 1)
+            if not klines:
+                break
+            records = klines_to_records(klines)
+            pages.append(records)
+            cursor = int(records["time"][-1]) + self.interval_ms
+            if len(klines) < PAGE_LIMIT:
+                break
+        if not pages:
+            return np.empty(0, dtype=KLINE_DTYPE)
+        records = np.concatenate(pages)
+        return records[(records["time"] >= start_ms) & (records["time"] < end_ms)]
+
+    def _download_range(self, chunk_start: int, chunk_end: int) -> tuple:
+        """
+        Zu ladender Bereich für einen offenen Chunk. Liegt im selben Gitterfeld
+        schon ein kürzerer Chunk, wird bis an ihn heran geladen, damit beide zu
+        einem lückenlosen Eintrag zusammengeführt werden können.
+        """
+        previous = self.manifest["chunks"].get(str(chunk_start - chunk_start % self.chunk_ms))
+        if previous is None or not os.path.exists(self.chunk_path(previous["start"])):
+            return chunk_start, chunk_end
+        return min(chunk_start, previous["end"]), max(chunk_end, previous["start"])
+
+    def _write_chunk(self, chunk_start: int, records: np.ndarray):
+        path = self.chunk_path(chunk_start)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(np.ascontiguousarray(records, dtype=KLINE_DTYPE).tobytes())
+        os.replace(tmp, path)
+
+    def _store_entry(self, entry: dict):
+        """
+        Vermerkt einen geladenen Chunk im Manifest. Ein älterer Eintrag im selben
+        Gitterfeld wird mit ihm zusammengeführt statt überschrieben, so dass
+        bereits geladene Kerzen außerhalb des neuen Bereichs erhalten bleiben.
+        """
+        key = str(entry["start"] - entry["start"] % self.chunk_ms)
+        previous = self.manifest["chunks"].get(key)
+        if previous is not None and previous["start"] != entry["start"]:
+            old_path = self.chunk_path(previous["start"])
+            if os.path.exists(old_path):
+                records = np.concatenate([np.fromfile(old_path, dtype=KLINE_DTYPE),
+                                          np.fromfile(self.chunk_path(entry["start"]), dtype=KLINE_DTYPE)])
+                _, first = np.unique(records["time"], return_index=True)
+                records = records[first]
+                start, end = min(previous["start"], entry["start"]), max(previous["end"], entry["end"])
+                self._write_chunk(start, records)
+                entry = {"start": start, "end": end, "rows": int(len(records)),
+                         "gaps": find_gaps(records["time"], start, end, self.interval_ms)}
+        self.manifest["chunks"][key] = entry
+        self._write_manifest()
+        # Den nicht mehr referenzierten Teil erst nach dem Manifest entfernen
+        if previous is not None:
+            for stale in {previous["start"], entry["start"]} - {self.manifest["chunks"][key]["start"]}:
+                try:
+                    os.remove(self.chunk_path(stale))
+                except OSError:
+                    pass
+
+    @timed("backfill_chunk")
+    def download_chunk(self, chunk_start: int, chunk_end: int) -> dict:
+        """
+        Lädt einen Chunk, holt Lücken bis zu `retries`-mal gezielt nach und
+        schreibt ihn atomar (erst .tmp, dann os.replace).
+
+        :return: Manifest-Eintrag des Chunks
+        """
+        records = self.fetch_range(chunk_start, chunk_end)
+        gaps = find_gaps(records["time"], chunk_start, chunk_end, self.interval_ms)
+        for _ in range(self.retries):
+            if not gaps:
+                break
+            refetched = [self.fetch_range(gap_start, gap_end) for gap_start, gap_end in gaps]
+            records = np.concatenate([records, *refetched])
+            _, first = np.unique(records["time"], return_index=True)
+            records = records[first]
+            gaps = find_gaps(records["time"], chunk_start, chunk_end, self.interval_ms)
+
+        self._write_chunk(chunk_start, records)
+        return {"start": chunk_start, "end": chunk_end, "rows": int(len(records)), "gaps": gaps}
+
+    def run(self, verbose: bool = True) -> dict:
+        """
+        Lädt alle noch fehlenden Chunks parallel. Fehlgeschlagene Chunks brechen
+        den Lauf nicht ab; sie bleiben offen und werden beim nächsten Lauf geladen.
+
+        :return: Zusammenfassung (chunks, downloaded, skipped, failed, rows, gaps)
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        chunks = plan_chunks(self.start_ms, self.end_ms, self.chunk_ms)
+        todo = [self._download_range(*chunk) for chunk in chunks if not self.is_done(*chunk)]
+        if verbose:
+            print(f"⬇️ Backfill {self.symbol} {self.interval}: {len(todo)} von {len(chunks)} Chunks zu laden")
+
+        failed = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="backfill") as pool:
+            futures = {pool.submit(self.download_chunk, *chunk): chunk for chunk in todo}
+            for done, future in enumerate(as_completed(futures), start=1):
+                chunk_start, _ = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    failed[chunk_start] = str(e)
+                    logger.error(f"Backfill {self.symbol}: Chunk {chunk_start} fehlgeschlagen: {e}")
+                    continue
+                with self._lock:
+                    self._store_entry(entry)
+                if verbose and (done % 10 == 0 or done == len(todo)):
+                    print(f"   {done}/{len(todo)} Chunks")
+
+        entries = [self.manifest["chunks"].get(str(s - s % self.chunk_ms)) for s, _ in chunks]
+        return {
+            "chunks": len(chunks),
+            "downloaded": len(todo) - len(failed),
+            "skipped": len(chunks) - len(todo),
+            "failed": failed,
+            "rows": sum(e["rows"] for e in entries if e),
+            "gaps": [gap for e in entries if e for gap in e["gaps"]],
+        }
+
+    # --- Ergebnis ---------------------------------------------------------
+
+    def load(self) -> np.ndarray:
+        """Alle geladenen Kerzen des Zeitraums (aufsteigend, ohne Duplikate)."""
+        parts = []
+        for chunk_start, _ in plan_chunks(self.start_ms, self.end_ms, self.chunk_ms):
+            entry = self.manifest["chunks"].get(str(chunk_start - chunk_start % self.chunk_ms))
+            if entry is not None and os.path.exists(self.chunk_path(entry["start"])):
+                parts.append(np.fromfile(self.chunk_path(entry["start"]), dtype=KLINE_DTYPE))
+        if not parts:
+            return np.empty(0, dtype=KLINE_DTYPE)
+        records = np.concatenate(parts)
+        records = records[(records["time"] >= self.start_ms) & (records["time"] < self.end_ms)]
+        _, first = np.unique(records["time"], return_index=True)
+        return records[first]
+
+    def merge_into(self, store: KlineStore) -> int:
+        """
+        Übernimmt die Kerzen in den KlineStore. Als lückenlos ab start gilt der
+        Bestand nur, wenn der Backfill bis an die gespeicherten Kerzen heranreicht.
+
+        :return: Anzahl der übernommenen Kerzen
+        """
+        records = self.load()
+        if len(records) == 0:
+            return 0
+        stored = store.load(self.symbol, self.interval)
+        contiguous = len(stored) == 0 or self.end_ms >= int(stored["time"][0])
+        del stored
+        if not contiguous:
+            logger.warning(f"Backfill {self.symbol}: Lücke bis zum gespeicherten Bestand, "
+                           f"covered_from bleibt unverändert")
+        store.merge(self.symbol, self.interval, records, covered_from=self.start_ms if contiguous else None)
+        return int(len(records))
+
+
+def _time_arg(value: str):
+    return int(value) if value is not None and value.isdigit() else value
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Lange Kerzenhistorien parallel und wiederaufnehmbar in den Kerzenspeicher laden"
+    )
+    parser.add_argument('symbols', nargs='+', help='z. B. BTCUSDT ETHUSDT')
+    parser.add_argument('--interval', type=str, default="1m", help='Binance-Intervall')
+    parser.add_argument('--start', type=str, required=True, help='Beginn, z. B. "2 year ago UTC", Datum oder ms')
+    parser.add_argument('--end', type=str, default=None, help='Ende (Standard: jetzt)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Parallele Downloads')
+    parser.add_argument('--chunk-pages', type=int, default=DEFAULT_CHUNK_PAGES,
+                        help=f'Seiten à {PAGE_LIMIT} Kerzen je Chunk')
+    parser.add_argument('--max-weight', type=int, default=DEFAULT_MAX_WEIGHT,
+                        help='Höchstes Request-Weight pro Minute (alle Symbole zusammen)')
+    parser.add_argument('--dir', type=str, default=BACKFILL_DIR, help='Verzeichnis für Chunks und Manifest')
+    parser.add_argument('--no-merge', action='store_true', help='Nur herunterladen, nicht in den Kerzenspeicher übernehmen')
+    args = parser.parse_args()
+
+    from crypto_warnsystem.utils.data_utils import get_client, kline_store
+
+    limiter = WeightLimiter(args.max_weight)
+    failed = 0
+    for symbol in args.symbols:
+        backfill = Backfill(get_client(), symbol, args.interval, _time_arg(args.start), _time_arg(args.end),
+                            directory=args.dir, chunk_pages=args.chunk_pages, max_workers=args.workers,
+                            limiter=limiter)
+        t0 = time.perf_counter()
+        summary = backfill.run()
+        print(f"✅ {backfill.symbol}: {summary['rows']} Kerzen in {time.perf_counter() - t0:.1f}s "
+              f"({summary['downloaded']} Chunks geladen, {summary['skipped']} übersprungen)")
+        if summary["gaps"]:
+            print(f"⚠️ {len(summary['gaps'])} Lücken ohne Daten bei Binance (im Manifest vermerkt)")
+        if summary["failed"]:
+            failed += len(summary["failed"])
+            print(f"❌ {len(summary['failed'])} Chunks fehlgeschlagen – erneut starten, um fortzusetzen")
+        elif not args.no_merge:
+            merged = backfill.merge_into(kline_store)
+            print(f"💾 {merged} Kerzen in den Kerzenspeicher übernommen ({kline_store.root})")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# candles.py
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from crypto_warnsystem.utils.kline_store import OHLCV_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Speicherbudget des prozessweiten Kerzen-Caches (MB) und Höchstalter der Einträge (Sekunden)
+CANDLE_CACHE_MB = float(os.getenv("CANDLE_CACHE_MB", 256))
+CANDLE_CACHE_TTL = float(os.getenv("CANDLE_CACHE_TTL", 30))
+
+PRICE_DTYPE = np.dtype("<f4")
+TIME_DTYPE = np.dtype("<i8")
+
+
+class Candles:
+    """
+    Kompakter Kerzencontainer: time als int64 (Epoch-ms), OHLCV als float32
+    (28 statt 48 Byte je Kerze inkl. Zeit) und optional Indikatorspalten.
+
+    Die Spalten sind einzelne NumPy-Arrays; frame() liefert bei Bedarf den
+    gewohnten DataFrame mit Index 'time'.
+    """
+
+    def __init__(self, time_ms: np.ndarray, columns: dict, symbol: str = None, interval: str = None):
+        self.time = np.asarray(time_ms, dtype=TIME_DTYPE)
+        self.columns = columns
+        self.symbol = symbol
+        self.interval = interval
+
+    @classmethod
+    def from_klines(cls, klines: list, symbol: str = None, interval: str = None,
+                    dtype=PRICE_DTYPE) -> "Candles":
+        """
+        Direkt aus der Rohantwort von Binance (Listen mit 12 Feldern, Zahlen als
+        Strings), ohne den Umweg über einen DataFrame mit object-Spalten.
+        """
+        n = len(klines)
+        time_ms = np.fromiter((k[0] for k in klines), dtype=TIME_DTYPE, count=n)
+        # NumPy wandelt die Strings beim Anlegen direkt in den Zieltyp um
+        columns = {col: np.array([k[pos] for k in klines], dtype=dtype)
+                   for pos, col in enumerate(OHLCV_COLUMNS, start=1)}
+        return cls(time_ms, columns, symbol, interval)
+
+    @classmethod
+    def from_records(cls, records: np.ndarray, symbol: str = None, interval: str = None,
+                     dtype=PRICE_DTYPE) -> "Candles":
+        """Aus Datensätzen des KlineStore (KLINE_DTYPE)."""
+        columns = {col: np.asarray(records[col], dtype=dtype) for col in OHLCV_COLUMNS}
+        return cls(np.array(records["time"], dtype=TIME_DTYPE), columns, symbol, interval)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, symbol: str = None, interval: str = None,
+                   dtype=PRICE_DTYPE) -> "Candles":
+        """Aus einem OHLCV-DataFrame wie von get_klines (weitere Spalten werden mit übernommen)."""
+        time_ms = np.asarray(pd.DatetimeIndex(df.index).as_unit("ms").asi8, dtype=TIME_DTYPE)
+        columns = {col: df[col].to_numpy(dtype=dtype) for col in df.columns}
+        return cls(time_ms, columns, symbol, interval)
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    @property
+    def nbytes(self) -> int:
+        return self.time.nbytes + sum(col.nbytes for col in self.columns.values())
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        index = pd.to_datetime(self.time, unit="ms")
+        index.name = "time"
+        return index
+
+    def slice(self, start: int = None, stop: int = None) -> "Candles":
+        """Zeilenbereich als Sicht auf dieselben Arrays (ohne Kopie)."""
+        rows = slice(start, stop)
+        return Candles(self.time[rows], {k: v[rows] for k, v in self.columns.items()}, self.symbol, self.interval)
+
+    def tail(self, n: int) -> "Candles":
+        return self.slice(max(len(self) - n, 0))
+
+    def add_indicators(self, dtype=PRICE_DTYPE) -> "Candles":
+        """
+        Berechnet die Indikatoren von calculate_indicators und legt sie als
+        Spalten ab. Gerechnet wird in float64 (EMA/Rolling), gespeichert in
+        dtype; None behält float64.
+        """
+        from crypto_warnsystem.utils.indicator_utils import calculate_indicators
+        from crypto_warnsystem.utils.streaming_indicators import INDICATOR_COLUMNS
+
+        df = calculate_indicators(pd.DataFrame({"close": self.columns["close"].astype(np.float64)}))
+        for col in INDICATOR_COLUMNS:
+            self.columns[col] = df[col].to_numpy(dtype=dtype or np.float64)
+        return self
+
+    def frame(self, columns=None, dtype=None) -> pd.DataFrame:
+        """
+        DataFrame mit Index 'time' (Standard: alle Spalten in ihrem gespeicherten
+        Typ). dtype=float liefert das Format von get_klines für bestehenden Code.
+        """
+        columns = list(self.columns) if columns is None else columns
+        return pd.DataFrame(
+            {col: self.columns[col] if dtype is None else self.columns[col].astype(dtype) for col in columns},
+            index=self.index,
+        )
+
+
+class CandleCache:
+    """
+    Thread-sicherer LRU-Cache für Candles vieler Symbole mit Speicherbudget.
+
+    Überschreitet die Summe von Candles.nbytes das Budget, werden die am
+    längsten nicht mehr abgefragten Einträge verdrängt. Ein einzelner Eintrag,
+    der allein größer als das Budget ist, wird geliefert, aber nicht gecacht.
+
+    :param max_bytes: Budget in Byte (Standard: CANDLE_CACHE_MB)
+    :param ttl: Höchstalter eines Eintrags in Sekunden (None = ohne Ablauf)
+    """
+
+    def __init__(self, max_bytes: int = None, ttl: float = None):
+        self.max_bytes = int(CANDLE_CACHE_MB * 1024 * 1024) if max_bytes is None else int(max_bytes)
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (Zeitpunkt, Candles, Größe beim Einfügen)
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def get(self, key, loader=None):
+        """
+        Candles für key; bei Fehlen oder Ablauf wird loader() aufgerufen und das
+        Ergebnis gespeichert. Ohne loader wird None zurückgegeben.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] < self.ttl):
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            self.misses += 1
+        if loader is None:
+            return None
+        candles = loader()
+        self.put(key, candles)
+        return candles
+
+    def put(self, key, candles: Candles):
+        with self._lock:
+            self._remove(key)
+            size = candles.nbytes
+            if size > self.max_bytes:
+                logger.warning(f"Kerzen für {key} ({size / 1e6:.1f} MB) größer als das Cache-Budget")
+                return
+            self._entries[key] = (time.monotonic(), candles, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._remove(key)
+        return entry[1] if entry else None
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[2]
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
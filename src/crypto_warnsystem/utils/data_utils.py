@@ -1,28 +1,100 @@
-import pandas as pd
-from binance.client import Client
-import datetime
+import os
+import threading
 
-client = Client()  # Ohne API-Key für öffentliche Daten
+from crypto_warnsystem.utils.candles import CANDLE_CACHE_TTL, CandleCache, Candles
+from crypto_warnsystem.utils.kline_store import KlineStore, klines_to_records, records_to_frame
+from crypto_warnsystem.utils.metrics import timed
 
-def get_klines(symbol="BTCUSDT", interval=Client.KLINE_INTERVAL_5MINUTE, lookback="2 day ago UTC"):
+kline_store = KlineStore()
+# Kompakte Kerzen vieler Symbole im Arbeitsspeicher (CANDLE_CACHE_MB, CANDLE_CACHE_TTL)
+candle_cache = CandleCache(ttl=CANDLE_CACHE_TTL)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """
+    Prozessweiter Binance-Client ohne API-Key für öffentliche Daten.
+
+    Wird erst beim ersten Aufruf erzeugt: Import und Konstruktor (inkl. Ping
+    an die API) kosten sonst bei jedem Programmstart Zeit. Ist BINANCE_REPLAY
+    gesetzt, wird stattdessen der Offline-ReplayClient verwendet (siehe replay_client).
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if os.getenv("BINANCE_REPLAY"):
+                    from crypto_warnsystem.utils.replay_client import ReplayClient
+                    _client = ReplayClient.from_env()
+                else:
+                    from binance.client import Client
+                    _client = Client()
+    return _client
+
+def __getattr__(name):
+    # Kompatibilität zu "from data_utils import client"
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+KLINE_COLUMNS = [
+    'time', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_asset_volume', 'trades',
+    'taker_buy_base_volume', 'taker_buy_quote_volume', 'ignore'
+]
+
+@timed()
+def get_klines(symbol="BTCUSDT", interval="5m", lookback="2 day ago UTC", use_store=True):
     """
     Holt historische Kerzendaten von Binance.
 
-    :param symbol: z. B. 'BTCUSDT'
+    Standardmäßig wird zuerst der lokale Kerzenspeicher gelesen und nur der
+    fehlende Rest seit der letzten gespeicherten Kerze von Binance geladen.
+
+    :param symbol: z. B. 'BTCUSDT'
     :param interval: Binance-Interval-Konstante
-    :param lookback: Zeitspanne (z. B. "1 day ago UTC")
+    :param lookback: Zeitspanne (z. B. "1 day ago UTC")
+    :param use_store: False erzwingt den kompletten Abruf ohne lokalen Speicher
     :return: DataFrame mit OHLCV-Daten
     """
-    klines = client.get_historical_klines(symbol, interval, lookback)
+    if use_store:
+        return kline_store.get_klines(get_client(), symbol, interval, lookback)
+
+    # Direkt in Spalten-Arrays, ohne DataFrame mit object-Spalten als Zwischenschritt
+    klines = get_client().get_historical_klines(symbol, interval, lookback)
+    return records_to_frame(klines_to_records(klines))
+
+@timed()
+def get_candles(symbol="BTCUSDT", interval="5m", lookback="2 day ago UTC", indicators=False,
+                indicator_dtype="float32", use_store=True, cache: CandleCache = None,
+                use_cache=True) -> Candles:
+    """
+    Wie get_klines, aber als kompakte Candles (float32-Preise, int64-Zeit).
 
-    df = pd.DataFrame(klines, columns=[
-        'time', 'open', 'high', 'low', 'close', 'volume',
-        'close_time', 'quote_asset_volume', 'trades',
-        'taker_buy_base_volume', 'taker_buy_quote_volume', 'ignore'
-    ])
+    Gelesen wird über den Speicherbudget-Cache (Standard: candle_cache): ein
+    Eintrag gilt bis zu CANDLE_CACHE_TTL Sekunden, danach wird neu abgefragt,
+    damit die offene Kerze aktuell bleibt. Bei überschrittenem Budget werden
+    die am längsten ungenutzten Einträge verdrängt.
 
-    df['time'] = pd.to_datetime(df['time'], unit='ms')
-    df.set_index('time', inplace=True)
-    df = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
+    :param indicators: zusätzlich die Indikatoren von calculate_indicators berechnen
+    :param indicator_dtype: Typ der Indikatorspalten (None = float64)
+    :param use_cache: False fragt ohne Cache ab
+    """
+    def load():
+        if use_store:
+            records = kline_store.get_records(get_client(), symbol, interval, lookback)
+            candles = Candles.from_records(records, symbol, interval)
+        else:
+            klines = get_client().get_historical_klines(symbol, interval, lookback)
+            candles = Candles.from_klines(klines, symbol, interval)
+        if indicators:
+            candles.add_indicators(indicator_dtype)
+        return candles
 
-    return df
+    if not use_cache:
+        return load()
+    # Zeitraum und Indikator-Einstellungen gehören zum Schlüssel, sonst verdrängt
+    # ein kurzer Abruf einen langen
+    key = (symbol, interval, lookback, use_store, indicator_dtype if indicators else False)
+    return (candle_cache if cache is None else cache).get(key, load)
@@ -1,8 +1,10 @@
     # indicator_utils.py
 
-import ta
 import pandas as pd
 
+from crypto_warnsystem.utils.metrics import timed
+
+@timed()
 def calculate_indicators(df: pd.DataFrame) -> pd.DataFrame:
     """
     Fügt technische Indikatoren zum DataFrame hinzu:
@@ -11,6 +13,8 @@ def calculate_indicators(df: pd.DataFrame) -> pd.DataFrame:
     - Bollinger-Bänder
     - SMA 50 & 200
     """
+    # ta erst hier laden – der Import kostet spürbar Startzeit
+    import ta
 
     close = df["close"]
 
@@ -0,0 +1,286 @@
+# kline_store.py
+
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: ohne Dateisperre
+    fcntl = None
+
+KLINE_STORE_DIR = os.getenv("KLINE_STORE_DIR", os.path.join("data", "klines"))
+
+# Ein Datensatz pro abgeschlossener Kerze (48 Byte), direkt per np.memmap lesbar
+KLINE_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+# Zeitquelle für "jetzt" (Sekunden); die Replay-Simulation setzt eine virtuelle Uhr
+_clock = time.time
+
+# Relative Angaben wie "2 day ago UTC" ohne dateparser auflösen (Monat = 30, Jahr = 365 Tage)
+_RELATIVE_PATTERN = re.compile(r"^\s*(\d+)\s+(minute|hour|day|week|month|year)s?\s+ago(\s+utc)?\s*$", re.I)
+_UNIT_MS = {
+    "minute": 60_000,
+    "hour": 3_600_000,
+    "day": 86_400_000,
+    "week": 7 * 86_400_000,
+    "month": 30 * 86_400_000,
+    "year": 365 * 86_400_000,
+}
+
+
+def set_clock(clock=None):
+    """Setzt die prozessweite Zeitquelle (Funktion ohne Argumente, Sekunden); None = Systemzeit."""
+    global _clock
+    _clock = clock or time.time
+
+
+def now_ms() -> int:
+    return int(_clock() * 1000)
+
+
+def resolve_time(value, now: int = None) -> int:
+    """
+    Zeitpunkt in ms: ganze Zahlen unverändert, "N day ago UTC" relativ zu now
+    (Standard: aktuelle Zeitquelle), alles andere über binance.helpers.convert_ts_str.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    match = _RELATIVE_PATTERN.match(str(value))
+    if match:
+        now = now_ms() if now is None else now
+        return now - int(match.group(1)) * _UNIT_MS[match.group(2).lower()]
+    from binance.helpers import convert_ts_str
+
+    return convert_ts_str(value)
+
+
+def klines_to_records(klines: list) -> np.ndarray:
+    """
+    Wandelt die Rohantwort von Binance (Listen mit 12 Feldern) in Store-Datensätze um.
+    """
+    records = np.empty(len(klines), dtype=KLINE_DTYPE)
+    if not klines:
+        return records
+    records["time"] = [int(k[0]) for k in klines]
+    for pos, col in enumerate(OHLCV_COLUMNS, start=1):
+        records[col] = [float(k[pos]) for k in klines]
+    return records
+
+
+def records_to_frame(records: np.ndarray) -> pd.DataFrame:
+    """
+    Baut den von get_klines bekannten OHLCV-DataFrame (Index 'time') aus Datensätzen.
+    """
+    index = pd.to_datetime(np.asarray(records["time"]), unit="ms")
+    index.name = "time"
+    return pd.DataFrame(
+        {col: np.asarray(records[col], dtype=float) for col in OHLCV_COLUMNS},
+        index=index,
+    )
+
+
+class KlineStore:
+    """
+    Persistenter Kerzenspeicher auf der Festplatte (eine Binärdatei je Symbol/Intervall).
+
+    Gespeichert werden nur abgeschlossene Kerzen. Neue Kerzen werden angehängt,
+    gelesen wird per Memory-Map, so dass nur der angefragte Zeitraum geladen wird.
+    Lesen prüft die Datei nicht; Schreibzugriffe laufen unter einer Dateisperre,
+    Altbestände mit doppelten Kerzen bereinigt repair().
+    """
+
+    def __init__(self, root: str = None):
+        # Standard erst hier lesen: der Replay-Modus leitet KLINE_STORE_DIR zur Laufzeit um
+        self.root = root or KLINE_STORE_DIR
+
+    def path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, f"{symbol.upper()}_{interval}.bin")
+
+    def _meta_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, f"{symbol.upper()}_{interval}.json")
+
+    def _read_meta(self, symbol: str, interval: str) -> dict:
+        try:
+            with open(self._meta_path(symbol, interval)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @contextmanager
+    def _locked(self, symbol: str, interval: str):
+        # Verhindert, dass zwei Prozesse gleichzeitig anhängen (doppelte Kerzen)
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, f"{symbol.upper()}_{interval}.lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def covered_from(self, symbol: str, interval: str):
+        """Ab diesem Zeitpunkt (ms) ist der Bestand lückenlos; None, wenn unbekannt."""
+        return self._read_meta(symbol, interval).get("covered_from")
+
+    def _write_meta(self, symbol: str, interval: str, meta: dict):
+        tmp = self._meta_path(symbol, interval) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path(symbol, interval))
+
+    def load(self, symbol: str, interval: str, start_ms: int = None) -> np.ndarray:
+        """
+        Liest die gespeicherten Kerzen (ab start_ms) als schreibgeschützte Memory-Map.
+        """
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=KLINE_DTYPE)
+
+        n = os.path.getsize(path) // KLINE_DTYPE.itemsize
+        if n == 0:
+            return np.empty(0, dtype=KLINE_DTYPE)
+        data = np.memmap(path, dtype=KLINE_DTYPE, mode="r", shape=(n,))
+        if start_ms is not None:
+            data = data[np.searchsorted(data["time"], start_ms, side="left"):]
+        return data
+
+    def last_time(self, symbol: str, interval: str):
+        """Zeit der letzten gespeicherten Kerze; liest nur den letzten vollständigen Datensatz."""
+        try:
+            with open(self.path(symbol, interval), "rb") as f:
+                n = os.fstat(f.fileno()).st_size // KLINE_DTYPE.itemsize
+                if n == 0:
+                    return None
+                f.seek((n - 1) * KLINE_DTYPE.itemsize)
+                return int(np.frombuffer(f.read(KLINE_DTYPE.itemsize), dtype=KLINE_DTYPE)["time"][0])
+        except FileNotFoundError:
+            return None
+
+    def append(self, symbol: str, interval: str, records: np.ndarray):
+        """
+        Hängt Kerzen an, die neuer sind als die zuletzt gespeicherte.
+        """
+        with self._locked(symbol, interval):
+            last = self.last_time(symbol, interval)
+            if last is not None:
+                records = records[records["time"] > last]
+            if len(records) == 0:
+                return
+            with open(self.path(symbol, interval), "ab") as f:
+                f.write(np.ascontiguousarray(records, dtype=KLINE_DTYPE).tobytes())
+
+    def repair(self, symbol: str, interval: str) -> int:
+        """
+        Prüft die Datei vollständig und bereinigt doppelte oder unsortierte
+        Kerzen (z. B. aus Dateien, die vor der Dateisperre geschrieben wurden).
+
+        :return: Anzahl der entfernten Kerzen
+        """
+        with self._locked(symbol, interval):
+            data = self.load(symbol, interval)
+            if len(data) < 2 or np.all(np.diff(data["time"]) > 0):
+                return 0
+            _, first = np.unique(data["time"], return_index=True)
+            repaired = np.array(data[first])
+            removed = len(data) - len(repaired)
+            del data
+            self.replace(symbol, interval, repaired)
+            return removed
+
+    def replace(self, symbol: str, interval: str, records: np.ndarray):
+        """
+        Ersetzt die Datei atomar durch die übergebenen Kerzen.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(symbol, interval)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(np.ascontiguousarray(records, dtype=KLINE_DTYPE).tobytes())
+        os.replace(tmp, path)
+
+    def merge(self, symbol: str, interval: str, records: np.ndarray, covered_from: int = None):
+        """
+        Führt Kerzen (z. B. aus einem Backfill) mit dem Bestand zusammen und
+        ersetzt die Datei atomar. Bei doppelten Zeitstempeln gewinnt der Bestand.
+
+        :param covered_from: ab hier ist der Bestand nach dem Zusammenführen
+            lückenlos; wird nur übernommen, wenn er weiter zurückreicht als bisher
+        """
+        with self._locked(symbol, interval):
+            existing = np.asarray(self.load(symbol, interval))
+            combined = np.concatenate([existing, np.asarray(records, dtype=KLINE_DTYPE)])
+            _, first = np.unique(combined["time"], return_index=True)
+            self.replace(symbol, interval, combined[first])
+        if covered_from is not None:
+            meta = self._read_meta(symbol, interval)
+            if meta.get("covered_from") is None or covered_from < meta["covered_from"]:
+                meta["covered_from"] = int(covered_from)
+                self._write_meta(symbol, interval, meta)
+
+    def get_klines(self, client, symbol: str, interval: str, lookback) -> pd.DataFrame:
+        """
+        Liefert Kerzen ab `lookback` als OHLCV-DataFrame (siehe get_records).
+        """
+        return records_to_frame(self.get_records(client, symbol, interval, lookback))
+
+    def get_records(self, client, symbol: str, interval: str, lookback) -> np.ndarray:
+        """
+        Liefert Kerzen ab `lookback` und holt dabei nur den fehlenden Rest vom Client.
+
+        Beim Kaltstart wird einmal der komplette Zeitraum geladen, danach nur noch
+        die Kerzen nach der zuletzt gespeicherten (inkl. der noch offenen Kerze,
+        die zurückgegeben, aber nicht gespeichert wird).
+        """
+        from binance.helpers import interval_to_milliseconds
+
+        now = now_ms()
+        start_ms = resolve_time(lookback, now)
+        interval_ms = interval_to_milliseconds(interval)
+
+        meta = self._read_meta(symbol, interval)
+        last = self.last_time(symbol, interval)
+        covered_from = meta.get("covered_from")
+
+        if last is None or covered_from is None or start_ms < covered_from:
+            # Kaltstart oder weiter zurück als bisher gespeichert → voller Abruf
+            klines = client.get_historical_klines(symbol, interval, start_ms)
+            records = klines_to_records(klines)
+            closed = records[records["time"] + interval_ms <= now]
+            # Leere Antwort: Bestand und covered_from nicht überschreiben
+            if len(closed):
+                with self._locked(symbol, interval):
+                    # Während des Abrufs angehängte Kerzen (z. B. vom Stream) behalten
+                    newer = np.asarray(self.load(symbol, interval, int(closed["time"][-1]) + 1))
+                    self.replace(symbol, interval, np.concatenate([closed, newer]))
+                    self._write_meta(symbol, interval, {"covered_from": start_ms})
+        else:
+            # Nur die Kerzen nach der letzten gespeicherten nachladen
+            klines = client.get_historical_klines(symbol, interval, last + interval_ms)
+            records = klines_to_records(klines)
+            closed = records[records["time"] + interval_ms <= now]
+            self.append(symbol, interval, closed)
+
+        stored = self.load(symbol, interval, start_ms)
+        open_candles = records[records["time"] + interval_ms > now]
+        if len(stored):
+            open_candles = open_candles[open_candles["time"] > stored["time"][-1]]
+        return np.concatenate([np.asarray(stored), open_candles])
@@ -0,0 +1,278 @@
+# kline_stream.py
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import sys
+
+import numpy as np
+import websockets
+from binance.helpers import interval_to_milliseconds
+
+# Project root so that "import crypto_warnsystem" works
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from crypto_warnsystem.utils.kline_store import KLINE_DTYPE, KlineStore
+from crypto_warnsystem.utils.streaming_indicators import IncrementalIndicators
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+
+# Binance erlaubt höchstens 1024 Streams pro Verbindung
+MAX_STREAMS_PER_CONNECTION = 1024
+
+logger = logging.getLogger(__name__)
+
+
+def parse_kline_message(message) -> dict:
+    """
+    Wandelt eine Kline-Nachricht des kombinierten Streams in ein Kerzen-Dict um.
+
+    :return: Dict mit symbol, interval, time (ms), open, high, low, close, volume, closed
+    """
+    if isinstance(message, (str, bytes)):
+        message = json.loads(message)
+    k = message.get("data", message)["k"]
+    return {
+        "symbol": k["s"],
+        "interval": k["i"],
+        "time": int(k["t"]),
+        "open": float(k["o"]),
+        "high": float(k["h"]),
+        "low": float(k["l"]),
+        "close": float(k["c"]),
+        "volume": float(k["v"]),
+        "closed": bool(k["x"]),
+    }
+
+
+class KlineStream:
+    """
+    Asynchroner Kline-Empfang über den kombinierten Binance-WebSocket-Stream.
+
+    Viele Symbole teilen sich eine Verbindung. Jede abgeschlossene Kerze wird
+    im KlineStore angehängt und anschließend an alle Abonnenten verteilt
+    (Callbacks oder asyncio-Queues); candle["stored"] gibt an, ob sie dabei
+    neu gespeichert wurde. Bei Verbindungsabbrüchen wird mit wachsender
+    Wartezeit neu verbunden.
+
+    Mit client werden fehlende Kerzen per REST nachgeladen: nach jedem
+    (Wieder-)Verbinden und sobald eine Kerze nicht an den Bestand anschließt.
+    """
+
+    def __init__(self, symbols, interval: str = "1m", store: KlineStore = None,
+                 url: str = BINANCE_STREAM_URL, reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 60.0, client=None):
+        self.symbols = [s.upper() for s in symbols]
+        self.interval = interval
+        self.store = store
+        self.client = client
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._callbacks = []
+        self._queues = []
+        self._running = False
+
+    def subscribe(self, callback=None):
+        """
+        Registriert einen Abonnenten für abgeschlossene Kerzen.
+
+        :param callback: Funktion oder Coroutine-Funktion callback(candle).
+                         Ohne callback wird eine asyncio.Queue zurückgegeben.
+        """
+        if callback is not None:
+            self._callbacks.append(callback)
+            return callback
+        queue = asyncio.Queue()
+        self._queues.append(queue)
+        return queue
+
+    def _connections(self) -> list:
+        """Symbole je WebSocket-Verbindung."""
+        return [self.symbols[i:i + MAX_STREAMS_PER_CONNECTION]
+                for i in range(0, len(self.symbols), MAX_STREAMS_PER_CONNECTION)]
+
+    def stream_urls(self) -> list:
+        return [
+            f"{self.url}?streams=" + "/".join(f"{s.lower()}@kline_{self.interval}" for s in symbols)
+            for symbols in self._connections()
+        ]
+
+    def fill_gap(self, symbol: str, interval: str = None):
+        """
+        Lädt per REST (KlineStore.get_records) alle abgeschlossenen Kerzen nach
+        der zuletzt gespeicherten nach. Ohne client oder Bestand passiert nichts.
+        """
+        interval = interval or self.interval
+        if self.client is None or self.store is None:
+            return
+        last = self.store.last_time(symbol, interval)
+        if last is None:
+            return
+        # Nur inkrementell laden; ohne bekannten Anfang ab der ersten gespeicherten Kerze
+        lookback = self.store.covered_from(symbol, interval)
+        if lookback is None or lookback > last:
+            lookback = int(self.store.load(symbol, interval)["time"][0])
+        else:
+            lookback = last
+        try:
+            self.store.get_records(self.client, symbol, interval, lookback)
+        except Exception as e:
+            logger.warning("Nachladen für %s fehlgeschlagen: %s", symbol, e)
+
+    def catch_up(self, symbols=None):
+        """Schließt die Lücken seit der letzten gespeicherten Kerze (beim Start und nach Reconnects)."""
+        for symbol in symbols or self.symbols:
+            self.fill_gap(symbol)
+
+    def _store_candle(self, candle: dict) -> bool:
+        """
+        Hängt die Kerze an, wenn sie lückenlos an den gespeicherten Bestand
+        anschließt; eine Lücke davor wird zuerst per REST gefüllt.
+
+        :return: True, wenn die Kerze jetzt neu im Speicher liegt
+        """
+        symbol, interval = candle["symbol"], candle["interval"]
+        step = interval_to_milliseconds(interval)
+        last = self.store.last_time(symbol, interval)
+        if last is not None and candle["time"] > last + step:
+            self.fill_gap(symbol, interval)
+            last = self.store.last_time(symbol, interval)
+            if last >= candle["time"]:
+                return True
+        if last is not None and candle["time"] != last + step:
+            if candle["time"] > last + step:
+                logger.warning("Lücke im Kerzenspeicher für %s – Kerze wird nicht gespeichert", symbol)
+            return False
+        record = np.array([(candle["time"], candle["open"], candle["high"], candle["low"],
+                            candle["close"], candle["volume"])], dtype=KLINE_DTYPE)
+        self.store.append(candle["symbol"], candle["interval"], record)
+        return True
+
+    async def _publish(self, candle: dict):
+        for callback in self._callbacks:
+            try:
+                result = callback(candle)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Fehler im Kline-Abonnenten %r", callback)
+        for queue in self._queues:
+            queue.put_nowait(candle)
+
+    async def handle_message(self, message):
+        candle = parse_kline_message(message)
+        if not candle["closed"]:
+            return
+        # REST-Nachladen blockiert; nicht in der Ereignisschleife ausführen
+        candle["stored"] = await asyncio.to_thread(self._store_candle, candle) if self.store is not None else True
+        await self._publish(candle)
+
+    async def _run_connection(self, url: str, symbols: list):
+        delay = self.reconnect_delay
+        while self._running:
+            try:
+                async with websockets.connect(url, ping_interval=20) as ws:
+                    logger.info("Verbunden mit %s", url)
+                    delay = self.reconnect_delay
+                    # Kerzen, die während der Trennung geschlossen wurden
+                    await asyncio.to_thread(self.catch_up, symbols)
+                    async for message in ws:
+                        await self.handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Kline-Stream getrennt (%s) – neuer Versuch in %.1fs", e, delay)
+            if self._running:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def run(self):
+        """Läuft, bis stop() aufgerufen oder der Task abgebrochen wird."""
+        self._running = True
+        await asyncio.gather(*(self._run_connection(url, symbols)
+                               for url, symbols in zip(self.stream_urls(), self._connections())))
+
+    def stop(self):
+        self._running = False
+
+
+class LiveIndicators:
+    """
+    Abonnent, der je Symbol einen IncrementalIndicators-Zustand führt.
+
+    Beim ersten Kerzen-Ereignis eines Symbols wird der Zustand aus dem
+    KlineStore aufgewärmt; danach kostet jede neue Kerze nur ein O(1)-Update.
+    Die Ergebnisse werden an on_update(candle, indicators) weitergereicht.
+
+    Nicht gespeicherte Kerzen (candle["stored"] False) fließen nicht ein.
+    Schließt eine Kerze nicht an die zuletzt verarbeitete an (z. B. nach einer
+    per REST gefüllten Lücke), wird der Zustand neu aus dem Speicher aufgebaut,
+    damit er dem Stand nach einem Neustart entspricht.
+    """
+
+    def __init__(self, store: KlineStore = None, on_update=None):
+        self.store = store
+        self.on_update = on_update
+        self.states = {}
+        self.latest = {}
+        self.times = {}
+
+    def _warm_up(self, key, before_ms: int) -> IncrementalIndicators:
+        state = IncrementalIndicators()
+        if self.store is not None:
+            history = self.store.load(*key)
+            # Die soeben gespeicherte Kerze selbst nicht doppelt zählen
+            history = history[history["time"] < before_ms]
+            for close in np.asarray(history["close"], dtype=float):
+                state.update(close)
+        return state
+
+    def __call__(self, candle: dict):
+        key = (candle["symbol"], candle["interval"])
+        if not candle.get("stored", True):
+            return None
+        previous = candle["time"] - interval_to_milliseconds(candle["interval"])
+        if key not in self.states or (self.store is not None and self.times[key] != previous):
+            self.states[key] = self._warm_up(key, candle["time"])
+        values = self.states[key].update(candle["close"])
+        self.times[key] = candle["time"]
+        self.latest[key] = values
+        if self.on_update is not None:
+            return self.on_update(candle, values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kline-Streaming von Binance in den lokalen Kerzenspeicher")
+    parser.add_argument('--symbols', type=str, default='BTCUSDT', help='Kommagetrennt, z. B. BTCUSDT,ETHUSDT')
+    parser.add_argument('--interval', type=str, default='1m', help='Kline interval, e.g., 1m, 1h')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    from crypto_warnsystem.utils.data_utils import get_client
+
+    store = KlineStore()
+    stream = KlineStream(args.symbols.split(","), interval=args.interval, store=store, client=get_client())
+    # Einmal beim Start statt bei jedem Lesen: Altbestände mit doppelten Kerzen bereinigen
+    for symbol in stream.symbols:
+        removed = store.repair(symbol, args.interval)
+        if removed:
+            logger.warning(f"{symbol}: {removed} doppelte Kerzen aus dem Speicher entfernt")
+
+    def show(candle, values):
+        print(f"🕯️ {candle['symbol']} {candle['close']:.2f} | RSI {values['rsi']:.2f} | MACD {values['macd']:.4f}")
+
+    stream.subscribe(LiveIndicators(store, on_update=show))
+    print(f"📡 Streaming für {len(stream.symbols)} Symbole gestartet...")
+    try:
+        asyncio.run(stream.run())
+    except KeyboardInterrupt:
+        stream.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# message_queue.py
+
+import logging
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from crypto_warnsystem.utils.metrics import timed
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+
+# Telegram-Limits: ca. 30 Nachrichten/s insgesamt, 1/s je Chat, 20/min je Gruppe
+GLOBAL_RATE = 30.0
+CHAT_INTERVAL = 1.0
+GROUP_INTERVAL = 3.0
+
+logger = logging.getLogger(__name__)
+
+
+class _Message:
+    __slots__ = ("chat_id", "text", "attempt", "not_before")
+
+    def __init__(self, chat_id, text):
+        self.chat_id = str(chat_id)
+        self.text = text
+        self.attempt = 0
+        self.not_before = 0.0
+
+    @property
+    def key(self):
+        return (self.chat_id, self.text)
+
+
+class TelegramQueue:
+    """
+    Ausgehende Telegram-Nachrichten über einen Hintergrund-Thread.
+
+    enqueue() kehrt sofort zurück. Der Worker versendet über eine
+    wiederverwendete HTTP-Session, hält das globale Limit und die Abstände je
+    Chat ein (Gruppen-Chats mit negativer ID langsamer), wiederholt bei 429
+    und Serverfehlern mit Backoff und fasst identische, noch wartende
+    Nachrichten an denselben Chat zusammen.
+    """
+
+    def __init__(self, token: str, api_url: str = TELEGRAM_API_URL, global_rate: float = GLOBAL_RATE,
+                 chat_interval: float = CHAT_INTERVAL, group_interval: float = GROUP_INTERVAL,
+                 max_retries: int = 5, backoff: float = 1.0, timeout: float = 10.0):
+        self.url = f"{api_url}/bot{token}/sendMessage"
+        self.global_interval = 1.0 / global_rate
+        self.chat_interval = chat_interval
+        self.group_interval = group_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+        self._pending = deque()
+        self._keys = set()
+        self._next_chat = {}
+        self._next_global = 0.0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self.sent = 0
+        self.dropped = 0
+
+    def enqueue(self, chat_id, text: str) -> bool:
+        """
+        Reiht eine Nachricht ein. Gibt False zurück, wenn dieselbe Nachricht
+        an denselben Chat bereits wartet (Duplikat wird verworfen).
+        """
+        message = _Message(chat_id, text)
+        with self._cond:
+            if message.key in self._keys:
+                return False
+            self._keys.add(message.key)
+            self._pending.append(message)
+            self._cond.notify()
+        self.start()
+        return True
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._cond:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stopped = False
+                    self._thread = threading.Thread(target=self._run, name="telegram-queue", daemon=True)
+                    self._thread.start()
+
+    def stop(self, timeout: float = None):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wartet, bis alle Nachrichten verarbeitet sind. False bei Zeitüberschreitung."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _interval(self, chat_id: str) -> float:
+        return self.group_interval if chat_id.startswith("-") else self.chat_interval
+
+    def _next_ready(self, now: float):
+        """Erste Nachricht, deren Chat frei ist – blockierte Chats halten andere nicht auf."""
+        wait = None
+        for message in self._pending:
+            ready_at = max(message.not_before, self._next_chat.get(message.chat_id, 0.0), self._next_global)
+            if ready_at <= now:
+                return message, 0.0
+            wait = ready_at - now if wait is None else min(wait, ready_at - now)
+        return None, wait
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    now = time.monotonic()
+                    message, wait = self._next_ready(now)
+                    if message is not None:
+                        break
+                    self._cond.wait(wait)
+                self._pending.remove(message)
+                self._next_global = now + self.global_interval
+                self._next_chat[message.chat_id] = now + self._interval(message.chat_id)
+                self._in_flight += 1
+
+            retry_after = self._deliver(message)
+
+            with self._cond:
+                self._in_flight -= 1
+                if retry_after is None:
+                    self._keys.discard(message.key)
+                else:
+                    message.attempt += 1
+                    message.not_before = time.monotonic() + retry_after
+                    self._pending.appendleft(message)
+                self._cond.notify_all()
+
+    @timed("telegram_deliver")
+    def _deliver(self, message: _Message):
+        """Sendet eine Nachricht. Gibt die Wartezeit für einen neuen Versuch zurück oder None."""
+        payload = {"chat_id": message.chat_id, "text": message.text}
+        retryable = message.attempt < self.max_retries
+        try:
+            response = self.session.post(self.url, data=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.warning("Telegram nicht erreichbar: %s", e)
+            if retryable:
+                return self.backoff * 2 ** message.attempt
+            self.dropped += 1
+            return None
+
+        if response.status_code == 429 and retryable:
+            try:
+                retry_after = response.json()["parameters"]["retry_after"]
+            except (ValueError, KeyError, TypeError):
+                retry_after = self.backoff * 2 ** message.attempt
+            return float(retry_after)
+        if response.status_code >= 500 and retryable:
+            return self.backoff * 2 ** message.attempt
+        if not response.ok:
+            logger.error("Telegram-Fehler %s: %s", response.status_code, response.text[:200])
+            self.dropped += 1
+            return None
+
+        self.sent += 1
+        return None
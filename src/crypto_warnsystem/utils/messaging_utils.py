@@ -1,21 +1,53 @@
+import atexit
+import threading
+
 import requests
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from crypto_warnsystem.utils.message_queue import TelegramQueue
+from crypto_warnsystem.utils.metrics import timed
+
+_queue = None
+_queue_lock = threading.Lock()
+_env_loaded = False
+
+def _getenv(name: str):
+    """os.getenv, lädt aber beim ersten Zugriff die .env (statt schon beim Import)."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+    return os.getenv(name)
 
+def get_queue() -> TelegramQueue:
+    """Prozessweite Telegram-Warteschlange (wird beim ersten Aufruf gestartet)."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = TelegramQueue(_getenv("TELEGRAM_TOKEN"))
+                # Beim Beenden noch wartende Nachrichten zustellen
+                atexit.register(_queue.flush, 10)
+    return _queue
+
+@timed()
 def send_message(chat_id: str, text: str):
-    """Sendet eine Nachricht an einen Telegram-Chat."""
-    token = os.getenv("TELEGRAM_TOKEN")
+    """Reiht eine Nachricht an einen Telegram-Chat ein (blockiert nicht)."""
+    get_queue().enqueue(chat_id, text)
+
+def send_message_sync(chat_id: str, text: str):
+    """Sendet eine Nachricht an einen Telegram-Chat und wartet auf die Antwort."""
+    token = _getenv("TELEGRAM_TOKEN")
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = {"chat_id": chat_id, "text": text}
     try:
-        response = requests.post(url, data=payload)
+        response = requests.post(url, data=payload, timeout=10)
         response.raise_for_status()
     except Exception as e:
         print(f"❌ Fehler beim Senden an Telegram: {e}")
 
 def send_telegram(text: str):
     """Vereinfachter Aufruf mit Standard-Chat-ID."""
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
+    chat_id = _getenv("TELEGRAM_CHAT_ID")
     send_message(chat_id, text)
@@ -0,0 +1,262 @@
+# metrics.py
+
+import functools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Standardmäßig aus: timed()/timer() kosten dann nur eine Abfrage von metrics.enabled
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0").lower() in ("1", "true", "yes")
+# Port für den Prometheus-Endpunkt (/metrics); leer = kein Server
+METRICS_PORT = os.getenv("METRICS_PORT", "")
+# "cprofile" oder "pyinstrument": Profil je CLI-Befehl nach PROFILE_DIR schreiben
+PROFILE = os.getenv("PROFILE", "").lower()
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+PREFIX = "crypto_warnsystem"
+# Bucket-Grenzen in Sekunden (wie der Prometheus-Client, plus 30/60 s für Downloads)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Kumulatives Histogramm im Prometheus-Format (Anzahl je Bucket, Summe, Anzahl)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count", "max")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # letzter Eintrag = +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Näherung über die Bucket-Obergrenze (für Konsolen-Übersichten)."""
+        if self.count == 0:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.max
+
+
+class Metrics:
+    """
+    Prozessweite Laufzeit-Messungen je Stufe (z. B. get_klines, predict).
+
+    - timed(name) als Decorator, timer(name) als Kontextmanager
+    - render() liefert alle Werte im Prometheus-Textformat
+    - ist enabled False, wird nichts gemessen und nichts gesperrt
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED, buckets=LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._histograms = {}   # stage -> Histogram
+        self._errors = {}       # stage -> Anzahl Ausnahmen
+        self._lock = threading.Lock()
+        self._server = None
+
+    def observe(self, stage: str, seconds: float, error: bool = False):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if error:
+                self._errors[stage] = self._errors.get(stage, 0) + 1
+
+    @contextmanager
+    def timer(self, stage: str):
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - t0, error)
+
+    def timed(self, stage: str = None):
+        """Decorator: misst jeden Aufruf der Funktion unter `stage` (Standard: Funktionsname)."""
+        def decorate(func):
+            name = stage or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                t0 = time.perf_counter()
+                error = True
+                try:
+                    result = func(*args, **kwargs)
+                    error = False
+                    return result
+                finally:
+                    self.observe(name, time.perf_counter() - t0, error)
+            return wrapper
+        return decorate
+
+    def snapshot(self) -> dict:
+        """Kopie der Messwerte: stage -> {count, sum, max, p50, p95, errors}."""
+        with self._lock:
+            return {
+                stage: {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "max": h.max,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "errors": self._errors.get(stage, 0),
+                }
+                for stage, h in self._histograms.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._errors.clear()
+
+    def render(self) -> str:
+        """Alle Werte im Prometheus-Textformat (Version 0.0.4)."""
+        name = f"{PREFIX}_stage_seconds"
+        lines = [f"# HELP {name} Laufzeit je Pipeline-Stufe in Sekunden",
+                 f"# TYPE {name} histogram"]
+        with self._lock:
+            for stage, h in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, n in zip(h.buckets + (float("inf"),), h.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum!r}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+            errors = f"{PREFIX}_stage_errors_total"
+            lines += [f"# HELP {errors} Ausnahmen je Pipeline-Stufe", f"# TYPE {errors} counter"]
+            for stage in sorted(self._histograms):
+                lines.append(f'{errors}{{stage="{stage}"}} {self._errors.get(stage, 0)}')
+        return "\n".join(lines) + "\n"
+
+    def start_server(self, port: int, host: str = "0.0.0.0"):
+        """Startet einen HTTP-Server mit GET /metrics in einem Hintergrund-Thread."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.enabled = True
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info(f"Metriken unter http://{host}:{self._server.server_port}/metrics")
+        return self._server
+
+    def serve_from_env(self):
+        """
+        Liest METRICS_ENABLED/METRICS_PORT erneut (die .env wird oft erst nach dem
+        Import geladen) und startet bei gesetztem Port den Endpunkt. Mehrfacher Aufruf ist harmlos.
+        """
+        if os.getenv("METRICS_ENABLED", "0").lower() in ("1", "true", "yes"):
+            self.enabled = True
+        port = os.getenv("METRICS_PORT", METRICS_PORT)
+        if port and self._server is None:
+            return self.start_server(int(port))
+        return self._server
+
+    def stop_server(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def summary(self) -> str:
+        """Kurze Übersicht für die Konsole, langsamste Stufe (nach Gesamtzeit) zuerst."""
+        rows = sorted(self.snapshot().items(), key=lambda item: -item[1]["sum"])
+        return "\n".join(
+            f"⏱️ {stage}: {s['count']}x, gesamt {s['sum']:.3f}s, p50 ≤{s['p50'] * 1000:.0f} ms, "
+            f"p95 ≤{s['p95'] * 1000:.0f} ms, max {s['max'] * 1000:.0f} ms"
+            + (f", {s['errors']} Fehler" if s["errors"] else "")
+            for stage, s in rows
+        )
+
+
+@contextmanager
+def profiled(name: str, mode: str = PROFILE, directory: str = PROFILE_DIR):
+    """
+    Profiliert den Block mit cProfile oder pyinstrument und schreibt das
+    Ergebnis nach directory/<name>-<Zeit>.prof bzw. .html. Ohne mode passiert nichts.
+    """
+    if not mode:
+        yield None
+        return
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("pyinstrument nicht installiert – nutze cProfile")
+            mode = "cprofile"
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield profiler
+            finally:
+                profiler.stop()
+                path = os.path.join(directory, f"{name}-{stamp}.html")
+                with open(path, "w") as f:
+                    f.write(profiler.output_html())
+                print(f"🔬 Profil gespeichert unter: {path}")
+            return
+    if mode != "cprofile":
+        raise ValueError(f"Unbekannter Profiler: {mode}")
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        path = os.path.join(directory, f"{name}-{stamp}.prof")
+        profiler.dump_stats(path)
+        print(f"🔬 Profil gespeichert unter: {path} (ansehen mit: python -m pstats {path})")
+
+
+# Prozessweite Instanz für alle Module
+metrics = Metrics()
+timed = metrics.timed
+timer = metrics.timer
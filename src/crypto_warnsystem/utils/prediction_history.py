@@ -0,0 +1,167 @@
+# prediction_history.py
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+HISTORY_DB_PATH = os.getenv("PREDICTION_HISTORY_DB", "prognose_history.db")
+LEGACY_CSV_PATH = "prognose_history.csv"
+# Das alte CSV schrieb nur der Scheduler, ausschließlich für BTCUSDT
+LEGACY_SYMBOL = "BTCUSDT"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    symbol TEXT,
+    direction INTEGER NOT NULL,
+    confidence REAL NOT NULL,
+    model_version TEXT,
+    features TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_symbol_timestamp ON predictions (symbol, timestamp);
+"""
+
+COLUMNS = ["timestamp", "symbol", "direction", "confidence", "model_version", "features"]
+
+
+def _ts(value) -> str:
+    """Zeitstempel als sortierbarer Text (gleiches Format wie im bisherigen CSV)."""
+    if value is None:
+        value = datetime.now()
+    return pd.Timestamp(value).isoformat(sep=" ")
+
+
+class PredictionHistory:
+    """
+    Prognoseverlauf in SQLite (WAL-Modus).
+
+    Jede Prognose ist ein einzelnes INSERT statt Lesen und Neuschreiben der
+    ganzen Datei. Mehrere Prozesse (Dashboard, Scheduler, Bot) können
+    gleichzeitig schreiben; Zeitraum-Abfragen laufen über Indizes.
+    Ein vorhandenes prognose_history.csv wird beim ersten Anlegen übernommen.
+    """
+
+    def __init__(self, path: str = HISTORY_DB_PATH, legacy_csv: str = LEGACY_CSV_PATH, timeout: float = 30.0,
+                 legacy_symbol: str = LEGACY_SYMBOL):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+        conn = self._connection()
+        with conn:
+            conn.executescript(SCHEMA)
+        if legacy_csv and os.path.exists(legacy_csv):
+            self._import_legacy(legacy_csv, legacy_symbol)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3-Verbindungen nicht über Threads hinweg teilen
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, symbol: str, direction: int, confidence: float, model_version: str = None,
+               features: dict = None, timestamp=None):
+        """Speichert eine Prognose."""
+        self.append_many([{
+            "timestamp": timestamp,
+            "symbol": symbol,
+            "direction": direction,
+            "confidence": confidence,
+            "model_version": model_version,
+            "features": features,
+        }])
+
+    def append_many(self, entries):
+        """Speichert mehrere Prognosen in einer Transaktion."""
+        conn = self._connection()
+        with conn:
+            self._insert(conn, entries)
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, entries):
+        rows = [
+            (
+                _ts(e.get("timestamp")),
+                e.get("symbol"),
+                int(e["direction"]),
+                float(e["confidence"]),
+                e.get("model_version"),
+                json.dumps({k: float(v) for k, v in e["features"].items()}) if e.get("features") else None,
+            )
+            for e in entries
+        ]
+        conn.executemany(
+            "INSERT INTO predictions (timestamp, symbol, direction, confidence, model_version, features) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def query(self, since=None, until=None, symbol: str = None, with_features: bool = False) -> pd.DataFrame:
+        """
+        Liest Prognosen im Zeitraum [since, until) – optional nur für ein Symbol.
+
+        :return: DataFrame mit timestamp (datetime), symbol, direction, confidence,
+                 model_version (und features als Dict, falls with_features=True)
+        """
+        clauses, params = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_ts(since))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(_ts(until))
+        columns = COLUMNS if with_features else COLUMNS[:-1]
+        sql = f"SELECT {', '.join(columns)} FROM predictions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp"
+
+        rows = self._connection().execute(sql, params).fetchall()
+        df = pd.DataFrame(rows, columns=columns)
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        if with_features:
+            df["features"] = df["features"].map(lambda f: json.loads(f) if isinstance(f, str) else None)
+        return df
+
+    @staticmethod
+    def _legacy_entries(path: str, symbol: str = None):
+        legacy = pd.read_csv(path)
+        return [
+            {"timestamp": row.timestamp, "symbol": symbol, "direction": row.direction, "confidence": row.confidence}
+            for row in legacy.itertuples()
+        ]
+
+    def import_csv(self, path: str, symbol: str = None):
+        """Übernimmt Einträge aus dem bisherigen CSV-Format (timestamp, direction, confidence)."""
+        self.append_many(self._legacy_entries(path, symbol))
+
+    def _import_legacy(self, path: str, symbol: str):
+        # Nur in eine leere Tabelle übernehmen; BEGIN IMMEDIATE verhindert doppelten Import
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if not conn.execute("SELECT EXISTS (SELECT 1 FROM predictions)").fetchone()[0]:
+                self._insert(conn, self._legacy_entries(path, symbol))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,381 @@
+# replay_client.py
+
+import asyncio
+import atexit
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import deque
+
+import numpy as np
+from binance.helpers import interval_to_milliseconds
+
+from crypto_warnsystem.utils import kline_store as kline_store_module
+from crypto_warnsystem.utils.kline_store import KLINE_DTYPE, KlineStore, resolve_time, set_clock
+from crypto_warnsystem.utils.kline_stream import KlineStream
+
+logger = logging.getLogger(__name__)
+
+# Wie Binance: höchstens 1000 Kerzen je Anfrage, 2 Weight je /api/v3/klines
+PAGE_LIMIT = 1000
+KLINES_WEIGHT = 2
+# Binance-Limit pro Minute und IP
+DEFAULT_MAX_WEIGHT = 6000
+
+# Verzeichnis der Speicher im Replay-Modus (Standard: temporär, wird beim Beenden gelöscht)
+REPLAY_STORE_DIR = os.getenv("REPLAY_STORE_DIR")
+
+_isolated_root = None
+
+
+class ReplayAPIError(Exception):
+    """Fehler im Stil von BinanceAPIException (status_code, code, message)."""
+
+    def __init__(self, status_code: int, code: int, message: str, retry_after: float = None):
+        super().__init__(f"APIError(code={code}): {message}")
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+        self.retry_after = retry_after
+
+
+def isolate_stores(root: str = None) -> str:
+    """
+    Leitet Kerzenspeicher und Feature-Store des Prozesses in ein eigenes
+    Verzeichnis um, damit wiedergegebene oder synthetische Kerzen nie im
+    Live-Speicher (data/klines, data/features) landen.
+
+    Gesetzt werden KLINE_STORE_DIR/FEATURE_STORE_DIR (für später importierte
+    Module und Kindprozesse) sowie die Wurzeln der bereits angelegten
+    prozessweiten Speicher. Mehrfache Aufrufe verwenden dasselbe Verzeichnis.
+
+    :param root: Zielverzeichnis (Standard: REPLAY_STORE_DIR oder ein temporäres Verzeichnis)
+    :return: das verwendete Verzeichnis
+    """
+    global _isolated_root
+    if _isolated_root is not None:
+        return _isolated_root
+    root = root or REPLAY_STORE_DIR
+    if root is None:
+        root = tempfile.mkdtemp(prefix="crypto-replay-")
+        atexit.register(shutil.rmtree, root, True)
+    klines, features = os.path.join(root, "klines"), os.path.join(root, "features")
+
+    os.environ["KLINE_STORE_DIR"] = klines
+    os.environ["FEATURE_STORE_DIR"] = features
+    kline_store_module.KLINE_STORE_DIR = klines
+    data_utils = sys.modules.get("crypto_warnsystem.utils.data_utils")
+    if data_utils is not None:
+        data_utils.kline_store.root = klines
+    feature_store = sys.modules.get("crypto_warnsystem.models.feature_store")
+    if feature_store is not None:
+        feature_store.FEATURE_STORE_DIR = features
+        feature_store.feature_store.root = features
+    _isolated_root = root
+    logger.info(f"Replay-Modus: Kerzen- und Feature-Speicher unter {root}")
+    return root
+
+
+class VirtualClock:
+    """
+    Virtuelle Uhr für die Wiedergabe.
+
+    Läuft ab start_ms mit `speed`-facher Geschwindigkeit (60 = eine Minute pro
+    Sekunde). Mit speed=0 steht die Uhr und wird nur über advance()/set()
+    bewegt; sleep_until() springt dann direkt zum Ziel.
+    """
+
+    def __init__(self, start_ms: int = None, speed: float = 1.0):
+        self.speed = speed
+        self._lock = threading.Lock()
+        self.set(int(time.time() * 1000) if start_ms is None else start_ms)
+
+    def set(self, ms: int):
+        with self._lock:
+            self._origin_ms = ms
+            self._wall = time.monotonic()
+
+    def now_ms(self) -> int:
+        with self._lock:
+            return int(self._origin_ms + (time.monotonic() - self._wall) * 1000 * self.speed)
+
+    def time(self) -> float:
+        """Sekunden wie time.time(), für kline_store.set_clock."""
+        return self.now_ms() / 1000
+
+    def advance(self, ms: int):
+        with self._lock:
+            self._origin_ms += ms
+
+    def wait_seconds(self, target_ms: int) -> float:
+        """Echte Wartezeit bis target_ms (0, wenn erreicht oder die Uhr steht)."""
+        remaining = target_ms - self.now_ms()
+        if remaining <= 0 or self.speed <= 0:
+            return 0.0
+        return remaining / 1000 / self.speed
+
+    def sleep_until(self, target_ms: int):
+        if self.speed <= 0:
+            self.advance(max(target_ms - self.now_ms(), 0))
+            return
+        time.sleep(self.wait_seconds(target_ms))
+
+    async def async_sleep_until(self, target_ms: int):
+        if self.speed <= 0:
+            self.advance(max(target_ms - self.now_ms(), 0))
+            await asyncio.sleep(0)
+            return
+        await asyncio.sleep(self.wait_seconds(target_ms))
+
+
+def synthetic_records(start_ms: int, end_ms: int, interval_ms: int, seed: int = 0,
+                      price: float = 30000.0) -> np.ndarray:
+    """Reproduzierbare Kerzen (Random Walk) im Store-Format von start_ms bis end_ms (exklusiv)."""
+    first = start_ms - start_ms % interval_ms
+    times = np.arange(first, end_ms, interval_ms, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.002, len(times))))
+    open_ = np.concatenate([[price], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.001, len(times))) * close
+    records = np.empty(len(times), dtype=KLINE_DTYPE)
+    records["time"] = times
+    records["open"] = open_
+    records["high"] = np.maximum(open_, close) + spread
+    records["low"] = np.minimum(open_, close) - spread
+    records["close"] = close
+    records["volume"] = rng.gamma(2.0, 50.0, len(times))
+    return records
+
+
+def _to_kline(record, interval_ms: int) -> list:
+    """Datensatz -> Binance-Antwortzeile (12 Felder, Zahlen als Strings wie bei der API)."""
+    t = int(record["time"])
+    close, volume = float(record["close"]), float(record["volume"])
+    return [t, repr(float(record["open"])), repr(float(record["high"])), repr(float(record["low"])),
+            repr(close), repr(volume), t + interval_ms - 1, repr(close * volume), 0, "0", "0", "0"]
+
+
+class ReplayClient:
+    """
+    Offline-Ersatz für binance.client.Client auf aufgezeichneten oder synthetischen Kerzen.
+
+    - get_historical_klines/get_klines liefern nur Kerzen, die zur virtuellen
+      Uhr bereits begonnen haben; relative Angaben ("2 day ago UTC") beziehen
+      sich auf die virtuelle Uhr
+    - jede Seite (1000 Kerzen) zählt als Anfrage mit Latenz und Request-Weight;
+      bei überschrittenem Limit wird gewartet (rate_limit="wait") oder wie bei
+      Binance mit HTTP 429 abgebrochen (rate_limit="raise")
+    - die noch offene Kerze enthält die aufgezeichneten Endwerte
+
+    :param store: KlineStore mit Aufzeichnungen (eigenes Verzeichnis, nicht der Arbeitsspeicher der App)
+    :param synthetic: Symbole, für die fehlende Kerzen synthetisch erzeugt werden
+    """
+
+    def __init__(self, store: KlineStore = None, clock: VirtualClock = None, synthetic=(),
+                 synthetic_days: float = 60.0, latency: float = 0.0, jitter: float = 0.0,
+                 max_weight: int = DEFAULT_MAX_WEIGHT, rate_limit: str = "wait", seed: int = 0):
+        if rate_limit not in ("wait", "raise"):
+            raise ValueError(f"Unbekanntes Verhalten bei Limit: {rate_limit}")
+        self.store = store
+        self.clock = clock or VirtualClock()
+        self.synthetic = {s.upper() for s in synthetic}
+        self.synthetic_days = synthetic_days
+        self.latency = latency
+        self.jitter = jitter
+        self.max_weight = max_weight
+        self.rate_limit = rate_limit
+        self.seed = seed
+        self.requests = 0
+        self.weight_used = 0
+        self._data = {}           # (symbol, interval) -> Datensätze
+        self._weights = deque()   # (virtuelle Zeit, Weight) der letzten Minute
+        self._window_weight = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    @classmethod
+    def from_env(cls, install_clock: bool = True, isolate: bool = True) -> "ReplayClient":
+        """
+        Konfiguration über Umgebungsvariablen:
+
+        - BINANCE_REPLAY: Verzeichnis mit aufgezeichneten Kerzen oder
+          "synthetic:BTCUSDT,ETHUSDT"
+        - REPLAY_START: Startzeit der virtuellen Uhr (ms oder Datum, Standard: jetzt)
+        - REPLAY_SPEED: Zeitraffer-Faktor (Standard 1, 0 = stehende Uhr)
+        - REPLAY_LATENCY_MS / REPLAY_JITTER_MS: künstliche Latenz je Anfrage
+        - REPLAY_MAX_WEIGHT / REPLAY_RATE_LIMIT: Weight-Limit pro Minute, "wait" oder "raise"
+        - REPLAY_STORE_DIR: Verzeichnis für Kerzen- und Feature-Speicher im
+          Replay-Modus (Standard: temporär); siehe isolate_stores()
+        """
+        if isolate:
+            isolate_stores()
+        source = os.getenv("BINANCE_REPLAY", "")
+        start = os.getenv("REPLAY_START")
+        clock = VirtualClock(resolve_time(int(start) if start and start.isdigit() else start),
+                             speed=float(os.getenv("REPLAY_SPEED", 1.0)))
+        store, synthetic = None, ()
+        if source.startswith("synthetic"):
+            _, _, symbols = source.partition(":")
+            synthetic = [s.strip() for s in (symbols or "BTCUSDT").split(",") if s.strip()]
+        else:
+            store = KlineStore(source)
+        client = cls(
+            store=store,
+            clock=clock,
+            synthetic=synthetic,
+            latency=float(os.getenv("REPLAY_LATENCY_MS", 0)) / 1000,
+            jitter=float(os.getenv("REPLAY_JITTER_MS", 0)) / 1000,
+            max_weight=int(os.getenv("REPLAY_MAX_WEIGHT", DEFAULT_MAX_WEIGHT)),
+            rate_limit=os.getenv("REPLAY_RATE_LIMIT", "wait"),
+        )
+        if install_clock:
+            # Kerzenspeicher und Feature-Store entscheiden "abgeschlossen" nach der virtuellen Uhr
+            set_clock(clock.time)
+        logger.info(f"Replay-Client aktiv ({source}), Start {clock.now_ms()}, Tempo x{clock.speed}")
+        return client
+
+    def add(self, symbol: str, interval: str, records: np.ndarray):
+        """Hinterlegt Kerzen (KLINE_DTYPE, aufsteigend) für symbol/interval."""
+        self._data[(symbol.upper(), interval)] = np.asarray(records, dtype=KLINE_DTYPE)
+
+    def records(self, symbol: str, interval: str) -> np.ndarray:
+        key = (symbol.upper(), interval)
+        if key not in self._data:
+            records = self.store.load(*key) if self.store is not None else np.empty(0, dtype=KLINE_DTYPE)
+            if len(records) == 0 and key[0] in self.synthetic:
+                # Zeitraum um den Start der Uhr, je Symbol und Intervall eigener Seed
+                span = int(self.synthetic_days * 86_400_000)
+                origin = self.clock.now_ms()
+                seed = self.seed + zlib.crc32(f"{key[0]}_{interval}".encode())
+                records = synthetic_records(origin - span, origin + span, interval_to_milliseconds(interval), seed)
+            if len(records) == 0:
+                raise ReplayAPIError(400, -1121, f"Invalid symbol: {symbol}")
+            self._data[key] = np.asarray(records)
+        return self._data[key]
+
+    def _request(self, weight: int):
+        """Zählt eine Anfrage: Weight-Limit (gleitende Minute, virtuelle Zeit) und Latenz."""
+        while True:
+            with self._lock:
+                now = self.clock.now_ms()
+                while self._weights and self._weights[0][0] <= now - 60_000:
+                    self._window_weight -= self._weights.popleft()[1]
+                if self._window_weight + weight <= self.max_weight:
+                    self._weights.append((now, weight))
+                    self._window_weight += weight
+                    self.requests += 1
+                    self.weight_used += weight
+                    break
+                retry_ms = self._weights[0][0] + 60_000 - now
+            if self.rate_limit == "raise":
+                raise ReplayAPIError(429, -1003, "Too many requests", retry_after=retry_ms / 1000)
+            self.clock.sleep_until(now + retry_ms)
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _select(self, symbol: str, interval: str, start_ms: int = None, end_ms: int = None) -> np.ndarray:
+        records = self.records(symbol, interval)
+        # Nur Kerzen, die zur virtuellen Zeit schon begonnen haben
+        now = self.clock.now_ms()
+        end_ms = now if end_ms is None else min(end_ms, now)
+        lo = 0 if start_ms is None else np.searchsorted(records["time"], start_ms, side="left")
+        hi = np.searchsorted(records["time"], end_ms, side="right")
+        return records[lo:hi]
+
+    def get_klines(self, symbol: str, interval: str, startTime: int = None, endTime: int = None,
+                   limit: int = 500, **kwargs) -> list:
+        """Eine Seite wie GET /api/v3/klines (ohne startTime: die letzten `limit` Kerzen)."""
+        self._request(KLINES_WEIGHT)
+        selected = self._select(symbol, interval, startTime, endTime)
+        selected = selected[:limit] if startTime is not None else selected[-limit:]
+        interval_ms = interval_to_milliseconds(interval)
+        return [_to_kline(r, interval_ms) for r in selected]
+
+    def get_historical_klines(self, symbol: str, interval: str, start_str=None, end_str=None,
+                              limit: int = PAGE_LIMIT, **kwargs) -> list:
+        """Wie Client.get_historical_klines: alle Kerzen ab start_str, seitenweise abgefragt."""
+        now = self.clock.now_ms()
+        start_ms = resolve_time(start_str, now)
+        end_ms = resolve_time(end_str, now)
+        # python-binance fragt zuerst den frühesten verfügbaren Zeitstempel ab
+        self._request(KLINES_WEIGHT)
+        selected = self._select(symbol, interval, start_ms, end_ms)
+        for _ in range(max(1, -(-len(selected) // limit))):
+            self._request(KLINES_WEIGHT)
+        interval_ms = interval_to_milliseconds(interval)
+        return [_to_kline(r, interval_ms) for r in selected]
+
+    def get_exchange_info(self) -> dict:
+        self._request(20)
+        symbols = set(self.synthetic)
+        if self.store is not None and os.path.isdir(self.store.root):
+            symbols |= {f.split("_", 1)[0] for f in os.listdir(self.store.root) if f.endswith(".bin")}
+        return {
+            "serverTime": self.clock.now_ms(),
+            "symbols": [
+                {"symbol": s, "status": "TRADING", "quoteAsset": "USDT" if s.endswith("USDT") else s[-3:]}
+                for s in sorted(symbols)
+            ],
+        }
+
+    def get_server_time(self) -> dict:
+        self._request(1)
+        return {"serverTime": self.clock.now_ms()}
+
+    def ping(self) -> dict:
+        self._request(1)
+        return {}
+
+
+class ReplayStream(KlineStream):
+    """
+    KlineStream, der statt des WebSockets die Kerzen des ReplayClient nach der
+    virtuellen Uhr abspielt: jede Kerze wird zu ihrem Schlusszeitpunkt als
+    abgeschlossene Kline-Nachricht über handle_message() verarbeitet.
+    """
+
+    def __init__(self, symbols, client: ReplayClient, interval: str = "1m", store: KlineStore = None,
+                 until_ms: int = None):
+        super().__init__(symbols, interval=interval, store=store, client=client)
+        self.until_ms = until_ms
+
+    def _message(self, symbol: str, record, interval_ms: int) -> dict:
+        kline = _to_kline(record, interval_ms)
+        return {
+            "stream": f"{symbol.lower()}@kline_{self.interval}",
+            "data": {"e": "kline", "s": symbol, "k": {
+                "t": kline[0], "T": kline[6], "s": symbol, "i": self.interval,
+                "o": kline[1], "h": kline[2], "l": kline[3], "c": kline[4], "v": kline[5], "x": True,
+            }},
+        }
+
+    async def run(self):
+        """Spielt ab, bis stop() aufgerufen wird, until_ms erreicht ist oder keine Kerzen mehr folgen."""
+        self._running = True
+        clock = self.client.clock
+        interval_ms = interval_to_milliseconds(self.interval)
+        data = {s: self.client.records(s, self.interval) for s in self.symbols}
+        # Nächste Kerze, die nach der aktuellen virtuellen Zeit schließt
+        start = clock.now_ms() - interval_ms
+        positions = {s: int(np.searchsorted(r["time"], start, side="right")) for s, r in data.items()}
+        while self._running:
+            pending = [r["time"][positions[s]] for s, r in data.items() if positions[s] < len(r)]
+            if not pending:
+                return
+            open_time = int(min(pending))
+            close_ms = open_time + interval_ms
+            if self.until_ms is not None and close_ms > self.until_ms:
+                return
+            await clock.async_sleep_until(close_ms)
+            for symbol, records in data.items():
+                pos = positions[symbol]
+                if pos < len(records) and records["time"][pos] == open_time:
+                    await self.handle_message(self._message(symbol, records[pos], interval_ms))
+                    positions[symbol] = pos + 1
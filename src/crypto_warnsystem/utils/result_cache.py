@@ -0,0 +1,117 @@
+# result_cache.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Thread-sicherer Ergebnis-Cache mit kurzer TTL für teure Abfragen.
+
+    - frische Einträge (jünger als ttl) werden direkt zurückgegeben
+    - veraltete Einträge (jünger als stale_ttl) werden sofort geliefert und
+      im Hintergrund neu berechnet (stale-while-revalidate)
+    - gleichzeitige Anfragen zum selben Schlüssel teilen sich eine Berechnung
+    - mit keep_warm() registrierte Schlüssel hält ein Hintergrund-Thread frisch
+    """
+
+    def __init__(self, ttl: float = 30.0, stale_ttl: float = 300.0, max_entries: int = 256,
+                 max_workers: int = 4):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (Zeitpunkt, Wert)
+        self._inflight = {}             # key -> Future
+        self._warm = {}                 # key -> loader
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="result-cache")
+        self._warmer = None
+        self._stopped = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def get(self, key, loader):
+        """
+        Wert für key; loader() wird nur aufgerufen, wenn kein brauchbarer Eintrag existiert.
+        Fehler des loaders werden an alle wartenden Aufrufer weitergegeben und nicht gecacht.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry[0]
+                if age < self.ttl:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                if age < self.stale_ttl:
+                    self.stale_hits += 1
+                    self._submit(key, loader)
+                    return entry[1]
+            self.misses += 1
+            future = self._submit(key, loader)
+        return future.result()
+
+    def _submit(self, key, loader):
+        # Aufruf nur mit gehaltenem Lock
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._executor.submit(self._load, key, loader)
+            self._inflight[key] = future
+        return future
+
+    def _load(self, key, loader):
+        try:
+            value = loader()
+            with self._lock:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def refresh(self, key, loader):
+        """Startet eine Neuberechnung im Hintergrund (ohne zu warten)."""
+        with self._lock:
+            return self._submit(key, loader)
+
+    def keep_warm(self, key, loader, interval: float = None):
+        """Hält key dauerhaft frisch, damit auch die erste Anfrage keine Wartezeit hat."""
+        with self._lock:
+            self._warm[key] = loader
+        if self._warmer is None or not self._warmer.is_alive():
+            interval = interval or max(self.ttl * 0.8, 0.1)
+            self._stopped.clear()
+            self._warmer = threading.Thread(target=self._keep_warm, args=(interval,),
+                                            name="result-cache-warmer", daemon=True)
+            self._warmer.start()
+
+    def _keep_warm(self, interval: float):
+        while not self._stopped.is_set():
+            with self._lock:
+                warm = list(self._warm.items())
+            for key, loader in warm:
+                future = self.refresh(key, loader)
+                future.add_done_callback(lambda f, key=key: f.exception() and logger.warning(
+                    "Hintergrund-Aktualisierung für %s fehlgeschlagen: %s", key, f.exception()))
+            self._stopped.wait(interval)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stop(self):
+        self._stopped.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,140 @@
+# scanner.py
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from crypto_warnsystem.utils.indicator_utils import calculate_indicators
+from crypto_warnsystem.models.prediction_model import predict_directions
+from crypto_warnsystem.utils.metrics import timed
+
+# Binance: 6000 Request-Weight pro Minute und IP; wir bleiben mit Reserve darunter
+DEFAULT_MAX_WEIGHT = 3000
+# /api/v3/klines kostet 2, get_historical_klines fragt zusätzlich den ersten Zeitstempel ab
+KLINES_WEIGHT = 4
+
+
+class WeightLimiter:
+    """
+    Thread-sicheres Gleitfenster-Limit für das Binance-Request-Weight.
+    acquire() blockiert, bis das Gewicht im aktuellen Fenster wieder frei ist.
+    """
+
+    def __init__(self, max_weight: int = DEFAULT_MAX_WEIGHT, period: float = 60.0):
+        self.max_weight = max_weight
+        self.period = period
+        self._events = deque()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: int = 1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._events and self._events[0][0] <= now - self.period:
+                    self._used -= self._events.popleft()[1]
+                if self._used + weight <= self.max_weight:
+                    self._events.append((now, weight))
+                    self._used += weight
+                    return
+                wait = self._events[0][0] + self.period - now
+            time.sleep(max(wait, 0.01))
+
+
+def usdt_symbols(client, limit: int = None) -> list:
+    """Alle handelbaren USDT-Paare laut exchangeInfo (optional nur die ersten `limit`)."""
+    info = client.get_exchange_info()
+    symbols = [
+        s["symbol"] for s in info["symbols"]
+        if s.get("quoteAsset") == "USDT" and s.get("status") == "TRADING"
+    ]
+    return symbols[:limit] if limit else symbols
+
+
+def fetch_klines_concurrently(symbols, interval: str, lookback: str, fetch=None,
+                              max_workers: int = 8, limiter: WeightLimiter = None,
+                              weight: int = KLINES_WEIGHT):
+    """
+    Lädt Kerzen für viele Symbole parallel über einen begrenzten Thread-Pool.
+
+    :return: ({symbol: DataFrame}, {symbol: Fehlermeldung})
+    """
+    if fetch is None:
+        from crypto_warnsystem.utils.data_utils import get_candles
+
+        def fetch(symbol, interval, lookback):
+            # Kompakte Kerzen aus dem Speicherbudget-Cache, DataFrame nur für diesen Scan
+            return get_candles(symbol, interval, lookback).frame(dtype=float)
+    limiter = limiter or WeightLimiter()
+
+    def load(symbol):
+        limiter.acquire(weight)
+        return fetch(symbol, interval=interval, lookback=lookback)
+
+    frames, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {symbol: pool.submit(load, symbol) for symbol in symbols}
+        for symbol, future in futures.items():
+            try:
+                df = future.result()
+            except Exception as e:
+                errors[symbol] = str(e)
+                continue
+            if df.empty:
+                errors[symbol] = "keine Daten"
+            else:
+                frames[symbol] = df
+    return frames, errors
+
+
+def indicators_in_processes(frames: dict, processes: int = None) -> dict:
+    """Berechnet calculate_indicators für alle Symbole in einem Prozess-Pool."""
+    if processes == 0 or len(frames) <= 1:
+        return {symbol: calculate_indicators(df) for symbol, df in frames.items()}
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        results = pool.map(calculate_indicators, frames.values(), chunksize=8)
+        return dict(zip(frames.keys(), results))
+
+
+def score_latest(frames: dict) -> pd.DataFrame:
+    """
+    Bewertet die jeweils letzte Kerze aller Symbole mit einem einzigen Modellaufruf.
+    """
+    last_rows = pd.DataFrame([df.iloc[-1] for df in frames.values()], index=pd.Index(list(frames), name="symbol"))
+    predictions = predict_directions(last_rows, dropna=True)
+    if predictions is None:
+        return None
+    result = last_rows[["close", "rsi", "macd"]].join(predictions, how="inner")
+    result.attrs["model_version"] = predictions.attrs.get("model_version")
+    return result
+
+
+@timed()
+def scan(symbols, interval: str = "5m", lookback: str = "2 day ago UTC", fetch=None,
+         max_workers: int = 8, processes: int = None, limiter: WeightLimiter = None):
+    """
+    Kompletter Scan: Kerzen laden, Indikatoren berechnen, alle Symbole gemeinsam bewerten.
+
+    :return: (DataFrame je Symbol, sortiert nach Confidence; Fehler-Dict; Laufzeiten je Schritt)
+    """
+    timings = {}
+
+    t0 = time.perf_counter()
+    frames, errors = fetch_klines_concurrently(symbols, interval, lookback, fetch=fetch,
+                                               max_workers=max_workers, limiter=limiter)
+    timings["fetch"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    frames = indicators_in_processes(frames, processes)
+    timings["indicators"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    results = score_latest(frames) if frames else None
+    timings["predict"] = time.perf_counter() - t0
+
+    if results is not None:
+        results = results.sort_values("confidence", ascending=False)
+    return results, errors, timings
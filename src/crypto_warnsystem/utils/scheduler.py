@@ -1,58 +1,116 @@
 # scheduler.py
 
+import argparse
+import sys
 import time
 from datetime import datetime
 from dotenv import load_dotenv
 import os
-import pandas as pd
 
-from data_utils import get_klines
-from indicator_utils import calculate_indicators
-from prediction_model import predict_future_direction
-from messaging_utils import send_message
+# Project root so that "import crypto_warnsystem" works
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from crypto_warnsystem.utils.data_utils import get_klines
+from crypto_warnsystem.models.feature_store import FEATURES, feature_store
+from crypto_warnsystem.models.prediction_model import predict_future_direction
+from crypto_warnsystem.utils.messaging_utils import send_message
+from crypto_warnsystem.utils.metrics import metrics
+from crypto_warnsystem.utils.scanner import scan, usdt_symbols
+from crypto_warnsystem.utils.prediction_history import PredictionHistory
 
 # .env laden
 load_dotenv()
 SYMBOL = "BTCUSDT"
+INTERVAL = "5m"
 INTERVAL_HOURS = 4
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+# Mindest-Vertrauen, ab dem ein Symbol im Scan-Bericht erscheint
+SCAN_MIN_CONFIDENCE = float(os.getenv("SCAN_MIN_CONFIDENCE", 0.7))
+
+_prediction_history = None
+
+
+def get_prediction_history() -> PredictionHistory:
+    """
+    Eine Verbindung für alle Durchläufe statt einer neuen (nie geschlossenen)
+    pro Prognose. Erst beim ersten Aufruf angelegt: der Import allein soll
+    keine Datenbank im Arbeitsverzeichnis erzeugen.
+    """
+    global _prediction_history
+    if _prediction_history is None:
+        _prediction_history = PredictionHistory(legacy_symbol=SYMBOL)
+    return _prediction_history
+
+
+@metrics.timed()
+def run_prediction():
+    df = get_klines(SYMBOL, interval=INTERVAL)
+    df = feature_store.features(SYMBOL, INTERVAL, df)
+    prediction = predict_future_direction(df)
+
+    if prediction:
+        direction_text = "📈 Steigt" if prediction['direction'] == 1 else "📉 Fällt/Seitwärts"
+        conf_text = f"{prediction['confidence'] * 100:.1f}%"
+        message = f"📊 Automatische Prognose für {SYMBOL}:\n{direction_text}\nVertrauen: {conf_text}"
+        send_message(TELEGRAM_CHAT_ID, message)
+        print("✅ Prognose gesendet:", message)
+
+        # Prognoseverlauf speichern
+        get_prediction_history().append(
+            SYMBOL,
+            prediction["direction"],
+            prediction["confidence"],
+            model_version=prediction.get("model_version"),
+            features=df.iloc[-1][FEATURES].to_dict(),
+        )
 
-print("⏳ Scheduler gestartet – prognostiziert alle 4h...")
+    else:
+        warning = "⚠️ Keine Prognose generierbar (zu wenige Daten?)"
+        send_message(TELEGRAM_CHAT_ID, warning)
+        print(warning)
 
-def run_scheduler():
+def run_scan(symbols, interval="5m", lookback="2 day ago UTC", max_workers=8):
+    """
+    Scannt viele Symbole und sendet einen gemeinsamen Bericht mit den stärksten Prognosen.
+    """
+    results, errors, timings = scan(symbols, interval=interval, lookback=lookback, max_workers=max_workers)
+    print("⏱️ Laufzeiten: " + ", ".join(f"{k} {v:.2f}s" for k, v in timings.items()))
+    if errors:
+        print(f"⚠️ {len(errors)} Symbole ohne Daten: {', '.join(sorted(errors)[:10])}")
+
+    if results is None or results.empty:
+        print("⚠️ Keine Prognosen im Scan.")
+        return results
+
+    get_prediction_history().append_many(
+        {
+            "symbol": symbol,
+            "direction": row["direction"],
+            "confidence": row["confidence"],
+            "model_version": results.attrs.get("model_version"),
+        }
+        for symbol, row in results.iterrows()
+    )
+
+    strong = results[results["confidence"] >= SCAN_MIN_CONFIDENCE]
+    lines = [
+        f"{'📈' if row.direction == 1 else '📉'} {symbol}: {row.confidence * 100:.1f}%"
+        for symbol, row in strong.head(20).iterrows()
+    ]
+    message = f"📊 Scan über {len(results)} Symbole (Vertrauen ≥ {SCAN_MIN_CONFIDENCE * 100:.0f}%):\n"
+    message += "\n".join(lines) if lines else "Keine starken Signale."
+    send_message(TELEGRAM_CHAT_ID, message)
+    print("✅ Scan-Bericht gesendet:", message)
+    return results
+
+def run_scheduler(task=run_prediction):
+    print(f"⏳ Scheduler gestartet – prognostiziert alle {INTERVAL_HOURS}h...")
     while True:
         try:
             print(f"\n📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} – Prognose läuft...")
-            df = get_klines(SYMBOL)
-            df = calculate_indicators(df)
-            prediction = predict_future_direction(df)
-
-            if prediction:
-                direction_text = "📈 Steigt" if prediction['direction'] == 1 else "📉 Fällt/Seitwärts"
-                conf_text = f"{prediction['confidence'] * 100:.1f}%"
-                message = f"📊 Automatische Prognose für {SYMBOL}:\n{direction_text}\nVertrauen: {conf_text}"
-                send_message(TELEGRAM_CHAT_ID, message)
-                print("✅ Prognose gesendet:", message)
-
-                # Prognoseverlauf speichern
-                log_path = "prognose_history.csv"
-                new_entry = {
-                    "timestamp": datetime.now(),
-                    "direction": prediction["direction"],
-                    "confidence": prediction["confidence"]
-                }
-                df_new = pd.DataFrame([new_entry])
-                if os.path.exists(log_path):
-                    df_old = pd.read_csv(log_path)
-                    df_full = pd.concat([df_old, df_new], ignore_index=True)
-                else:
-                    df_full = df_new
-                df_full.to_csv(log_path, index=False)
-
-            else:
-                warning = "⚠️ Keine Prognose generierbar (zu wenige Daten?)"
-                send_message(TELEGRAM_CHAT_ID, warning)
-                print(warning)
+            task()
 
         except Exception as e:
             err_msg = f"❌ Fehler im Scheduler: {e}"
@@ -62,6 +120,34 @@ def run_scheduler():
         print(f"🕒 Schlafe für {INTERVAL_HOURS} Stunden...\n")
         time.sleep(INTERVAL_HOURS * 3600)
 
+def main():
+    parser = argparse.ArgumentParser(description="Automatische Prognosen im festen Intervall")
+    parser.add_argument('--scan', action='store_true', help='Viele Symbole statt nur BTCUSDT scannen')
+    parser.add_argument('--symbols', type=str, default=os.getenv("SCAN_SYMBOLS", ""),
+                        help='Kommagetrennte Symbole (Standard: alle USDT-Paare)')
+    parser.add_argument('--top', type=int, default=300, help='Maximale Anzahl USDT-Paare, wenn --symbols fehlt')
+    parser.add_argument('--interval', type=str, default='5m', help='Kline interval für den Scan')
+    parser.add_argument('--workers', type=int, default=8, help='Parallele Downloads')
+    parser.add_argument('--once', action='store_true', help='Nur einen Durchlauf ausführen')
+    args = parser.parse_args()
+    metrics.serve_from_env()
+
+    task = run_prediction
+    if args.scan:
+        if args.symbols:
+            symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+        else:
+            from crypto_warnsystem.utils.data_utils import get_client
+            symbols = usdt_symbols(get_client(), limit=args.top)
+
+        def task():
+            run_scan(symbols, interval=args.interval, max_workers=args.workers)
+
+    if args.once:
+        task()
+    else:
+        run_scheduler(task)
+
 
 if __name__ == "__main__":
-    run_scheduler()
+    main()
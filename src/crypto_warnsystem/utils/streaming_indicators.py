@@ -0,0 +1,219 @@
+# streaming_indicators.py
+
+import math
+
+import pandas as pd
+
+INDICATOR_COLUMNS = ["rsi", "macd", "bb_upper", "bb_lower", "sma50", "sma200"]
+
+NAN = float("nan")
+
+
+class _Ema:
+    """EMA wie pandas ewm(adjust=False): Start mit dem ersten Wert, danach rekursiv."""
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def to_state(self) -> dict:
+        return {"value": self.value, "count": self.count}
+
+    def load_state(self, state: dict):
+        self.value = state["value"]
+        self.count = state["count"]
+
+    def update(self, x: float) -> float:
+        if self.count == 0:
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        self.count += 1
+        return self.value if self.count >= self.min_periods else NAN
+
+
+class _RollingWindow:
+    """
+    Ringpuffer mit laufender Summe und Quadratsumme.
+
+    Die Summen werden relativ zu einem Referenzwert geführt und nach jeweils
+    `size` Updates neu aus dem Puffer berechnet, damit sich Rundungsfehler
+    nicht aufsummieren (amortisiert weiterhin O(1) je Kerze).
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.buffer = [0.0] * size
+        self.pos = 0
+        self.count = 0
+        self.shift = None
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.updates = 0
+
+    def to_state(self) -> dict:
+        # Puffer in zeitlicher Reihenfolge (älteste Kerze zuerst)
+        if self.count == self.size:
+            values = self.buffer[self.pos:] + self.buffer[:self.pos]
+        else:
+            values = self.buffer[:self.count]
+        return {"values": list(values)}
+
+    def load_state(self, state: dict):
+        self.__init__(self.size)
+        for x in state["values"][-self.size:]:
+            self.update(x)
+        if self.count:
+            self._resync()
+
+    def update(self, x: float):
+        if self.shift is None:
+            self.shift = x
+        if self.count == self.size:
+            old = self.buffer[self.pos] - self.shift
+            self.sum -= old
+            self.sumsq -= old * old
+        else:
+            self.count += 1
+        self.buffer[self.pos] = x
+        self.pos = (self.pos + 1) % self.size
+        d = x - self.shift
+        self.sum += d
+        self.sumsq += d * d
+
+        self.updates += 1
+        if self.updates >= self.size:
+            self._resync()
+
+    def _resync(self):
+        values = self.buffer if self.count == self.size else self.buffer[:self.count]
+        self.shift = math.fsum(values) / len(values)
+        self.sum = math.fsum(v - self.shift for v in values)
+        self.sumsq = math.fsum((v - self.shift) ** 2 for v in values)
+        self.updates = 0
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.size
+
+    def mean(self) -> float:
+        if not self.full:
+            return NAN
+        return self.shift + self.sum / self.size
+
+    def std(self) -> float:
+        """Standardabweichung mit ddof=0 (wie ta.volatility.BollingerBands)."""
+        if not self.full:
+            return NAN
+        m = self.sum / self.size
+        return math.sqrt(max(self.sumsq / self.size - m * m, 0.0))
+
+
+class IncrementalIndicators:
+    """
+    Zustandsbehaftete Indikatorberechnung für neue Kerzen in O(1).
+
+    Liefert dieselben Werte wie calculate_indicators (RSI, MACD-Histogramm,
+    Bollinger-Bänder, SMA 50 & 200), ohne bei jeder neuen Kerze den gesamten
+    DataFrame neu zu berechnen. Zum Aufwärmen einmal from_frame() mit der
+    Historie aufrufen, danach update() je abgeschlossener Kerze.
+    """
+
+    def __init__(self, rsi_window: int = 14, macd_fast: int = 12, macd_slow: int = 26,
+                 macd_sign: int = 9, bb_window: int = 20, bb_dev: float = 2):
+        self.bb_dev = bb_dev
+        self.prev_close = None
+
+        # RSI nach Wilder (ewm mit alpha = 1/window)
+        self._rsi_up = _Ema(1 / rsi_window, rsi_window)
+        self._rsi_down = _Ema(1 / rsi_window, rsi_window)
+
+        # MACD-Histogramm = MACD - Signal
+        self._ema_fast = _Ema(2 / (macd_fast + 1), macd_fast)
+        self._ema_slow = _Ema(2 / (macd_slow + 1), macd_slow)
+        self._signal = _Ema(2 / (macd_sign + 1), macd_sign)
+
+        self._bb = _RollingWindow(bb_window)
+        self._sma50 = _RollingWindow(50)
+        self._sma200 = _RollingWindow(200)
+
+    def update(self, close: float) -> dict:
+        """
+        Verarbeitet den Schlusskurs der nächsten Kerze.
+
+        :return: Dict mit den Indikatorwerten dieser Kerze (NaN, solange zu wenig Historie)
+        """
+        close = float(close)
+
+        # RSI: Die erste Kerze hat keine Differenz und zählt als 0 (wie ta)
+        diff = 0.0 if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+        up = self._rsi_up.update(diff if diff > 0 else 0.0)
+        down = self._rsi_down.update(-diff if diff < 0 else 0.0)
+        if math.isnan(down):
+            rsi = NAN
+        elif down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + up / down)
+
+        fast = self._ema_fast.update(close)
+        slow = self._ema_slow.update(close)
+        macd_line = fast - slow
+        if math.isnan(macd_line):
+            macd = NAN
+        else:
+            macd = macd_line - self._signal.update(macd_line)
+
+        self._bb.update(close)
+        self._sma50.update(close)
+        self._sma200.update(close)
+        mavg = self._bb.mean()
+        band = self.bb_dev * self._bb.std()
+
+        return {
+            "rsi": rsi,
+            "macd": macd,
+            "bb_upper": mavg + band,
+            "bb_lower": mavg - band,
+            "sma50": self._sma50.mean(),
+            "sma200": self._sma200.mean(),
+        }
+
+    def update_many(self, closes) -> pd.DataFrame:
+        """Verarbeitet mehrere Kerzen nacheinander und gibt die Indikatoren als DataFrame zurück."""
+        index = closes.index if isinstance(closes, pd.Series) else None
+        rows = [self.update(c) for c in closes]
+        return pd.DataFrame(rows, columns=INDICATOR_COLUMNS, index=index)
+
+    def _parts(self) -> dict:
+        return {
+            "rsi_up": self._rsi_up, "rsi_down": self._rsi_down,
+            "ema_fast": self._ema_fast, "ema_slow": self._ema_slow, "signal": self._signal,
+            "bb": self._bb, "sma50": self._sma50, "sma200": self._sma200,
+        }
+
+    def to_state(self) -> dict:
+        """Zustand als JSON-fähiges Dict (z. B. zum Weiterrechnen nach einem Neustart)."""
+        state = {name: part.to_state() for name, part in self._parts().items()}
+        state["prev_close"] = self.prev_close
+        return state
+
+    @classmethod
+    def from_state(cls, state: dict, **kwargs) -> "IncrementalIndicators":
+        """Stellt einen mit to_state() gesicherten Zustand wieder her."""
+        indicators = cls(**kwargs)
+        for name, part in indicators._parts().items():
+            part.load_state(state[name])
+        indicators.prev_close = state["prev_close"]
+        return indicators
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **kwargs) -> "IncrementalIndicators":
+        """Erzeugt einen Indikator-Zustand, aufgewärmt mit allen Kerzen aus df['close']."""
+        indicators = cls(**kwargs)
+        for close in df["close"].to_numpy(dtype=float):
+            indicators.update(close)
+        return indicators
@@ -0,0 +1,43 @@
+import os
+import sys
+
+# Paketwurzel (src/) in den Suchpfad, damit "import crypto_warnsystem" funktioniert
+SRC_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if SRC_ROOT not in sys.path:
+    sys.path.insert(0, SRC_ROOT)
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_ohlcv(n: int = 500, seed: int = 0, freq: str = "1h") -> pd.DataFrame:
+    """Synthetische OHLCV-Kerzen (Random Walk) im Format von get_klines."""
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.002, n)) * close
+    index = pd.date_range("2024-01-01", periods=n, freq=freq, name="time")
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.gamma(2.0, 50.0, n),
+    }, index=index)
+
+
+def store_klines(root: str, symbol: str, df: pd.DataFrame, interval: str = "15m"):
+    """Legt df als abgeschlossene Kerzen im KlineStore unter root ab."""
+    from crypto_warnsystem.utils.kline_store import KLINE_DTYPE, KlineStore
+
+    records = np.empty(len(df), dtype=KLINE_DTYPE)
+    records["time"] = df.index.as_unit("ms").asi8
+    for col in ["open", "high", "low", "close", "volume"]:
+        records[col] = df[col].to_numpy()
+    KlineStore(root).replace(symbol, interval, records)
+
+
+@pytest.fixture
+def ohlcv():
+    return make_ohlcv()
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from crypto_warnsystem.utils.alert_engine import AlertEngine
+
+
+def candle(close=100.0, rsi=50.0, macd=0.1):
+    return pd.Series({"close": close, "rsi": rsi, "macd": macd})
+
+
+def test_rules_match_previous_dashboard_scoring(tmp_path):
+    engine = AlertEngine(state_path=None)
+    active = engine.evaluate("BTCUSDT", candle(close=95, rsi=25, macd=0.2), candle(close=100, macd=-0.1))
+
+    assert [a["rule"] for a in active] == ["price_drop", "rsi_oversold", "macd_cross_up"]
+    assert engine.score(active) == 6
+    assert active[0]["alert"] == "🚨 Preissturz: BTCUSDT fiel um 5.00%"
+    assert [entry[2:] for entry in engine.signal_log("BTCUSDT", active)] == [
+        ("Kauf", "RSI überverkauft"), ("Kauf", "MACD Crossover oben")
+    ]
+
+
+def test_hysteresis_and_cooldown(tmp_path):
+    engine = AlertEngine(state_path=str(tmp_path / "state.json"))
+    prev = candle()
+
+    _, notify = engine.process("BTCUSDT", candle(rsi=75), prev, now=0)
+    assert [a["rule"] for a in notify] == ["rsi_overbought"]
+
+    # Weiterhin überkauft oder nur knapp darunter: keine neue Meldung
+    assert engine.process("BTCUSDT", candle(rsi=78), prev, now=10)[1] == []
+    assert engine.process("BTCUSDT", candle(rsi=67), prev, now=20)[1] == []
+    assert engine.process("BTCUSDT", candle(rsi=71), prev, now=30)[1] == []
+
+    # Erst nach Verlassen der Hysterese-Zone wieder scharf, aber Cooldown gilt noch
+    engine.process("BTCUSDT", candle(rsi=60), prev, now=40)
+    assert engine.process("BTCUSDT", candle(rsi=72), prev, now=50)[1] == []
+    assert len(engine.process("BTCUSDT", candle(rsi=72), prev, now=4000)[1]) == 1
+
+    # Andere Symbole haben eigenen Zustand
+    assert len(engine.process("ETHUSDT", candle(rsi=75), prev, now=4000)[1]) == 1
+
+
+def test_state_survives_restart(tmp_path):
+    path = str(tmp_path / "state.json")
+    assert len(AlertEngine(state_path=path).process("BTCUSDT", candle(rsi=75), candle(), now=0)[1]) == 1
+    assert AlertEngine(state_path=path).process("BTCUSDT", candle(rsi=75), candle(), now=100)[1] == []
+
+
+def test_crossover_uses_cooldown_only(tmp_path):
+    engine = AlertEngine(state_path=None, cooldowns={"macd_cross_up": 60})
+    up, down = candle(macd=0.1), candle(macd=-0.1)
+    assert len(engine.process("BTCUSDT", up, down, now=0)[1]) == 1
+    assert engine.process("BTCUSDT", up, down, now=30)[1] == []
+    assert len(engine.process("BTCUSDT", up, down, now=61)[1]) == 1
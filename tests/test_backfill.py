@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+
+from crypto_warnsystem.utils import kline_store as kline_store_module
+from crypto_warnsystem.utils.backfill import Backfill, find_gaps, plan_chunks
+from crypto_warnsystem.utils.kline_store import KlineStore
+from crypto_warnsystem.utils.replay_client import ReplayAPIError, ReplayClient, VirtualClock, synthetic_records
+
+MINUTE = 60_000
+START = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+HISTORY = synthetic_records(START - 5 * 1440 * MINUTE, START + MINUTE, MINUTE, seed=7)
+
+
+@pytest.fixture
+def clock():
+    clock = VirtualClock(START, speed=0)
+    kline_store_module.set_clock(clock.time)
+    yield clock
+    kline_store_module.set_clock(None)
+
+
+class FlakyClient(ReplayClient):
+    """Scheitert einmal bei bestimmten Seiten und lässt bei der ersten Abfrage Kerzen weg."""
+
+    def __init__(self, fail_at=(), drop=(), **kwargs):
+        super().__init__(**kwargs)
+        self.fail_at = set(fail_at)
+        self.drop = set(drop)
+
+    def get_klines(self, symbol, interval, startTime=None, endTime=None, limit=500, **kwargs):
+        if startTime in self.fail_at:
+            self.fail_at.discard(startTime)
+            raise ReplayAPIError(400, -1100, "Illegal characters found in parameter")
+        klines = super().get_klines(symbol, interval, startTime, endTime, limit, **kwargs)
+        dropped = [k for k in klines if k[0] in self.drop]
+        self.drop -= {k[0] for k in dropped}
+        return [k for k in klines if k not in dropped]
+
+
+def make_client(clock, records=HISTORY, **kwargs):
+    client = FlakyClient(clock=clock, **kwargs)
+    client.add("BTCUSDT", "1m", records)
+    return client
+
+
+def test_plan_chunks_and_gaps():
+    assert plan_chunks(150, 420, 100) == [(150, 200), (200, 300), (300, 400), (400, 420)]
+
+    times = np.array([0, 10, 40, 50], dtype=np.int64)
+    assert find_gaps(times, 0, 60, 10) == [[20, 40]]
+    assert find_gaps(times[1:], 0, 80, 10) == [[0, 10], [20, 40], [60, 80]]
+
+
+def test_parallel_backfill_merges_into_store(clock, tmp_path):
+    client = make_client(clock)
+    backfill = Backfill(client, "BTCUSDT", "1m", "3 day ago UTC", directory=str(tmp_path / "backfill"),
+                        chunk_pages=1, max_workers=4)
+    summary = backfill.run(verbose=False)
+
+    # Chunkgrenzen auf Vielfachen von 1000 Minuten: 200 + 4 x 1000 + 120 Kerzen
+    assert summary["chunks"] == 6 and summary["downloaded"] == 6
+    assert summary["rows"] == 3 * 1440 and summary["gaps"] == []
+    records = backfill.load()
+    expected = HISTORY[(HISTORY["time"] >= START - 3 * 1440 * MINUTE) & (HISTORY["time"] < START)]
+    assert np.array_equal(records, expected)
+
+    store = KlineStore(str(tmp_path / "klines"))
+    assert backfill.merge_into(store) == 3 * 1440
+    # Der Kerzenspeicher kennt den Zeitraum jetzt und lädt nur noch die offene Kerze nach
+    client.requests = 0
+    df = store.get_klines(client, "BTCUSDT", "1m", "2 day ago UTC")
+    assert len(df) == 2 * 1440 + 1
+    assert client.requests == 2
+
+
+def test_interrupted_backfill_resumes(clock, tmp_path):
+    chunk_ms = 1000 * MINUTE
+    failing = START - 2 * 1440 * MINUTE
+    failing -= failing % chunk_ms
+    client = make_client(clock, fail_at=[failing])
+    directory = str(tmp_path / "backfill")
+
+    first = Backfill(client, "BTCUSDT", "1m", "3 day ago UTC", directory=directory, chunk_pages=1).run(verbose=False)
+    assert list(first["failed"]) == [failing]
+    assert first["downloaded"] == 5
+
+    client.requests = 0
+    resumed = Backfill(client, "BTCUSDT", "1m", "3 day ago UTC", directory=directory, chunk_pages=1)
+    second = resumed.run(verbose=False)
+    assert second["downloaded"] == 1 and second["skipped"] == 5 and not second["failed"]
+    assert client.requests == 1
+    assert len(resumed.load()) == 3 * 1440
+
+
+def test_gaps_are_refetched_or_recorded(clock, tmp_path):
+    # Eine echte Lücke in den Daten der Börse und eine nur beim ersten Abruf fehlende Kerze
+    hole = (HISTORY["time"] >= START - 600 * MINUTE) & (HISTORY["time"] < START - 590 * MINUTE)
+    transient = START - 100 * MINUTE
+    client = make_client(clock, records=HISTORY[~hole], drop=[transient])
+
+    backfill = Backfill(client, "BTCUSDT", "1m", "1 day ago UTC", directory=str(tmp_path), chunk_pages=1)
+    summary = backfill.run(verbose=False)
+
+    assert summary["gaps"] == [[START - 600 * MINUTE, START - 590 * MINUTE]]
+    records = backfill.load()
+    assert transient in records["time"]
+    assert len(records) == 1440 - 10
+
+
+def test_overlapping_runs_merge_chunks(clock, tmp_path):
+    # Gitterfeld [START - 1120, START - 120) Minuten; zwei Läufe laden verschiedene Teile davon
+    client = make_client(clock)
+    directory = str(tmp_path)
+
+    def run(start, end):
+        backfill = Backfill(client, "BTCUSDT", "1m", START + start * MINUTE, START + end * MINUTE,
+                            directory=directory, chunk_pages=1)
+        return backfill, backfill.run(verbose=False)
+
+    run(-900, -500)
+    run(-1000, -700)   # überlappend, früher Beginn
+    run(-1100, -1050)  # getrennt davor: die Lücke bis -1000 wird mitgeladen
+
+    client.requests = 0
+    backfill, summary = run(-1100, -500)
+    assert summary["skipped"] == 1 and summary["downloaded"] == 0 and client.requests == 0
+    assert np.array_equal(backfill.load()["time"], np.arange(START - 1100 * MINUTE, START - 500 * MINUTE, MINUTE))
+    assert [f.name for f in (tmp_path / "BTCUSDT_1m").glob("*.bin")] == [f"{START - 1100 * MINUTE}.bin"]
+
+
+def test_only_transient_errors_are_retried(clock, tmp_path):
+    class BrokenClient(ReplayClient):
+        def __init__(self, error, **kwargs):
+            super().__init__(**kwargs)
+            self.error = error
+            self.calls = 0
+
+        def get_klines(self, *args, **kwargs):
+            self.calls += 1
+            if self.calls == 1:
+                raise self.error
+            return super().get_klines(*args, **kwargs)
+
+    for error, calls in [(ConnectionError("reset"), 2), (ReplayAPIError(503, -1001, "busy"), 2),
+                         (ValueError("bug"), 1), (ReplayAPIError(400, -1100, "bad"), 1)]:
+        client = BrokenClient(error, clock=clock)
+        client.add("BTCUSDT", "1m", HISTORY)
+        backfill = Backfill(client, "BTCUSDT", "1m", START - 10 * MINUTE, directory=str(tmp_path), backoff=0)
+        try:
+            backfill.fetch_range(START - 10 * MINUTE, START)
+        except type(error):
+            pass
+        assert client.calls == calls, error
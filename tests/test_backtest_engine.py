@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from crypto_warnsystem.backtester import engine
+from crypto_warnsystem.backtester.engine import run_rsi_liquidity
+from crypto_warnsystem.utils.indicator_utils import calculate_indicators, calculate_liquidity_levels
+
+from conftest import make_ohlcv
+
+
+def reference_backtest(df, levels, buy_threshold=30, sell_threshold=70):
+    """Ursprüngliche Schleifen-Implementierung als Referenz."""
+    position = None
+    trades = []
+    for i in range(1, len(df)):
+        price = df['close'].iloc[i]
+        rsi = df['rsi'].iloc[i]
+        lvl = levels.iloc[i]
+        time = df.index[i]
+        if position is None:
+            if pd.notna(lvl) and rsi < buy_threshold and price < lvl:
+                position = 'long'
+                trades.append((time, 'BUY', price))
+        else:
+            if pd.notna(lvl) and rsi > sell_threshold and price > lvl:
+                trades.append((time, 'SELL', price))
+                position = None
+    return trades
+
+
+@pytest.fixture
+def market():
+    df = calculate_indicators(make_ohlcv(3000, seed=7))
+    # Liquidity-Level auf Kursniveau skalieren, damit beide Bedingungen greifen
+    levels = calculate_liquidity_levels(df, window=20) / df["volume"].mean() * df["close"].mean()
+    return df, levels
+
+
+@pytest.mark.parametrize("use_numba", [False, True])
+@pytest.mark.parametrize("buy,sell", [(30, 70), (45, 55), (20, 80)])
+def test_engine_matches_reference_loop(market, use_numba, buy, sell):
+    if use_numba and not engine.NUMBA_AVAILABLE:
+        pytest.skip("Numba nicht installiert")
+    df, levels = market
+    result = run_rsi_liquidity(df["close"], df["rsi"], levels, buy, sell, index=df.index, use_numba=use_numba)
+    expected = reference_backtest(df, levels, buy, sell)
+
+    assert result["trades"] == expected
+    assert result["n_trades"] == len(expected) // 2
+
+
+def test_statistics():
+    close = np.array([10.0, 9.0, 8.0, 10.0, 12.0, 6.0, 6.0])
+    rsi = np.array([50, 20, 50, 50, 80, 20, 50], dtype=float)
+    levels = np.array([np.nan, 9.5, 9.5, 9.5, 11.0, 7.0, 7.0])
+
+    result = run_rsi_liquidity(close, rsi, levels, use_numba=False)
+    assert [t[1] for t in result["trades"]] == ['BUY', 'SELL', 'BUY']
+    assert list(result["pnl"]) == [3.0]
+    assert result["win_rate"] == 1.0
+    # Gehalten: Kerzen 2-4 (Trade 1) und 6 (offene Position)
+    assert result["exposure"] == pytest.approx(4 / 7)
+    assert result["total_return"] == pytest.approx(12 / 9 - 1)
+    assert result["max_drawdown"] == pytest.approx(8 / 9 - 1)
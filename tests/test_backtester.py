@@ -0,0 +1,41 @@
+import os
+
+import numpy as np
+import pytest
+
+from crypto_warnsystem.backtester.backtester import label_directions, run_prediction_backtest
+from crypto_warnsystem.models import prediction_model
+from crypto_warnsystem.utils.indicator_utils import calculate_indicators
+
+
+@pytest.fixture(autouse=True)
+def model_path(monkeypatch):
+    path = os.path.join(os.path.dirname(__file__), "..", "model", "trained_model.pkl")
+    monkeypatch.setattr(prediction_model.model_registry, "path", path)
+    monkeypatch.setattr(prediction_model.model_registry, "artifact_path", None)
+
+
+def test_label_directions_uses_shifted_close(ohlcv):
+    labels = label_directions(ohlcv["close"], step_size=4)
+    close = ohlcv["close"].to_numpy()
+    assert labels.iloc[-4:].isna().all()
+    assert labels.iloc[10] == float(close[14] > close[10])
+
+
+def test_prediction_backtest_matches_loop(ohlcv):
+    df = calculate_indicators(ohlcv)
+    report = run_prediction_backtest(df, step_size=4, window_size=24)
+    results = report["results"]
+
+    close = df["close"].to_numpy()
+    position = {t: i for i, t in enumerate(df.index)}
+    for _, row in results.sample(20, random_state=0).iterrows():
+        i = position[row["Zeitpunkt"]]
+        expected = prediction_model.predict_future_direction(df.iloc[:i + 1])
+        assert row["Vorhersage"] == expected["direction"]
+        assert row["Wahr"] == int(close[i + 4] > close[i])
+
+    assert report["total"] == len(results) == df.iloc[24:-4].dropna().shape[0]
+    assert report["hit_rate"] == pytest.approx(report["hits"] / report["total"])
+    assert report["calibration"]["Anzahl"].sum() == report["total"]
+    assert set(report["timings"]) == {"labels", "predict", "evaluation"}
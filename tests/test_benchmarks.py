@@ -0,0 +1,42 @@
+import os
+import sys
+
+import numpy as np
+
+BENCHMARK_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+if BENCHMARK_DIR not in sys.path:
+    sys.path.insert(0, BENCHMARK_DIR)
+
+import run_benchmarks
+from synthetic import synthetic_ohlcv
+
+
+def test_synthetic_ohlcv_is_reproducible_and_consistent():
+    a = synthetic_ohlcv(2_500, seed=3)
+    b = synthetic_ohlcv(2_500, seed=3)
+
+    assert a.equals(b)
+    assert not a.equals(synthetic_ohlcv(2_500, seed=4))
+    assert (a["high"] >= a[["open", "close"]].max(axis=1)).all()
+    assert (a["low"] <= a[["open", "close"]].min(axis=1)).all()
+    assert np.array_equal(a["open"].to_numpy()[1:], a["close"].to_numpy()[:-1])
+
+
+def test_run_suite_without_network():
+    results = run_benchmarks.run_suite(["calculate_indicators", "backtest_rsi_liquidity"], ["1k"],
+                                       min_time=0.0, max_rounds=2, verbose=False)
+
+    assert set(results) == {"calculate_indicators[1k]", "backtest_rsi_liquidity[1k]"}
+    for result in results.values():
+        assert result["rows"] == 1_000
+        assert 1 <= result["rounds"] <= 2
+        assert 0 < result["min"] <= result["median"]
+
+
+def test_compare_reports_regressions():
+    baseline = {"a[1k]": {"min": 0.010}, "b[1k]": {"min": 0.010}}
+    results = {"a[1k]": {"min": 0.011}, "b[1k]": {"min": 0.020}, "c[1k]": {"min": 1.0}}
+
+    regressions = run_benchmarks.compare(results, baseline, tolerance=0.2)
+
+    assert [key for key, *_ in regressions] == ["b[1k]"]
@@ -0,0 +1,89 @@
+import numpy as np
+
+from crypto_warnsystem.utils import data_utils
+from crypto_warnsystem.utils import kline_store as kline_store_module
+from crypto_warnsystem.utils.candles import CandleCache, Candles
+from crypto_warnsystem.utils.indicator_utils import calculate_indicators
+from crypto_warnsystem.utils.kline_store import KlineStore, klines_to_records, records_to_frame
+from crypto_warnsystem.utils.scanner import fetch_klines_concurrently
+from crypto_warnsystem.utils.replay_client import ReplayClient, VirtualClock, _to_kline, synthetic_records
+
+MINUTE = 60_000
+START = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+RECORDS = synthetic_records(START - 2000 * MINUTE, START, MINUTE, seed=5)
+
+
+def test_from_klines_is_compact_and_matches_get_klines():
+    klines = [_to_kline(r, MINUTE) for r in RECORDS]
+    candles = Candles.from_klines(klines, "BTCUSDT", "1m")
+
+    assert candles.time.dtype == np.int64 and candles["close"].dtype == np.float32
+    assert candles.nbytes == len(RECORDS) * (8 + 5 * 4)
+    expected = records_to_frame(klines_to_records(klines))
+    df = candles.frame(dtype=float)
+    assert df.index.equals(expected.index)
+    assert list(df.columns) == list(expected.columns)
+    assert np.allclose(df.to_numpy(), expected.to_numpy(), rtol=1e-6)
+
+    assert len(Candles.from_klines([])) == 0
+    assert len(candles.tail(10)) == 10 and candles.tail(10).time[-1] == RECORDS["time"][-1]
+
+
+def test_downcast_indicators_match_calculate_indicators():
+    candles = Candles.from_records(RECORDS).add_indicators()
+    expected = calculate_indicators(records_to_frame(RECORDS))
+
+    for col in ["rsi", "macd", "bb_upper", "bb_lower", "sma50", "sma200"]:
+        assert candles[col].dtype == np.float32
+        assert np.allclose(candles[col], expected[col], rtol=1e-4, atol=1e-3, equal_nan=True), col
+
+    assert Candles.from_records(RECORDS).add_indicators(dtype=None)["rsi"].dtype == np.float64
+
+
+def test_cache_evicts_least_recently_used():
+    one = Candles.from_records(RECORDS[:1000])
+    cache = CandleCache(max_bytes=2.5 * one.nbytes)
+
+    cache.put("BTCUSDT", one)
+    cache.put("ETHUSDT", Candles.from_records(RECORDS[:1000]))
+    assert cache.get("BTCUSDT") is one           # BTC ist jetzt zuletzt genutzt
+    cache.put("SOLUSDT", Candles.from_records(RECORDS[:1000]))
+
+    assert "ETHUSDT" not in cache and "BTCUSDT" in cache and "SOLUSDT" in cache
+    assert cache.nbytes == 2 * one.nbytes
+    assert cache.stats()["evictions"] == 1
+
+    # Größer als das ganze Budget: geliefert, aber nicht gecacht
+    big = cache.get("BIGUSDT", lambda: Candles.from_records(np.concatenate([RECORDS, RECORDS])))
+    assert len(big) == 2 * len(RECORDS) and "BIGUSDT" not in cache
+
+
+def test_get_candles_reads_through_cache(tmp_path, monkeypatch):
+    clock = VirtualClock(START, speed=0)
+    kline_store_module.set_clock(clock.time)
+    client = ReplayClient(clock=clock)
+    client.add("BTCUSDT", "1m", RECORDS)
+    monkeypatch.setattr(data_utils, "_client", client)
+    monkeypatch.setattr(data_utils, "kline_store", KlineStore(str(tmp_path)))
+    cache = CandleCache(ttl=60)
+    monkeypatch.setattr(data_utils, "candle_cache", cache)
+    try:
+        candles = data_utils.get_candles("BTCUSDT", "1m", "1 day ago UTC", indicators=True, cache=cache)
+        requests = client.requests
+        assert data_utils.get_candles("BTCUSDT", "1m", "1 day ago UTC", indicators=True, cache=cache) is candles
+        assert client.requests == requests
+
+        # Anderer Zeitraum bzw. ohne Indikatoren: eigene Einträge, der lange bleibt erhalten
+        short = data_utils.get_candles("BTCUSDT", "1m", "1 hour ago UTC", cache=cache)
+        assert len(short) == 60 and "rsi" not in short
+        assert data_utils.get_candles("BTCUSDT", "1m", "1 day ago UTC", indicators=True, cache=cache) is candles
+
+        # Der Scanner liest standardmäßig über denselben Cache
+        frames, errors = fetch_klines_concurrently(["BTCUSDT"], "1m", "1 hour ago UTC")
+    finally:
+        kline_store_module.set_clock(None)
+
+    assert len(candles) == 1440 and candles["sma200"].dtype == np.float32
+    assert not errors and frames["BTCUSDT"]["close"].dtype == np.float64
+    assert np.array_equal(frames["BTCUSDT"]["close"].to_numpy(), short["close"].astype(float))
+    assert cache.stats()["hits"] == 3 and len(cache) == 2
@@ -0,0 +1,60 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from crypto_warnsystem import cli
+
+from conftest import SRC_ROOT
+
+# Schwere Abhängigkeiten, die erst bei Bedarf geladen werden dürfen
+HEAVY = ["binance", "sklearn", "matplotlib", "ta", "telebot", "dateparser"]
+
+
+def imported_modules(module: str, cwd: str) -> set:
+    """Top-Level-Pakete, die der Import von module in einem frischen Interpreter lädt."""
+    code = (f"import sys, json; sys.path.insert(0, {SRC_ROOT!r}); import {module}; "
+            "print(json.dumps(sorted({m.split('.')[0] for m in sys.modules})))")
+    # Eigenes Arbeitsverzeichnis, damit ein Import nichts ins Repository schreibt
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=cwd)
+    return set(json.loads(out.stdout))
+
+
+@pytest.mark.parametrize("module", [
+    "crypto_warnsystem.utils.data_utils",
+    "crypto_warnsystem.bot.telegram_command_bot",
+    "crypto_warnsystem.utils.scheduler",
+    "crypto_warnsystem.backtester.run_backtest",
+])
+def test_entry_points_import_without_heavy_dependencies(module, tmp_path):
+    loaded = imported_modules(module, str(tmp_path))
+    assert not loaded & set(HEAVY), sorted(loaded & set(HEAVY))
+    # Der Import allein legt keine Dateien an (z. B. die Prognose-Datenbank)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cli_import_is_minimal(tmp_path):
+    loaded = imported_modules("crypto_warnsystem.cli", str(tmp_path))
+    assert not loaded & {"pandas", "numpy", *HEAVY}
+
+
+def test_run_command_forwards_arguments(monkeypatch, tmp_path):
+    module = tmp_path / "fake_command.py"
+    module.write_text("import sys\ndef main():\n    return sys.argv[1:]\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setitem(cli.COMMANDS, "scan", ("fake_command", ["--scan", "--once"], "Test"))
+
+    assert cli.main(["scan", "--symbols", "BTCUSDT"]) == ["--scan", "--once", "--symbols", "BTCUSDT"]
+
+
+def test_importtime_flags_regressions(monkeypatch, tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"a": 100.0, "b": 100.0}))
+    monkeypatch.setattr(cli, "measure_import", lambda module, repeat: {"a": 110.0, "b": 200.0}[module])
+
+    with pytest.raises(SystemExit) as exit_info:
+        cli.importtime(["a", "b", "--baseline", str(baseline), "--output", str(tmp_path / "out.json")])
+
+    assert exit_info.value.code == 1
+    assert json.loads((tmp_path / "out.json").read_text()) == {"a": 110.0, "b": 200.0}
@@ -0,0 +1,102 @@
+import numpy as np
+
+from crypto_warnsystem.models.feature_store import FEATURES, FeatureStore
+from crypto_warnsystem.utils.indicator_utils import calculate_indicators
+
+from conftest import make_ohlcv
+
+HOUR_MS = 3_600_000
+
+
+def end_of(df, rows=None):
+    """Zeitpunkt, zu dem die ersten `rows` Kerzen abgeschlossen sind."""
+    last = df.index[(rows or len(df)) - 1]
+    return int(last.value // 1_000_000) + HOUR_MS
+
+
+def test_features_match_calculate_indicators(tmp_path):
+    df = make_ohlcv(900, seed=4)
+    store = FeatureStore(str(tmp_path))
+
+    result = store.features("BTCUSDT", "1h", df, now_ms=end_of(df))
+    expected = calculate_indicators(df.copy())
+
+    for col in FEATURES:
+        assert np.allclose(result[col], expected[col], rtol=1e-6, equal_nan=True), col
+    assert result.index.equals(df.index)
+
+
+def test_incremental_update_appends_only_new_candles(tmp_path):
+    df = make_ohlcv(900, seed=6)
+    store = FeatureStore(str(tmp_path))
+
+    store.update("BTCUSDT", "1h", df.iloc[:600], now_ms=end_of(df, 600))
+    generation = store.manifest("BTCUSDT", "1h")["generation"]
+
+    # Offene Kerze: wird berechnet, aber nicht gespeichert
+    partial = store.features("BTCUSDT", "1h", df.iloc[100:801], now_ms=end_of(df, 800))
+    assert len(store.load("BTCUSDT", "1h")) == 800
+    assert store.manifest("BTCUSDT", "1h")["generation"] == generation
+
+    full = FeatureStore(str(tmp_path / "full")).update("BTCUSDT", "1h", df, now_ms=end_of(df))
+    stored = store.load("BTCUSDT", "1h")
+    for col in FEATURES:
+        assert np.allclose(stored[col], full[col][:800], rtol=1e-6, equal_nan=True), col
+        assert np.isclose(partial[col].iloc[-1], full[col][800], rtol=1e-6), col
+
+
+def test_views_are_memory_mapped_float32(tmp_path):
+    df = make_ohlcv(300, seed=1)
+    store = FeatureStore(str(tmp_path))
+    matrix = store.update("ETHUSDT", "1h", df, now_ms=end_of(df))
+
+    assert isinstance(matrix["rsi"], np.memmap)
+    assert matrix["rsi"].dtype == np.float32
+    assert not matrix["rsi"].flags.writeable
+    X = matrix.slice(-10).matrix()
+    assert X.shape == (10, len(FEATURES)) and X.dtype == np.float32
+
+
+def test_rebuild_on_gap_or_longer_history(tmp_path):
+    df = make_ohlcv(500, seed=2)
+    store = FeatureStore(str(tmp_path))
+    store.update("BTCUSDT", "1h", df.iloc[200:300], now_ms=end_of(df, 300))
+
+    # Lücke zwischen gespeicherter und neuer Kerze → Neuaufbau
+    store.update("BTCUSDT", "1h", df.iloc[350:], now_ms=end_of(df))
+    assert store.manifest("BTCUSDT", "1h")["first_time"] == int(df.index[350].value // 1_000_000)
+
+    # Mehr Historie als gespeichert → Neuaufbau ab dem früheren Start
+    store.update("BTCUSDT", "1h", df, now_ms=end_of(df))
+    manifest = store.manifest("BTCUSDT", "1h")
+    assert manifest["rows"] == 500 and manifest["generation"] == 3
+    assert len([f for f in (tmp_path / "BTCUSDT_1h").iterdir() if f.name.startswith("rsi.")]) == 1
+
+
+def test_short_frames_keep_long_history(tmp_path):
+    df = make_ohlcv(900, seed=5)
+    store = FeatureStore(str(tmp_path))
+    store.update("BTCUSDT", "1h", df.iloc[:600], now_ms=end_of(df, 600))
+    generation = store.manifest("BTCUSDT", "1h")["generation"]
+
+    # Kurze Abrufe direkt nach bzw. innerhalb des gespeicherten Zeitraums hängen nur an
+    store.update("BTCUSDT", "1h", df.iloc[600:650], now_ms=end_of(df, 650))
+    store.update("BTCUSDT", "1h", df.iloc[620:700], now_ms=end_of(df, 700))
+    manifest = store.manifest("BTCUSDT", "1h")
+    assert manifest["rows"] == 700 and manifest["generation"] == generation
+    assert manifest["first_time"] == int(df.index[0].value // 1_000_000)
+    full = FeatureStore(str(tmp_path / "full")).update("BTCUSDT", "1h", df.iloc[:700], now_ms=end_of(df, 700))
+    for col in FEATURES:
+        assert np.allclose(store.load("BTCUSDT", "1h")[col], full[col], rtol=1e-6, equal_nan=True), col
+
+    # Älterer Abruf, der vor dem Ende des Speichers endet: Speicher bleibt,
+    # Kerzen vor dem gespeicherten Zeitraum werden direkt aus df berechnet
+    recent = FeatureStore(str(tmp_path / "recent"))
+    recent.update("BTCUSDT", "1h", df.iloc[300:], now_ms=end_of(df))
+    result = recent.features("BTCUSDT", "1h", df.iloc[:500], now_ms=end_of(df))
+    manifest = recent.manifest("BTCUSDT", "1h")
+    assert manifest["rows"] == 600 and manifest["generation"] == 1
+    expected = calculate_indicators(df.iloc[:500].copy())
+    for col in FEATURES:
+        assert np.allclose(result[col].iloc[:300], expected[col].iloc[:300], rtol=1e-6, equal_nan=True), col
+        assert np.allclose(result[col].iloc[300:], recent.load("BTCUSDT", "1h")[col][:200], equal_nan=True), col
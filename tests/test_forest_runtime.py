@@ -0,0 +1,114 @@
+import os
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from crypto_warnsystem.models import forest_runtime
+from crypto_warnsystem.models.feature_store import FEATURES
+from crypto_warnsystem.models.forest_runtime import FlatForest, HybridForest
+from crypto_warnsystem.models.model_registry import ModelRegistry
+from crypto_warnsystem.utils.indicator_utils import calculate_indicators
+
+from conftest import SRC_ROOT, make_ohlcv
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "model", "trained_model.pkl")
+
+
+@pytest.fixture(scope="module")
+def model():
+    return joblib.load(MODEL_PATH)
+
+
+RUNTIMES = [False, pytest.param(True, marks=pytest.mark.skipif(
+    not forest_runtime.NUMBA_AVAILABLE, reason="numba nicht installiert"))]
+
+
+@pytest.mark.parametrize("use_numba", RUNTIMES)
+def test_identical_to_sklearn(model, use_numba):
+    X = calculate_indicators(make_ohlcv(2000, seed=9)).dropna()[FEATURES]
+    forest = FlatForest.from_sklearn(model)
+    forest.use_numba = use_numba
+
+    assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+    assert np.array_equal(forest.predict_proba(X.iloc[-1:]), model.predict_proba(X.iloc[-1:]))
+    assert np.array_equal(forest.predict(X), model.predict(X))
+    assert np.array_equal(forest.apply(X) - forest.roots, model.apply(X))
+
+
+@pytest.mark.parametrize("use_numba", RUNTIMES)
+def test_blocks_and_missing_values(monkeypatch, use_numba):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 4))
+    y = (X[:, 0] + rng.normal(scale=0.5, size=600) > 0).astype(int)
+    X[rng.random(X.shape) < 0.05] = np.nan
+    model = RandomForestClassifier(n_estimators=25, max_depth=6, random_state=1).fit(X, y)
+
+    X_test = rng.normal(size=(300, 4))
+    X_test[rng.random(X_test.shape) < 0.1] = np.nan
+    monkeypatch.setattr(forest_runtime, "BLOCK_ROWS", 64)
+
+    forest = FlatForest.from_sklearn(model)
+    forest.use_numba = use_numba
+    assert np.array_equal(forest.predict_proba(X_test), model.predict_proba(X_test))
+
+
+def test_wrong_feature_count(model):
+    with pytest.raises(ValueError):
+        FlatForest.from_sklearn(model).predict_proba(np.zeros((2, 3)))
+
+
+def test_hybrid_routes_by_batch_size(model, monkeypatch):
+    X = calculate_indicators(make_ohlcv(800, seed=3)).dropna()[FEATURES]
+    hybrid = HybridForest(model, max_rows=50)
+    calls = []
+    monkeypatch.setattr(hybrid.flat, "predict_proba", lambda X: calls.append(len(X)) or model.predict_proba(X))
+
+    assert np.array_equal(hybrid.predict_proba(X.iloc[-10:]), model.predict_proba(X.iloc[-10:]))
+    assert np.array_equal(hybrid.predict_proba(X), model.predict_proba(X))
+    assert calls == [10]
+
+
+def test_registry_keeps_sklearn_for_batches_without_numba(monkeypatch):
+    monkeypatch.setattr(forest_runtime, "NUMBA_AVAILABLE", False)
+    registry = ModelRegistry(MODEL_PATH, flatten=True)
+    assert isinstance(registry.get(), HybridForest)
+
+    monkeypatch.setattr(forest_runtime, "NUMBA_AVAILABLE", True)
+    registry = ModelRegistry(MODEL_PATH, flatten=True)
+    assert isinstance(registry.get(), FlatForest)
+
+
+def test_registry_exports_artifact_and_drops_sklearn(model, monkeypatch, tmp_path):
+    artifact = str(tmp_path / "forest")
+    monkeypatch.setattr(forest_runtime, "NUMBA_AVAILABLE", True)
+    registry = ModelRegistry(MODEL_PATH, artifact_path=artifact, flatten=True)
+    loaded = registry.get()
+    # Beim ersten Laden exportiert; gehalten wird nur noch das Artefakt
+    assert type(loaded).__name__ == "ForestArtifact"
+    assert os.path.exists(os.path.join(artifact, "manifest.json"))
+    assert registry.get() is loaded
+
+    # Ohne Numba: scikit-learn erst beim ersten großen Batch
+    monkeypatch.setattr(forest_runtime, "NUMBA_AVAILABLE", False)
+    hybrid = ModelRegistry(MODEL_PATH, artifact_path=artifact, flatten=True).get()
+    assert isinstance(hybrid, HybridForest) and hybrid._model is None
+    X = calculate_indicators(make_ohlcv(800, seed=4)).dropna()[FEATURES]
+    assert np.array_equal(hybrid.predict_proba(X.iloc[-5:]), model.predict_proba(X.iloc[-5:]))
+    assert hybrid._model is None
+    assert np.array_equal(hybrid.predict_proba(X), model.predict_proba(X))
+    assert hybrid._model is not None
+
+
+def test_artifact_registry_does_not_import_sklearn(tmp_path):
+    artifact = str(tmp_path / "forest")
+    ModelRegistry(MODEL_PATH, artifact_path=artifact, flatten=True).get()
+    code = (f"import sys; sys.path.insert(0, {SRC_ROOT!r})\n"
+            "from crypto_warnsystem.models.model_registry import ModelRegistry\n"
+            f"model = ModelRegistry({os.path.abspath(MODEL_PATH)!r}, artifact_path={artifact!r}, flatten=True).get()\n"
+            "print(type(model).__name__, 'sklearn' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=str(tmp_path))
+    assert out.stdout.split()[1] == "False", out.stdout
@@ -0,0 +1,108 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from crypto_warnsystem.utils.kline_store import KlineStore
+
+INTERVAL_MS = 60_000
+
+
+class FakeClient:
+    """Liefert 1m-Kerzen bis einschließlich der aktuell offenen Kerze."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_historical_klines(self, symbol, interval, start_str):
+        self.calls.append(start_str)
+        now = int(time.time() * 1000)
+        first = start_str - start_str % INTERVAL_MS
+        if first < start_str:
+            first += INTERVAL_MS
+        return [
+            [t, str(t % 1000), "2", "0.5", str(t / INTERVAL_MS), "10", t + INTERVAL_MS - 1, "0", 0, "0", "0", "0"]
+            for t in range(first, now, INTERVAL_MS)
+        ]
+
+
+def test_cold_start_then_delta_fetch(tmp_path):
+    store = KlineStore(str(tmp_path))
+    client = FakeClient()
+    start = int(time.time() * 1000) - 120 * INTERVAL_MS
+
+    df = store.get_klines(client, "BTCUSDT", "1m", start)
+    assert isinstance(df, pd.DataFrame)
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert df.index.name == "time"
+    assert len(df) >= 120
+
+    stored = store.load("BTCUSDT", "1m")
+    # Die offene Kerze wird zurückgegeben, aber nicht gespeichert
+    assert len(stored) == len(df) - 1
+
+    df2 = store.get_klines(client, "BTCUSDT", "1m", start)
+    assert client.calls[1] == int(stored["time"][-1]) + INTERVAL_MS
+    assert df2.index.is_monotonic_increasing
+    assert np.allclose(df2["close"].iloc[:len(stored)], df["close"].iloc[:len(stored)])
+
+
+def test_earlier_lookback_triggers_full_fetch(tmp_path):
+    store = KlineStore(str(tmp_path))
+    client = FakeClient()
+    now = int(time.time() * 1000)
+
+    store.get_klines(client, "ETHUSDT", "1m", now - 30 * INTERVAL_MS)
+    df = store.get_klines(client, "ETHUSDT", "1m", now - 90 * INTERVAL_MS)
+    assert client.calls[-1] == now - 90 * INTERVAL_MS
+    assert len(df) >= 89
+
+
+def test_full_fetch_keeps_store_on_empty_response_and_concurrent_appends(tmp_path):
+    store = KlineStore(str(tmp_path))
+    now = int(time.time() * 1000)
+    store.get_klines(FakeClient(), "ETHUSDT", "1m", now - 30 * INTERVAL_MS)
+    before = np.array(store.load("ETHUSDT", "1m"))
+    covered_from = store.covered_from("ETHUSDT", "1m")
+
+    class EmptyClient(FakeClient):
+        def get_historical_klines(self, symbol, interval, start_str):
+            return []
+
+    store.get_klines(EmptyClient(), "ETHUSDT", "1m", now - 90 * INTERVAL_MS)
+    assert np.array_equal(store.load("ETHUSDT", "1m"), before)
+    assert store.covered_from("ETHUSDT", "1m") == covered_from
+
+    class LaggingClient(FakeClient):
+        """Antwortet ohne die letzten Kerzen, die währenddessen ein anderer Prozess anhängt."""
+
+        def get_historical_klines(self, symbol, interval, start_str):
+            klines = super().get_historical_klines(symbol, interval, start_str)
+            store.append(symbol, interval, before[-3:])
+            return [k for k in klines if k[0] < before["time"][-3]]
+
+    store.replace("ETHUSDT", "1m", before[:-3])
+    store.get_klines(LaggingClient(), "ETHUSDT", "1m", now - 90 * INTERVAL_MS)
+    stored = store.load("ETHUSDT", "1m")
+    assert stored["time"][-1] == before["time"][-1]
+    assert np.all(np.diff(stored["time"]) == INTERVAL_MS)
+    assert store.covered_from("ETHUSDT", "1m") == now - 90 * INTERVAL_MS
+
+
+def test_duplicate_records_are_repaired(tmp_path):
+    store = KlineStore(str(tmp_path))
+    client = FakeClient()
+    store.get_klines(client, "SOLUSDT", "1m", int(time.time() * 1000) - 10 * INTERVAL_MS)
+    data = np.array(store.load("SOLUSDT", "1m"))
+    with open(store.path("SOLUSDT", "1m"), "ab") as f:
+        f.write(data[-2:].tobytes())
+
+    # Lesen prüft und schreibt nicht; last_time liest nur den letzten Datensatz
+    assert len(store.load("SOLUSDT", "1m")) == len(data) + 2
+    assert store.last_time("SOLUSDT", "1m") == int(data["time"][-1])
+
+    assert store.repair("SOLUSDT", "1m") == 2
+    repaired = store.load("SOLUSDT", "1m")
+    assert len(repaired) == len(data)
+    assert np.all(np.diff(repaired["time"]) > 0)
+    assert store.repair("SOLUSDT", "1m") == 0
@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import numpy as np
+import websockets
+
+from crypto_warnsystem.utils import kline_store as kline_store_module
+from crypto_warnsystem.utils.kline_store import KlineStore
+from crypto_warnsystem.utils.kline_stream import KlineStream, LiveIndicators
+from crypto_warnsystem.utils.replay_client import ReplayClient, VirtualClock, synthetic_records
+from crypto_warnsystem.utils.streaming_indicators import IncrementalIndicators
+
+MINUTE = 60_000
+
+
+def kline_event(symbol, t, close, closed=True):
+    return json.dumps({
+        "stream": f"{symbol.lower()}@kline_1m",
+        "data": {"e": "kline", "s": symbol, "k": {
+            "t": t, "T": t + MINUTE - 1, "s": symbol, "i": "1m",
+            "o": "1.0", "h": "2.0", "l": "0.5", "c": str(close), "v": "10.0", "x": closed,
+        }},
+    })
+
+
+async def run_fake_stream(store):
+    paths = []
+
+    async def handler(ws):
+        request = getattr(ws, "request", None)
+        paths.append(request.path if request is not None else ws.path)
+        await ws.send(kline_event("BTCUSDT", 0, 100.0, closed=False))
+        await ws.send(kline_event("BTCUSDT", 0, 101.0))
+        await ws.send(kline_event("ETHUSDT", 0, 10.0))
+        await ws.send(kline_event("BTCUSDT", MINUTE, 102.0))
+        await ws.send(kline_event("BTCUSDT", 5 * MINUTE, 103.0))  # Lücke
+        await asyncio.sleep(1)
+
+    async with websockets.serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        stream = KlineStream(["BTCUSDT", "ETHUSDT"], "1m", store=store, url=f"ws://127.0.0.1:{port}/stream")
+        queue = stream.subscribe()
+        indicators = LiveIndicators(store)
+        stream.subscribe(indicators)
+
+        task = asyncio.create_task(stream.run())
+        received = [await asyncio.wait_for(queue.get(), 5) for _ in range(4)]
+        stream.stop()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    return paths, received, indicators
+
+
+def test_stream_stores_and_publishes_closed_candles(tmp_path):
+    store = KlineStore(str(tmp_path))
+    paths, received, indicators = asyncio.run(run_fake_stream(store))
+
+    assert paths == ["/stream?streams=btcusdt@kline_1m/ethusdt@kline_1m"]
+    assert [(c["symbol"], c["close"]) for c in received] == [
+        ("BTCUSDT", 101.0), ("ETHUSDT", 10.0), ("BTCUSDT", 102.0), ("BTCUSDT", 103.0)
+    ]
+    # Die offene Kerze wird ignoriert, die Kerze nach der Lücke nicht gespeichert
+    assert list(store.load("BTCUSDT", "1m")["close"]) == [101.0, 102.0]
+    assert list(store.load("ETHUSDT", "1m")["close"]) == [10.0]
+    # Ohne client bleibt die Lücke offen; die Kerze danach fließt nicht in die Indikatoren ein
+    assert [c["stored"] for c in received] == [True, True, True, False]
+    assert indicators.states[("BTCUSDT", "1m")].prev_close == 102.0
+
+
+def test_stream_fills_gaps_from_rest(tmp_path):
+    start = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+    history = synthetic_records(start - 40 * MINUTE, start + 20 * MINUTE, MINUTE, seed=3)
+    clock = VirtualClock(start + 3 * MINUTE, speed=0)
+    kline_store_module.set_clock(clock.time)
+    client = ReplayClient(clock=clock)
+    client.add("BTCUSDT", "1m", history)
+    store = KlineStore(str(tmp_path))
+    store.get_records(client, "BTCUSDT", "1m", start - 40 * MINUTE)
+    # Während der Stream nicht lief, sind drei weitere Kerzen geschlossen worden
+    clock.set(start + 6 * MINUTE)
+
+    def close(t):
+        return float(history["close"][history["time"] == t][0])
+
+    async def scenario():
+        async def handler(ws):
+            await ws.send(kline_event("BTCUSDT", start + 6 * MINUTE, close(start + 6 * MINUTE)))
+            # Erst weiter, wenn Nachladen beim Verbinden und die Kerze verarbeitet sind
+            while store.last_time("BTCUSDT", "1m") != start + 6 * MINUTE:
+                await asyncio.sleep(0.01)
+            # Zwei Nachrichten gehen verloren
+            clock.set(start + 10 * MINUTE)
+            await ws.send(kline_event("BTCUSDT", start + 9 * MINUTE, close(start + 9 * MINUTE)))
+            await asyncio.sleep(1)
+
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = KlineStream(["BTCUSDT"], "1m", store=store, client=client,
+                                 url=f"ws://127.0.0.1:{port}/stream")
+            queue = stream.subscribe()
+            indicators = LiveIndicators(store)
+            stream.subscribe(indicators)
+            task = asyncio.create_task(stream.run())
+            received = [await asyncio.wait_for(queue.get(), 5) for _ in range(2)]
+            stream.stop()
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        return received, indicators
+
+    try:
+        received, indicators = asyncio.run(scenario())
+    finally:
+        kline_store_module.set_clock(None)
+
+    # Beim Verbinden und bei der Lücke per REST nachgeladen, ohne manuelles append
+    assert [c["stored"] for c in received] == [True, True]
+    stored = store.load("BTCUSDT", "1m")
+    assert np.array_equal(stored["time"], np.arange(start - 40 * MINUTE, start + 10 * MINUTE, MINUTE))
+
+    rebuilt = IncrementalIndicators()
+    for value in np.asarray(stored["close"], dtype=float):
+        expected = rebuilt.update(value)
+    np.testing.assert_equal(indicators.latest[("BTCUSDT", "1m")], expected)
@@ -0,0 +1,86 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from crypto_warnsystem.utils.message_queue import TelegramQueue
+
+
+class MockTelegram(BaseHTTPRequestHandler):
+    received = []
+    fail_first = set()
+
+    def do_POST(self):
+        body = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        text = body["text"][0]
+        self.received.append((time.monotonic(), body["chat_id"][0], text))
+        if text in self.fail_first:
+            self.fail_first.discard(text)
+            payload = {"ok": False, "error_code": 429, "parameters": {"retry_after": 0.1}}
+            self.send_response(429)
+        else:
+            payload = {"ok": True}
+            self.send_response(200)
+        data = json.dumps(payload).encode()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def telegram():
+    MockTelegram.received = []
+    MockTelegram.fail_first = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockTelegram)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", MockTelegram
+    server.shutdown()
+
+
+def make_queue(url, **kwargs):
+    return TelegramQueue("TOKEN", api_url=url, chat_interval=0.05, group_interval=0.15, backoff=0.01, **kwargs)
+
+
+def test_enqueue_is_non_blocking_and_coalesces_duplicates(telegram):
+    url, mock = telegram
+    queue = make_queue(url)
+    start = time.perf_counter()
+    results = [queue.enqueue("1", "RSI überkauft") for _ in range(5)]
+    assert time.perf_counter() - start < 0.05
+    assert results == [True, False, False, False, False]
+    assert queue.flush(5)
+    assert [r[2] for r in mock.received] == ["RSI überkauft"]
+
+
+def test_per_chat_rate_limit_and_retry(telegram):
+    url, mock = telegram
+    mock.fail_first = {"b"}
+    queue = make_queue(url)
+    for text in ["a", "b", "c"]:
+        queue.enqueue("1", text)
+    queue.enqueue("-100", "group 1")
+    queue.enqueue("-100", "group 2")
+    assert queue.flush(5)
+
+    private = [r for r in mock.received if r[1] == "1"]
+    group = [r for r in mock.received if r[1] == "-100"]
+    # "b" wurde nach 429 erneut gesendet
+    assert sorted(r[2] for r in private) == ["a", "b", "b", "c"]
+    assert all(t2 - t1 >= 0.045 for (t1, *_), (t2, *_) in zip(private, private[1:]))
+    assert group[1][0] - group[0][0] >= 0.14
+    assert queue.sent == 5
+
+
+def test_client_errors_are_dropped(telegram):
+    queue = make_queue("http://127.0.0.1:1", max_retries=1)
+    queue.enqueue("1", "nicht erreichbar")
+    assert queue.flush(5)
+    assert queue.dropped == 1
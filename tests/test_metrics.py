@@ -0,0 +1,77 @@
+import os
+import urllib.request
+
+import pytest
+
+from crypto_warnsystem.utils.metrics import Metrics, profiled
+
+
+def test_timed_records_calls_and_errors():
+    metrics = Metrics(enabled=True, buckets=(0.1, 1.0))
+
+    @metrics.timed()
+    def stage(fail=False):
+        if fail:
+            raise RuntimeError("kaputt")
+        return 42
+
+    assert stage() == 42
+    assert stage.__name__ == "stage"
+    with pytest.raises(RuntimeError):
+        stage(fail=True)
+    with metrics.timer("loop"):
+        pass
+
+    snapshot = metrics.snapshot()
+    assert snapshot["stage"]["count"] == 2
+    assert snapshot["stage"]["errors"] == 1
+    assert snapshot["loop"]["count"] == 1
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics(enabled=False)
+    timed_len = metrics.timed("len")(len)
+
+    assert timed_len([1, 2]) == 2
+    with metrics.timer("loop"):
+        pass
+    assert metrics.snapshot() == {}
+
+
+def test_render_prometheus_histogram():
+    metrics = Metrics(enabled=True, buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.5, 5.0):
+        metrics.observe("get_klines", seconds)
+
+    text = metrics.render()
+
+    assert "# TYPE crypto_warnsystem_stage_seconds histogram" in text
+    assert 'crypto_warnsystem_stage_seconds_bucket{stage="get_klines",le="0.1"} 1' in text
+    assert 'crypto_warnsystem_stage_seconds_bucket{stage="get_klines",le="1.0"} 3' in text
+    assert 'crypto_warnsystem_stage_seconds_bucket{stage="get_klines",le="+Inf"} 4' in text
+    assert 'crypto_warnsystem_stage_seconds_count{stage="get_klines"} 4' in text
+    assert 'crypto_warnsystem_stage_errors_total{stage="get_klines"} 0' in text
+
+
+def test_metrics_endpoint():
+    metrics = Metrics(enabled=False)
+    server = metrics.start_server(0, host="127.0.0.1")
+    try:
+        assert metrics.enabled
+        metrics.observe("predict_future_direction", 0.01)
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+        assert 'stage="predict_future_direction"' in body
+    finally:
+        metrics.stop_server()
+
+
+def test_profiled_writes_cprofile_dump(tmp_path):
+    with profiled("backtest", mode="cprofile", directory=str(tmp_path)):
+        sum(range(1000))
+    assert [f for f in os.listdir(tmp_path) if f.startswith("backtest-") and f.endswith(".prof")]
+
+    with profiled("aus", mode="", directory=str(tmp_path / "leer")):
+        pass
+    assert not (tmp_path / "leer").exists()
@@ -0,0 +1,62 @@
+import json
+import os
+
+import joblib
+import numpy as np
+import pytest
+
+from crypto_warnsystem.models.feature_store import FEATURES
+from crypto_warnsystem.models.model_artifact import ArtifactError, export_forest, load_forest
+from crypto_warnsystem.models.model_registry import ModelRegistry
+from crypto_warnsystem.utils.indicator_utils import calculate_indicators
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "model", "trained_model.pkl")
+
+
+@pytest.fixture(scope="module")
+def model():
+    return joblib.load(MODEL_PATH)
+
+
+def test_artifact_predicts_identically(model, ohlcv, tmp_path):
+    manifest = export_forest(model, str(tmp_path / "forest"), FEATURES,
+                             training_window={"symbols": ["BTCUSDT"], "interval": "15m"},
+                             metrics={"accuracy": 0.5})
+    artifact = load_forest(str(tmp_path / "forest"))
+    X = calculate_indicators(ohlcv).dropna()[FEATURES]
+
+    assert np.array_equal(artifact.predict_proba(X), model.predict_proba(X))
+    assert np.array_equal(artifact.predict(X), model.predict(X))
+    # Spaltenreihenfolge kommt aus dem Manifest
+    assert np.array_equal(artifact.predict_proba(X[FEATURES[::-1]]), model.predict_proba(X))
+    assert manifest["features"] == FEATURES and manifest["n_trees"] == len(model.estimators_)
+    assert manifest["metrics"]["accuracy"] == 0.5
+    assert isinstance(artifact.arrays["threshold"], np.memmap)
+
+
+def test_tampered_file_is_rejected(model, tmp_path):
+    path = str(tmp_path / "forest")
+    export_forest(model, path, FEATURES)
+    threshold = np.load(os.path.join(path, "threshold.npy"))
+    threshold[0] += 1
+    np.save(os.path.join(path, "threshold.npy"), threshold)
+
+    with pytest.raises(ArtifactError):
+        load_forest(path)
+
+
+def test_registry_prefers_artifact(model, tmp_path):
+    registry = ModelRegistry(MODEL_PATH, artifact_path=str(tmp_path / "forest"))
+    assert registry.get().__class__.__name__ == "RandomForestClassifier"
+
+    manifest = export_forest(model, str(tmp_path / "forest"), FEATURES)
+    loaded = registry.get()
+    assert loaded.__class__.__name__ == "ForestArtifact"
+    assert registry.version == manifest["sha256"][:12]
+    assert registry.get() is loaded
+
+    # Neues Export mit gleichem Inhalt → Modell bleibt geladen
+    export_forest(model, str(tmp_path / "forest"), FEATURES)
+    assert registry.get() is loaded
+    with open(tmp_path / "forest" / "manifest.json") as f:
+        assert json.load(f)["sha256"] == manifest["sha256"]
@@ -0,0 +1,33 @@
+import os
+
+import joblib
+
+from crypto_warnsystem.models.model_registry import ModelRegistry
+
+
+def test_model_is_loaded_once_and_reloaded_on_change(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    joblib.dump({"weights": [1, 2, 3]}, path)
+
+    registry = ModelRegistry(path)
+    first = registry.get()
+    assert first == {"weights": [1, 2, 3]}
+    assert registry.get() is first
+    version = registry.version
+    assert version
+
+    # Gleicher Inhalt, neue mtime → kein erneutes Laden
+    os.utime(path, (0, 0))
+    assert registry.get() is first
+    assert registry.version == version
+
+    joblib.dump({"weights": [4]}, path)
+    second = registry.get()
+    assert second == {"weights": [4]}
+    assert registry.version != version
+
+
+def test_missing_model_returns_none(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "missing.pkl"))
+    assert registry.get() is None
+    assert registry.version is None
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from crypto_warnsystem.models import model_selection
+from crypto_warnsystem.models.training_pipeline import build_features
+
+from conftest import make_ohlcv, store_klines
+
+STEP = 900_000  # 15m
+
+
+def test_walk_forward_trains_only_on_the_past_with_purge():
+    times = np.arange(1000) * STEP
+    splits = model_selection.purged_splits(times, n_splits=4, horizon_ms=12 * STEP)
+
+    assert len(splits) == 4
+    for train, test in splits:
+        # Ziel jeder Trainingszeile endet vor dem ersten Testzeitpunkt
+        assert times[train].max() + 12 * STEP < times[test].min()
+        assert times[test].min() - times[train].max() == 13 * STEP
+    assert [len(test) for _, test in splits] == [200] * 4
+
+
+def test_purged_kfold_embargo_after_test_block():
+    times = np.arange(1000) * STEP
+    splits = model_selection.purged_splits(times, n_splits=5, horizon_ms=12 * STEP, scheme="purged_kfold")
+
+    train, test = splits[2]
+    after = times[train][times[train] > times[test].max()]
+    before = times[train][times[train] < times[test].min()]
+    assert after.min() - times[test].max() > 12 * STEP
+    assert before.max() + 12 * STEP < times[test].min()
+    assert len(np.intersect1d(train, test)) == 0
+
+
+def test_multiple_symbols_share_time_boundaries():
+    # zwei Symbole mit identischen Zeitstempeln: Folds dürfen keine Zeitpunkte mischen
+    times = np.concatenate([np.arange(500), np.arange(500)]) * STEP
+    for train, test in model_selection.purged_splits(times, n_splits=3, horizon_ms=12 * STEP):
+        assert times[train].max() < times[test].min()
+        assert len(test) % 2 == 0
+
+
+def test_holdout_drops_embargo_rows():
+    train, test = model_selection.time_series_holdout(100, test_size=0.2, embargo=12)
+    assert train[-1] == 67 and test[0] == 80 and test[-1] == 99
+
+
+@pytest.mark.parametrize("scheme", ["walk_forward", "purged_kfold"])
+def test_evaluation_uses_fold_cache(tmp_path, scheme):
+    kline_root, feature_root = str(tmp_path / "klines"), str(tmp_path / "features")
+    for seed, symbol in enumerate(["BTCUSDT", "ETHUSDT"]):
+        store_klines(kline_root, symbol, make_ohlcv(700, seed=seed, freq="15min"))
+    build_features(["BTCUSDT", "ETHUSDT"], "15m", kline_root, feature_root, max_workers=1)
+
+    options = dict(feature_root=feature_root, kline_root=kline_root, cache_dir=str(tmp_path / "cache"), n_splits=3, scheme=scheme)
+    cache, n_folds, cached = model_selection.prepare_folds(["BTCUSDT", "ETHUSDT"], "15m", **options)
+    assert n_folds == 3 and not cached
+    assert model_selection.prepare_folds(["BTCUSDT", "ETHUSDT"], "15m", **options) == (cache, 3, True)
+
+    configs = {"klein": {"n_estimators": 5, "max_depth": 3}, "tief": {"n_estimators": 5, "max_depth": 8}}
+    folds, summary = model_selection.evaluate_configs(cache, n_folds, configs, max_workers=2)
+
+    assert len(folds) == 6
+    assert set(summary.index) == {"klein", "tief"}
+    assert folds["accuracy"].between(0, 1).all()
@@ -0,0 +1,49 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from crypto_warnsystem.utils.prediction_history import PredictionHistory
+
+
+def _write(path, worker):
+    history = PredictionHistory(path, legacy_csv=None)
+    for i in range(50):
+        history.append(f"SYM{worker}", i % 2, 0.6, model_version="abc")
+    return worker
+
+
+def test_append_and_time_range_query(tmp_path):
+    history = PredictionHistory(str(tmp_path / "history.db"), legacy_csv=None)
+    now = datetime.now()
+    history.append("BTCUSDT", 1, 0.8, model_version="v1", features={"rsi": 55.0}, timestamp=now - timedelta(hours=30))
+    history.append("BTCUSDT", 0, 0.6, model_version="v1", timestamp=now - timedelta(hours=2))
+    history.append("ETHUSDT", 1, 0.7, timestamp=now - timedelta(hours=1))
+
+    recent = history.query(since=now - timedelta(hours=24), symbol="BTCUSDT")
+    assert list(recent["confidence"]) == [0.6]
+    assert pd.api.types.is_datetime64_any_dtype(recent["timestamp"])
+
+    full = history.query(symbol="BTCUSDT", with_features=True)
+    assert full["features"].iloc[0] == {"rsi": 55.0}
+    assert len(history.query(until=now - timedelta(hours=1, minutes=30))) == 2
+
+
+def test_legacy_csv_is_imported_once(tmp_path):
+    csv = tmp_path / "prognose_history.csv"
+    csv.write_text("timestamp,direction,confidence\n2025-08-05 14:10:14.731370,0,0.66\n")
+    db = str(tmp_path / "history.db")
+
+    assert len(PredictionHistory(db, legacy_csv=str(csv)).query()) == 1
+    assert len(PredictionHistory(db, legacy_csv=str(csv)).query()) == 1
+    # Alte Einträge stammen vom Scheduler und gehören zu BTCUSDT
+    assert len(PredictionHistory(db, legacy_csv=None).query(symbol="BTCUSDT")) == 1
+
+
+def test_concurrent_writers(tmp_path):
+    path = str(tmp_path / "history.db")
+    # Eigenständige Prozesse wie Dashboard und Scheduler (kein fork mit offener Verbindung)
+    with ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context("spawn")) as pool:
+        list(pool.map(_write, [path] * 4, range(4)))
+    assert len(PredictionHistory(path, legacy_csv=None).query()) == 200
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pytest
+
+from crypto_warnsystem.models import prediction_model
+from crypto_warnsystem.models.prediction_model import FEATURES, predict_directions, predict_future_direction
+from crypto_warnsystem.utils.indicator_utils import calculate_indicators
+
+
+@pytest.fixture
+def model_path(monkeypatch):
+    path = os.path.join(os.path.dirname(__file__), "..", "model", "trained_model.pkl")
+    monkeypatch.setattr(prediction_model.model_registry, "path", path)
+    monkeypatch.setattr(prediction_model.model_registry, "artifact_path", None)
+    return path
+
+
+def test_batch_matches_model_predict(ohlcv, model_path):
+    df = calculate_indicators(ohlcv).dropna()
+    result = predict_directions(df)
+    model = prediction_model.model_registry.get()
+
+    assert list(result.index) == list(df.index)
+    assert np.array_equal(result["direction"].to_numpy(), model.predict(df[FEATURES]))
+    assert np.allclose(result["proba_rise"], model.predict_proba(df[FEATURES])[:, 1])
+    assert result.attrs["model_version"] == prediction_model.model_registry.version
+
+
+def test_single_row_wrapper_matches_batch(ohlcv, model_path):
+    df = calculate_indicators(ohlcv).dropna()
+    single = predict_future_direction(df)
+    batch = predict_directions(df, start=-5)
+
+    assert len(batch) == 5
+    assert single["direction"] == batch["direction"].iloc[-1]
+    assert single["confidence"] == pytest.approx(batch["confidence"].iloc[-1])
+    assert single["proba"]["fall"] + single["proba"]["rise"] == pytest.approx(1.0)
+
+
+def test_feature_matrix_input_matches_frame(ohlcv, model_path, tmp_path):
+    from crypto_warnsystem.models.feature_store import FeatureStore
+
+    end_ms = int(ohlcv.index[-1].value // 1_000_000) + 3_600_000
+    store = FeatureStore(str(tmp_path))
+    frame = store.features("BTCUSDT", "1h", ohlcv, now_ms=end_ms)
+    matrix = store.load("BTCUSDT", "1h")
+
+    from_matrix = predict_directions(matrix, start=250)
+    from_frame = predict_directions(frame, start=250)
+
+    assert from_matrix.index.equals(from_frame.index)
+    assert np.array_equal(from_matrix["direction"].to_numpy(), from_frame["direction"].to_numpy())
+    assert np.allclose(from_matrix["proba_rise"], from_frame["proba_rise"])
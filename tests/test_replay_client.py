@@ -0,0 +1,131 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from crypto_warnsystem.utils import kline_store as kline_store_module
+from crypto_warnsystem.utils.kline_store import KlineStore, klines_to_records, resolve_time
+from conftest import SRC_ROOT
+from crypto_warnsystem.utils.replay_client import (
+    ReplayAPIError,
+    ReplayClient,
+    ReplayStream,
+    VirtualClock,
+    synthetic_records,
+)
+
+MINUTE = 60_000
+START = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+
+
+@pytest.fixture
+def clock():
+    clock = VirtualClock(START, speed=0)
+    kline_store_module.set_clock(clock.time)
+    yield clock
+    kline_store_module.set_clock(None)
+
+
+@pytest.fixture
+def client(clock):
+    client = ReplayClient(clock=clock)
+    client.add("BTCUSDT", "1m", synthetic_records(START - 3000 * MINUTE, START + 3000 * MINUTE, MINUTE, seed=1))
+    return client
+
+
+def test_resolve_time_relative_to_clock():
+    assert resolve_time("2 day ago UTC", START) == START - 2 * 1440 * MINUTE
+    assert resolve_time("90 minutes ago UTC", START) == START - 90 * MINUTE
+    assert resolve_time(START) == START
+
+
+def test_historical_klines_follow_virtual_clock(client, clock):
+    klines = client.get_historical_klines("BTCUSDT", "1m", "1 day ago UTC")
+    records = klines_to_records(klines)
+
+    assert records["time"][0] == START - 1440 * MINUTE
+    assert records["time"][-1] == START  # die gerade begonnene Kerze
+    assert np.all(np.diff(records["time"]) == MINUTE)
+    # Abfrage des Startzeitpunkts + zwei Seiten à 1000 Kerzen
+    assert client.requests == 3
+
+    clock.advance(30 * MINUTE)
+    newer = klines_to_records(client.get_historical_klines("BTCUSDT", "1m", START + MINUTE))
+    assert list(newer["time"]) == [START + i * MINUTE for i in range(1, 31)]
+
+
+def test_kline_store_replays_incrementally(client, clock, tmp_path):
+    store = KlineStore(str(tmp_path))
+
+    df = store.get_klines(client, "BTCUSDT", "1m", "1 day ago UTC")
+    assert len(df) == 1441
+    # Die offene Kerze wird geliefert, aber nicht gespeichert
+    assert store.last_time("BTCUSDT", "1m") == START - MINUTE
+
+    clock.advance(10 * MINUTE)
+    df = store.get_klines(client, "BTCUSDT", "1m", "1 day ago UTC")
+    assert store.last_time("BTCUSDT", "1m") == START + 9 * MINUTE
+    assert df.index[-1].value // 1_000_000 == START + 10 * MINUTE
+
+
+def test_rate_limit_raises_or_waits(clock):
+    strict = ReplayClient(clock=clock, synthetic=["ETHUSDT"], max_weight=5, rate_limit="raise")
+    strict.get_klines("ETHUSDT", "1m")
+    strict.get_klines("ETHUSDT", "1m")
+    with pytest.raises(ReplayAPIError) as error:
+        strict.get_klines("ETHUSDT", "1m")
+    assert error.value.status_code == 429
+
+    patient = ReplayClient(clock=clock, synthetic=["ETHUSDT"], max_weight=4)
+    before = clock.now_ms()
+    for _ in range(3):
+        patient.get_klines("ETHUSDT", "1m")
+    # Die stehende Uhr springt bis zum Ende des Minutenfensters
+    assert clock.now_ms() - before == MINUTE
+
+
+def test_unknown_symbol(client):
+    with pytest.raises(ReplayAPIError):
+        client.get_historical_klines("NOPEUSDT", "1m", "1 hour ago UTC")
+
+
+def test_replay_stream_stores_closed_candles(client, clock, tmp_path):
+    store = KlineStore(str(tmp_path))
+    store.get_klines(client, "BTCUSDT", "1m", "1 hour ago UTC")
+    stream = ReplayStream(["BTCUSDT"], client, interval="1m", store=store, until_ms=START + 5 * MINUTE)
+    received = []
+    stream.subscribe(received.append)
+
+    asyncio.run(stream.run())
+
+    assert [c["time"] for c in received] == [START + i * MINUTE for i in range(5)]
+    assert store.last_time("BTCUSDT", "1m") == START + 4 * MINUTE
+    assert clock.now_ms() == START + 5 * MINUTE
+
+
+def test_replay_mode_never_writes_live_stores(tmp_path):
+    # Im frischen Interpreter: isolate_stores() verändert prozessweite Einstellungen
+    repo_root = os.path.dirname(SRC_ROOT)
+    code = (
+        f"import sys; sys.path[:0] = [{SRC_ROOT!r}, {repo_root!r}]\n"
+        "from crypto_warnsystem.utils.data_utils import get_klines, kline_store\n"
+        "from crypto_warnsystem.models.feature_store import feature_store\n"
+        "from data.data_utils import get_klines as legacy_get_klines\n"
+        "df = get_klines('ETHUSDT', '5m', '1 day ago UTC')\n"
+        "feature_store.features('ETHUSDT', '5m', df)\n"
+        "assert len(legacy_get_klines('ETHUSDT', '5m', '1 day ago UTC')) == len(df)\n"
+        "print(kline_store.root, feature_store.root)"
+    )
+    env = dict(os.environ, BINANCE_REPLAY="synthetic:ETHUSDT", REPLAY_START="2024-03-01",
+               REPLAY_STORE_DIR=str(tmp_path / "replay"))
+    env.pop("KLINE_STORE_DIR", None)
+    env.pop("FEATURE_STORE_DIR", None)
+    out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env,
+                         capture_output=True, text=True, check=True)
+
+    assert out.stdout.split() == [str(tmp_path / "replay" / "klines"), str(tmp_path / "replay" / "features")]
+    assert os.path.exists(tmp_path / "replay" / "klines" / "ETHUSDT_5m.bin")
+    assert not os.path.exists(tmp_path / "data")
@@ -0,0 +1,73 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from crypto_warnsystem.utils.result_cache import ResultCache
+
+
+def test_concurrent_requests_share_one_computation():
+    cache = ResultCache(ttl=60)
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "antwort"
+
+    with ThreadPoolExecutor(20) as pool:
+        replies = list(pool.map(lambda _: cache.get(("/prognose", "BTCUSDT"), slow), range(20)))
+
+    assert replies == ["antwort"] * 20
+    assert len(calls) == 1
+    assert cache.get(("/prognose", "BTCUSDT"), slow) == "antwort"
+    assert len(calls) == 1
+    cache.stop()
+
+
+def test_stale_value_is_served_while_refreshing():
+    cache = ResultCache(ttl=0.05, stale_ttl=60)
+    release = threading.Event()
+    values = iter(["alt", "neu"])
+
+    def loader():
+        value = next(values)
+        if value == "neu":
+            release.wait(2)
+        return value
+
+    assert cache.get("k", loader) == "alt"
+    time.sleep(0.1)
+    start = time.monotonic()
+    assert cache.get("k", loader) == "alt"
+    assert time.monotonic() - start < 0.1
+    release.set()
+    cache.refresh("k", loader).result()
+    assert cache.get("k", loader) == "neu"
+    cache.stop()
+
+
+def test_errors_are_not_cached():
+    cache = ResultCache(ttl=60)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("Binance down")
+        return 42
+
+    with pytest.raises(ValueError):
+        cache.get("k", flaky)
+    assert cache.get("k", flaky) == 42
+
+
+def test_keep_warm_prefetches():
+    cache = ResultCache(ttl=0.05)
+    calls = []
+    cache.keep_warm("k", lambda: calls.append(1) or len(calls))
+    time.sleep(0.2)
+    cache.stop()
+    assert len(calls) >= 2
+    assert cache.hits == 0 and cache.misses == 0
@@ -0,0 +1,46 @@
+import os
+import time
+
+import pytest
+
+from crypto_warnsystem.models import prediction_model
+from crypto_warnsystem.utils.indicator_utils import calculate_indicators
+from crypto_warnsystem.utils.scanner import WeightLimiter, scan
+
+from conftest import make_ohlcv
+
+
+@pytest.fixture(autouse=True)
+def model_path(monkeypatch):
+    path = os.path.join(os.path.dirname(__file__), "..", "model", "trained_model.pkl")
+    monkeypatch.setattr(prediction_model.model_registry, "path", path)
+    monkeypatch.setattr(prediction_model.model_registry, "artifact_path", None)
+
+
+def fake_fetch(symbol, interval, lookback):
+    if symbol == "BADUSDT":
+        raise ConnectionError("timeout")
+    return make_ohlcv(400, seed=sum(map(ord, symbol)))
+
+
+def test_weight_limiter_blocks_when_budget_is_used():
+    limiter = WeightLimiter(max_weight=4, period=0.2)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire(2)
+    assert time.monotonic() - start >= 0.15
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_scan_scores_all_symbols_in_one_batch(processes):
+    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BADUSDT"]
+    results, errors, timings = scan(symbols, fetch=fake_fetch, processes=processes)
+
+    assert set(results.index) == {"BTCUSDT", "ETHUSDT", "SOLUSDT"}
+    assert list(errors) == ["BADUSDT"]
+    assert set(timings) == {"fetch", "indicators", "predict"}
+    assert results["confidence"].is_monotonic_decreasing
+
+    single = prediction_model.predict_future_direction(calculate_indicators(fake_fetch("ETHUSDT", None, None)))
+    assert results.loc["ETHUSDT", "direction"] == single["direction"]
+    assert results.loc["ETHUSDT", "confidence"] == pytest.approx(single["confidence"])
@@ -0,0 +1,50 @@
+import json
+
+import numpy as np
+
+from crypto_warnsystem.utils.indicator_utils import calculate_indicators
+from crypto_warnsystem.utils.streaming_indicators import INDICATOR_COLUMNS, IncrementalIndicators
+
+from conftest import make_ohlcv
+
+
+def test_incremental_matches_calculate_indicators():
+    df = make_ohlcv(3000, seed=11)
+    expected = calculate_indicators(df.copy())[INDICATOR_COLUMNS]
+
+    result = IncrementalIndicators().update_many(df["close"])
+
+    assert result.index.equals(expected.index)
+    for col in INDICATOR_COLUMNS:
+        assert np.array_equal(np.isnan(result[col]), np.isnan(expected[col])), col
+        assert np.allclose(result[col], expected[col], rtol=1e-9, atol=1e-9, equal_nan=True), col
+
+
+def test_warm_up_then_update():
+    df = make_ohlcv(600, seed=2)
+    expected = calculate_indicators(df.copy()).iloc[-1]
+
+    indicators = IncrementalIndicators.from_frame(df.iloc[:-1])
+    last = indicators.update(df["close"].iloc[-1])
+
+    for col in INDICATOR_COLUMNS:
+        assert np.isclose(last[col], expected[col], rtol=1e-9), col
+
+
+def test_rsi_is_100_without_losses():
+    indicators = IncrementalIndicators()
+    values = [indicators.update(100 + i) for i in range(30)]
+    assert np.isnan(values[12]["rsi"])
+    assert values[13]["rsi"] == 100.0
+
+
+def test_state_round_trip():
+    df = make_ohlcv(800, seed=5)
+    expected = IncrementalIndicators().update_many(df["close"])
+
+    warm = IncrementalIndicators.from_frame(df.iloc[:500])
+    restored = IncrementalIndicators.from_state(json.loads(json.dumps(warm.to_state())))
+    result = restored.update_many(df["close"].iloc[500:])
+
+    for col in INDICATOR_COLUMNS:
+        assert np.allclose(result[col], expected[col].iloc[500:], rtol=1e-9, equal_nan=True), col
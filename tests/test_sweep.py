@@ -0,0 +1,28 @@
+import pandas as pd
+
+from crypto_warnsystem.backtester.engine import run_rsi_liquidity
+from crypto_warnsystem.backtester.sweep import parse_range, run_sweep
+from crypto_warnsystem.utils.indicator_utils import calculate_indicators, calculate_liquidity_levels
+
+from conftest import make_ohlcv
+
+
+def test_parse_range():
+    assert parse_range("20:40:10") == [20, 30, 40]
+    assert parse_range("25,35") == [25, 35]
+    assert parse_range("0.5:1.0:0.25") == [0.5, 0.75, 1]
+
+
+def test_sweep_matches_single_runs():
+    df = calculate_indicators(make_ohlcv(2000, seed=3))
+    df["volume"] *= df["close"].mean() / df["volume"].mean()
+
+    results = run_sweep({("BTCUSDT", "1h"): df}, [30, 45], [55, 70], [10, 20], max_workers=2, chunk_size=3)
+
+    assert len(results) == 8
+    assert results["total_return"].is_monotonic_decreasing
+    for _, row in results.iterrows():
+        levels = calculate_liquidity_levels(df, window=int(row["window"]))
+        expected = run_rsi_liquidity(df["close"], df["rsi"], levels, row["buy_threshold"], row["sell_threshold"])
+        assert row["n_trades"] == expected["n_trades"]
+        assert row["total_return"] == expected["total_return"]
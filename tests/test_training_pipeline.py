@@ -0,0 +1,69 @@
+import numpy as np
+
+from crypto_warnsystem.models import training_pipeline
+from crypto_warnsystem.models.feature_store import FEATURES, FeatureStore
+
+from conftest import make_ohlcv, store_klines
+
+
+def test_labels_match_label_data():
+    df = make_ohlcv(300, seed=3)
+    # wie train_model.label_data
+    expected = (df["close"].pct_change(periods=12).shift(-12) > 0).astype(int).to_numpy()[:-12]
+    target = training_pipeline.label_targets(df["close"].to_numpy(), 12)
+    assert np.array_equal(target[:-12], expected)
+    assert (target[-12:] == -1).all()
+
+
+def test_labels_use_float64_kline_close(tmp_path):
+    df = make_ohlcv(600, seed=5, freq="15min")
+    rows = [300, 325, 350, 375]
+    for i in rows:
+        # Anstieg kleiner als die float32-Auflösung bei 30000 (~0,002)
+        df.iloc[i + 12, df.columns.get_loc("close")] = df["close"].iloc[i] + 1e-4
+    kline_root, feature_root = str(tmp_path / "klines"), str(tmp_path / "features")
+    store_klines(kline_root, "BTCUSDT", df)
+    training_pipeline.build_features(["BTCUSDT"], "15m", kline_root, feature_root)
+
+    matrix = FeatureStore(feature_root).load("BTCUSDT", "15m")
+    positions = np.searchsorted(matrix.time, df.index[rows].as_unit("ms").asi8)
+    assert np.array_equal(matrix["close"][positions], matrix["close"][positions + 12])
+
+    _, y, _, times = training_pipeline.assemble_dataset(["BTCUSDT"], "15m", feature_root, kline_root=kline_root)
+    labels = dict(zip(times, y))
+    assert all(labels[t] == 1 for t in df.index[rows].as_unit("ms").asi8)
+
+
+def test_chunked_features_equal_single_pass(tmp_path):
+    df = make_ohlcv(1500, seed=8, freq="15min")
+    store_klines(str(tmp_path / "klines"), "BTCUSDT", df)
+
+    training_pipeline._build_features({"symbol": "BTCUSDT", "interval": "15m", "kline_root": str(tmp_path / "klines"),
+                                       "feature_root": str(tmp_path / "chunked"), "chunk_rows": 400})
+    training_pipeline._build_features({"symbol": "BTCUSDT", "interval": "15m", "kline_root": str(tmp_path / "klines"),
+                                       "feature_root": str(tmp_path / "single")})
+
+    chunked = FeatureStore(str(tmp_path / "chunked")).load("BTCUSDT", "15m")
+    single = FeatureStore(str(tmp_path / "single")).load("BTCUSDT", "15m")
+    assert len(chunked) == len(single) == 1500
+    for name in FEATURES:
+        assert np.allclose(chunked[name], single[name], rtol=1e-6, equal_nan=True), name
+
+
+def test_pipeline_trains_on_several_symbols(tmp_path):
+    kline_root = str(tmp_path / "klines")
+    for seed, symbol in enumerate(["BTCUSDT", "ETHUSDT", "SOLUSDT"]):
+        store_klines(kline_root, symbol, make_ohlcv(800, seed=seed, freq="15min"))
+
+    result = training_pipeline.run_pipeline(
+        ["BTCUSDT", "ETHUSDT", "SOLUSDT"], interval="15m", kline_root=kline_root,
+        feature_root=str(tmp_path / "features"), max_workers=2, n_jobs=2, n_estimators=10,
+        model_path=str(tmp_path / "model.pkl"), artifact_path=str(tmp_path / "forest"),
+    )
+
+    # je Symbol: 800 - 199 (SMA 200) - 12 (Ziel) = 589 Zeilen; 20 % Test, 12 Kerzen Abstand
+    assert result["train_rows"] + result["test_rows"] + 3 * 12 == 3 * 589
+    assert set(result["timings"]) == {"features", "assemble", "fit", "evaluate", "save"}
+    assert list(result["model"].feature_names_in_) == FEATURES
+    assert (tmp_path / "model.pkl").exists()
+    assert (tmp_path / "forest" / "manifest.json").exists()